@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
 
 from accounts.managers import CustomUserManager
 from accounts.validators import validate_birth_date
@@ -14,6 +15,11 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Upper('username'), name='accounts_username_upper_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -37,7 +43,7 @@ class Profile(models.Model):
 class ActivationToken(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='activation_token')
     token = models.CharField(max_length=32, unique=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f'{self.user.username}\'s activate token'
@@ -46,7 +52,7 @@ class ActivationToken(models.Model):
 class PasswordResetToken(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='password_reset_token')
     token = models.CharField(max_length=64, unique=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f'{self.user.username}\'s password reset token'
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from accounts.models import ActivationToken, CustomUser, PasswordResetToken, Profile
+from accounts.repositories import UserRepository
+from core.testing import QueryPlanTestCase
+
+
+class UserQueryPlanTest(QueryPlanTestCase):
+    """User and token lookups must be served by indexes"""
+    USERS = 20000
+    large_tables = QueryPlanTestCase.large_tables + ('accounts_profile',)
+
+    @classmethod
+    def setUpTestData(cls):
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f'user{i}@example.com', username=f'user{i}', first_name='First',
+                       last_name='Last', password='!')
+            for i in range(cls.USERS)
+        )
+        Profile.objects.bulk_create(
+            Profile(user=user, gender='male', date_of_birth=date(1990, 1, 1), bio='Bio', info='Info')
+            for user in users
+        )
+        ActivationToken.objects.bulk_create(
+            ActivationToken(user=user, token=f'activation{user.id}') for user in users[::2]
+        )
+        PasswordResetToken.objects.bulk_create(
+            PasswordResetToken(user=user, token=f'reset{user.id}') for user in users[1::2]
+        )
+        cls.user = users[2]
+        cls.repository = UserRepository()
+
+    def test_user_by_email(self):
+        with self.assertNoFullScan():
+            self.repository.get_user_by_email(self.user.email)
+
+    def test_user_by_username(self):
+        with self.assertNoFullScan():
+            self.repository.get_user_by_username(self.user.username)
+
+    def test_activation_token_by_user(self):
+        with self.assertNoFullScan():
+            self.repository.get_user_activation_token_by_user_id(self.user.id)
+
+    def test_activation_token_by_token_and_email(self):
+        with self.assertNoFullScan():
+            self.repository.get_activation_token_by_token_user_email(f'activation{self.user.id}', self.user.email)
+
+    def test_password_reset_token_by_email(self):
+        with self.assertNoFullScan():
+            self.repository.get_user_password_reset_token_by_user_email('user3@example.com')
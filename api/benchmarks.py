@@ -0,0 +1,340 @@
+import math
+import time
+import tracemalloc
+from datetime import date
+from statistics import mean, median
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import URLPattern, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import ActivationToken, PasswordResetToken, Profile
+from blog.models import Category, Comment, Post
+
+User = get_user_model()
+
+
+class BenchmarkRequest(NamedTuple):
+    url: str
+    data: Optional[Dict] = None
+
+
+class Scenario(NamedTuple):
+    """Request to route repeated by benchmark.
+
+    prepare is called before every request and is not measured, it returns url and body of
+    request and may create rows which request needs.
+    """
+    url_name: str
+    method: str
+    prepare: Callable[['BenchmarkContext', int], BenchmarkRequest]
+    authenticated: bool = False
+
+    @property
+    def name(self) -> str:
+        return f'{self.method.upper()} {self.url_name}'
+
+
+class EndpointResult(NamedTuple):
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    queries: float
+    allocated_kib: float
+
+
+class Regression(NamedTuple):
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+
+class BenchmarkContext:
+    """Seeded rows which scenarios request.
+
+    Author with most published posts is made superuser, so it may manage categories and its posts.
+    """
+
+    def __init__(self, client: Client, password: str):
+        self.client = client
+        self.password = password
+        self.author = User.objects.filter(blog_posts__status='published') \
+            .annotate(posts_total=Count('blog_posts')).order_by('-posts_total', 'id').first()
+        if self.author is None:
+            raise ValueError('Database has no published posts')
+        User.objects.filter(pk=self.author.pk).update(is_superuser=True, is_staff=True)
+        self.auth_headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.author).access_token}'}
+
+        self.post = Post.published.annotate(comments_total=Count('comments')) \
+            .order_by('-comments_total', 'id').first()
+        self.comment = self.post.comments.filter(active=True).order_by('id').first() or self.create_comment()
+        self.author_post_id = Post.published.filter(author=self.author).order_by('id').values_list('id', flat=True)[0]
+        self.category_id = self.post.category_id
+        self.post_ids = list(Post.published.order_by('id').values_list('id', flat=True)[:1000])
+        self.comment_ids = list(Comment.objects.filter(active=True, post__status='published')
+                                .order_by('id').values_list('post_id', 'id')[:1000])
+
+    def url(self, url_name: str, *args) -> str:
+        return reverse(f'api:{url_name}', args=args)
+
+    def post_data(self, iteration: int) -> Dict:
+        return {
+            'title': f'Benchmark post {iteration}',
+            'content': f'Body of benchmark post {iteration}',
+            'post_image_url': 'https://example.com/image.png',
+            'status': 'published',
+            'category_id': self.category_id,
+            'tags': ['benchmark', f'benchmark{iteration % 10}'],
+        }
+
+    def create_post(self) -> Post:
+        post = Post.objects.create(title='Benchmark post', slug='benchmark-post', author=self.author,
+                                   body='Body of benchmark post', status='published', category_id=self.category_id,
+                                   tag_names=['benchmark'])
+        post.tags.add('benchmark')
+        return post
+
+    def create_comment(self) -> Comment:
+        return Comment.objects.create(post=self.post, author=self.author, body='Benchmark comment')
+
+    def create_user(self, iteration: int, is_active: bool = False):
+        user = User.objects.create_user(email=f'benchmark{iteration}@example.com', username=f'benchmark{iteration}',
+                                        first_name='First', last_name='Last', password=self.password,
+                                        is_active=is_active)
+        Profile.objects.create(user=user, gender='male', date_of_birth=date(1990, 1, 1), bio='Bio', info='Info')
+        return user
+
+
+def _reaction_url(context: BenchmarkContext, url_name: str, iteration: int) -> str:
+    """Return url of reaction to next post or comment, so reactions are spread over many rows"""
+    if url_name.startswith('api-blog-post-comment-'):
+        return context.url(url_name, *context.comment_ids[iteration % len(context.comment_ids)])
+    return context.url(url_name, context.post_ids[iteration % len(context.post_ids)])
+
+
+def _set_reaction(url_name: str) -> Callable[[BenchmarkContext, int], BenchmarkRequest]:
+    def prepare(context: BenchmarkContext, iteration: int) -> BenchmarkRequest:
+        return BenchmarkRequest(_reaction_url(context, url_name, iteration))
+    return prepare
+
+
+def _remove_reaction(url_name: str) -> Callable[[BenchmarkContext, int], BenchmarkRequest]:
+    """Prepare removal of reaction which is set by unmeasured request first"""
+    def prepare(context: BenchmarkContext, iteration: int) -> BenchmarkRequest:
+        url = _reaction_url(context, url_name, iteration)
+        context.client.post(url, **context.auth_headers)
+        return BenchmarkRequest(url)
+    return prepare
+
+
+def _activate_user(context: BenchmarkContext, iteration: int) -> BenchmarkRequest:
+    user = context.create_user(iteration)
+    ActivationToken.objects.create(user=user, token=f'benchmark{iteration}')
+    return BenchmarkRequest(context.url('api-activate-user'), {'email': user.email, 'token': f'benchmark{iteration}'})
+
+
+def _reset_password(context: BenchmarkContext, iteration: int) -> BenchmarkRequest:
+    user = context.create_user(iteration, is_active=True)
+    PasswordResetToken.objects.create(user=user, token=f'benchmark{iteration}')
+    return BenchmarkRequest(context.url('api-password-reset'),
+                            {'email': user.email, 'token': f'benchmark{iteration}', 'new_password': 'N3w!Passw0rd'})
+
+
+def _register_user(context: BenchmarkContext, iteration: int) -> BenchmarkRequest:
+    return BenchmarkRequest(context.url('api-register-user'), {
+        'email': f'benchmark{iteration}@example.com', 'username': f'benchmark{iteration}', 'first_name': 'First',
+        'last_name': 'Last', 'password': 'Str0ng!Passw0rd', 'avatar': 'https://example.com/avatar.png',
+        'gender': 'male', 'date_of_birth': '1990-01-01', 'bio': 'Bio', 'info': 'Info',
+    })
+
+
+SCENARIOS = (
+    Scenario('api-root', 'get', lambda context, i: BenchmarkRequest(context.url('api-root'))),
+    Scenario('api-register-user', 'post', _register_user),
+    Scenario('api-activate-user', 'post', _activate_user),
+    Scenario('api-reactivate-token', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-reactivate-token'), {'email': context.create_user(i).email})),
+    Scenario('api-request-password-token', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-request-password-token'), {'email': context.create_user(i, is_active=True).email})),
+    Scenario('api-password-reset', 'post', _reset_password),
+    Scenario('token_obtain_pair', 'post', lambda context, i: BenchmarkRequest(
+        context.url('token_obtain_pair'), {'email': context.author.email, 'password': context.password})),
+    Scenario('token_refresh', 'post', lambda context, i: BenchmarkRequest(
+        context.url('token_refresh'), {'refresh': str(RefreshToken.for_user(context.author))})),
+    Scenario('api-blog-category-list', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-category-list'))),
+    Scenario('api-blog-category-list', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-category-list'), {'name': f'Benchmark category {i}'}), authenticated=True),
+    Scenario('api-blog-category-detail', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-category-detail', context.category_id))),
+    Scenario('api-blog-category-detail', 'put', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-category-detail', context.category_id), {'name': f'Benchmark category {i}'}),
+        authenticated=True),
+    Scenario('api-blog-category-detail', 'delete', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-category-detail',
+                    Category.objects.create(name=f'Benchmark category {i}', slug=f'benchmark-category-{i}').id)),
+        authenticated=True),
+    Scenario('api-blog-tag-list', 'get', lambda context, i: BenchmarkRequest(context.url('api-blog-tag-list'))),
+    Scenario('api-blog-post-list', 'get', lambda context, i: BenchmarkRequest(context.url('api-blog-post-list'))),
+    Scenario('api-blog-post-list', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-list'), context.post_data(i)), authenticated=True),
+    Scenario('api-blog-timeline', 'get', lambda context, i: BenchmarkRequest(context.url('api-blog-timeline')),
+             authenticated=True),
+    Scenario('api-blog-post-bulk-create', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-bulk-create'), {'posts': [context.post_data(i * 10 + n) for n in range(10)]}),
+        authenticated=True),
+    Scenario('api-blog-post-trending', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-trending'))),
+    Scenario('api-blog-post-detail', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-detail', context.post.id))),
+    Scenario('api-blog-post-detail', 'put', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-detail', context.author_post_id), context.post_data(i)), authenticated=True),
+    Scenario('api-blog-post-detail', 'patch', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-detail', context.author_post_id), {'title': f'Benchmark post {i}'}),
+        authenticated=True),
+    Scenario('api-blog-post-detail', 'delete', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-detail', context.create_post().id)), authenticated=True),
+    Scenario('api-blog-post-like', 'post', _set_reaction('api-blog-post-like'), authenticated=True),
+    Scenario('api-blog-post-like', 'delete', _remove_reaction('api-blog-post-like'), authenticated=True),
+    Scenario('api-blog-post-dislike', 'post', _set_reaction('api-blog-post-dislike'), authenticated=True),
+    Scenario('api-blog-post-dislike', 'delete', _remove_reaction('api-blog-post-dislike'), authenticated=True),
+    Scenario('api-blog-post-comments-list', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-comments-list', context.post.id))),
+    Scenario('api-blog-post-comments-list', 'post', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-comments-list', context.post.id), {'body': f'Benchmark comment {i}'}),
+        authenticated=True),
+    Scenario('api-blog-post-comments-detail', 'get', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-comments-detail', context.post.id, context.comment.id))),
+    Scenario('api-blog-post-comments-detail', 'put', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-comments-detail', context.post.id, context.create_comment().id),
+        {'body': f'Benchmark comment {i}'}), authenticated=True),
+    Scenario('api-blog-post-comments-detail', 'delete', lambda context, i: BenchmarkRequest(
+        context.url('api-blog-post-comments-detail', context.post.id, context.create_comment().id)),
+        authenticated=True),
+    Scenario('api-blog-post-comment-like', 'post', _set_reaction('api-blog-post-comment-like'), authenticated=True),
+    Scenario('api-blog-post-comment-like', 'delete', _remove_reaction('api-blog-post-comment-like'),
+             authenticated=True),
+    Scenario('api-blog-post-comment-dislike', 'post', _set_reaction('api-blog-post-comment-dislike'),
+             authenticated=True),
+    Scenario('api-blog-post-comment-dislike', 'delete', _remove_reaction('api-blog-post-comment-dislike'),
+             authenticated=True),
+)
+
+
+def get_uncovered_routes(urlpatterns: Iterable[URLPattern], scenarios: Iterable[Scenario]) -> List[str]:
+    """Return names of routes which no scenario requests"""
+    covered = {scenario.url_name for scenario in scenarios}
+    return [pattern.name for pattern in urlpatterns if pattern.name not in covered]
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Return percentile of values with linear interpolation between closest ranks"""
+    values = sorted(values)
+    rank = (len(values) - 1) * percent / 100
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+class BenchmarkRunner:
+    """Runner of scenarios through test client in process.
+
+    Every scenario runs in transaction which is rolled back, so all scenarios see the same
+    database and callbacks on commit are not run. Cache is cleared after rollback, so cached
+    pages, generations and category versions written by scenario do not leak into next one.
+    Latency and queries are measured over iterations after warmup, allocated memory is peak of
+    memory traced by tracemalloc during separate memory iterations, because tracing slows
+    requests down.
+    """
+
+    def __init__(self, iterations: int, warmup: int, memory_iterations: int, password: str,
+                 log: Optional[Callable[[str], None]] = None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.memory_iterations = memory_iterations
+        self.password = password
+        self.log = log or (lambda message: None)
+
+    def run(self, scenarios: Iterable[Scenario]) -> Dict[str, EndpointResult]:
+        client = Client(raise_request_exception=False)
+        context = BenchmarkContext(client, self.password)
+        results = {}
+        for scenario in scenarios:
+            with transaction.atomic():
+                results[scenario.name] = self.run_scenario(scenario, context)
+                transaction.set_rollback(True)
+            cache.clear()
+            self.log(f'{scenario.name}: p95 {results[scenario.name].p95_ms:.2f} ms')
+        return results
+
+    def run_scenario(self, scenario: Scenario, context: BenchmarkContext) -> EndpointResult:
+        durations, queries, allocations = [], [], []
+        errors = 0
+        iteration = 0
+        for _ in range(self.warmup):
+            self._send(scenario, context, scenario.prepare(context, iteration))
+            iteration += 1
+
+        for _ in range(self.iterations):
+            request = scenario.prepare(context, iteration)
+            start = time.perf_counter()
+            response = self._send(scenario, context, request)
+            durations.append((time.perf_counter() - start) * 1000)
+            queries.append(int(response.get('X-DB-Query-Count', 0)))
+            errors += response.status_code >= 400
+            iteration += 1
+
+        for _ in range(self.memory_iterations):
+            request = scenario.prepare(context, iteration)
+            tracemalloc.start()
+            try:
+                self._send(scenario, context, request)
+                allocations.append(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+            iteration += 1
+
+        return EndpointResult(
+            requests=len(durations),
+            errors=errors,
+            p50_ms=round(percentile(durations, 50), 3),
+            p95_ms=round(percentile(durations, 95), 3),
+            p99_ms=round(percentile(durations, 99), 3),
+            mean_ms=round(mean(durations), 3),
+            queries=round(mean(queries), 2),
+            allocated_kib=round(median(allocations), 1) if allocations else 0.0,
+        )
+
+    @staticmethod
+    def _send(scenario: Scenario, context: BenchmarkContext, request: BenchmarkRequest):
+        headers = context.auth_headers if scenario.authenticated else {}
+        return getattr(context.client, scenario.method)(request.url, request.data, content_type='application/json',
+                                                        **headers)
+
+
+def find_regressions(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Regression]:
+    """Compare results of endpoints with baseline.
+
+    Latency and allocated memory regress when they grow by more than threshold (fraction of
+    baseline), numbers of queries and errors are deterministic and regress on any growth.
+    Endpoints missing in baseline are not compared.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('p95_ms', 'allocated_kib'):
+            if result[metric] > baseline[name][metric] * (1 + threshold):
+                regressions.append(Regression(name, metric, baseline[name][metric], result[metric]))
+        for metric in ('queries', 'errors'):
+            if result[metric] > baseline[name][metric]:
+                regressions.append(Regression(name, metric, baseline[name][metric], result[metric]))
+    return regressions
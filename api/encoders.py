@@ -0,0 +1,104 @@
+import json
+from datetime import datetime
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, get_args, get_origin, get_type_hints
+
+from django.utils import timezone
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_datetime(value: datetime) -> str:
+    """Format datetime in current timezone like DRF DateTimeField with DATETIME_FORMAT"""
+    current_timezone = timezone.get_current_timezone()
+    if timezone.is_aware(value):
+        value = value.astimezone(current_timezone)
+    else:
+        value = timezone.make_aware(value, current_timezone)
+    return value.strftime(DATETIME_FORMAT)
+
+
+class DTOEncoder:
+    """JSON encoder of NamedTuple DTO type.
+
+    Encoding function is generated from DTO type annotations once per DTO type and set of fields
+    and produces the same JSON as DTO serializers rendered by JSONRenderer.
+    """
+    # templates of JSON expressions for annotations, value is name of local variable with field value
+    EXPRESSIONS = {
+        int: 'str(int({value}))',
+        str: '_encode_string(str({value}))',
+        datetime: '_encode_string(_format_datetime({value}))',
+        List[str]: '"[" + ",".join([_encode_string(str(item)) for item in {value}]) + "]"',
+    }
+    _encoders: Dict[Tuple[type, Tuple[str, ...]], 'DTOEncoder'] = {}
+
+    def __init__(self, dto_type: type, fields: Optional[Sequence[str]] = None):
+        self.dto_type = dto_type
+        self.fields = list(self.resolve_fields(dto_type, fields))
+        self.encode: Callable[[Any], str] = self._compile()
+
+    @classmethod
+    def for_type(cls, dto_type: type, fields: Optional[Sequence[str]] = None) -> 'DTOEncoder':
+        """Return cached encoder of DTO type limited to fields, all fields by default"""
+        # order, duplicates and unknown names of requested fields must not create new encoders
+        key = (dto_type, cls.resolve_fields(dto_type, fields))
+        encoder = cls._encoders.get(key)
+        if encoder is None:
+            encoder = cls._encoders[key] = cls(dto_type, fields)
+        return encoder
+
+    @staticmethod
+    def resolve_fields(dto_type: type, fields: Optional[Sequence[str]] = None) -> Tuple[str, ...]:
+        """Return requested fields of DTO type in order of DTO, all fields by default"""
+        return tuple(field for field in dto_type._fields if not fields or field in fields)
+
+    def encode_many(self, dtos: Sequence[Any]) -> str:
+        encode = self.encode
+        return "[" + ",".join([encode(dto) for dto in dtos]) + "]"
+
+    def _compile(self) -> Callable[[Any], str]:
+        hints = get_type_hints(self.dto_type)
+        lines = ["def encode(dto):"]
+        parts = []
+        for position, field in enumerate(self.fields):
+            index = self.dto_type._fields.index(field)
+            expression = self.EXPRESSIONS[self._unwrap_optional(hints[field])].format(value=f"value{position}")
+            lines.append(f"    value{position} = dto[{index}]")
+            key = encode_basestring(field) + ":"
+            if parts:
+                key = "," + key
+            parts.append(f'{key!r} + ("null" if value{position} is None else {expression})')
+        lines.append('    return "{" + ' + " + ".join(parts or ['""']) + ' + "}"')
+
+        namespace = {"_encode_string": encode_basestring, "_format_datetime": format_datetime}
+        exec(compile("\n".join(lines), f"<{self.dto_type.__name__}Encoder>", "exec"), namespace)
+        return namespace["encode"]
+
+    @staticmethod
+    def _unwrap_optional(annotation: Any) -> Any:
+        if get_origin(annotation) is Union:
+            arguments = [argument for argument in get_args(annotation) if argument is not type(None)]
+            if len(arguments) == 1:
+                return arguments[0]
+        return annotation
+
+
+class DTOPayload:
+    """DTO or list of DTOs in response data which DTOJSONRenderer writes with compiled encoder"""
+
+    def __init__(self, data: Union[Any, List[Any]], fields: Optional[Sequence[str]] = None):
+        self.data = data
+        self.many = isinstance(data, list)
+        self.fields = fields
+
+    def encode(self) -> str:
+        if self.many:
+            if not self.data:
+                return "[]"
+            return DTOEncoder.for_type(type(self.data[0]), self.fields).encode_many(self.data)
+        return DTOEncoder.for_type(type(self.data), self.fields).encode(self.data)
+
+    def to_primitive(self) -> Union[Dict, List[Dict]]:
+        """Return data as python dicts for renderers which do not know DTOs"""
+        return json.loads(self.encode())
@@ -0,0 +1,138 @@
+import json
+from datetime import datetime, timezone
+
+from dependency_injector import providers
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from redis import Redis
+from redis.exceptions import RedisError
+
+from api.benchmarks import SCENARIOS, BenchmarkRunner, find_regressions, get_uncovered_routes
+from api.urls import urlpatterns
+from blog.seeding import BlogSeeder, SeedVolumes
+from core.celery import app as celery_app
+from core.containers import RedisContainer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark API routes in process against seeded test database and compare results with baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per endpoint before measuring')
+        parser.add_argument('--memory-iterations', type=int, default=5,
+                            help='Requests per endpoint traced by tracemalloc after measuring')
+        parser.add_argument('--endpoint', action='append', default=[],
+                            help='Run only endpoints with name containing value, e.g. "GET api-blog-post-list"')
+        parser.add_argument('--output', default='benchmark.json', help='File to write results to')
+        parser.add_argument('--baseline', help='File with results of previous run to compare with')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed growth of latency and memory relative to baseline')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Destroy existing test database without asking')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument('--post-reactions', type=int, default=50000)
+        parser.add_argument('--comment-reactions', type=int, default=30000)
+        parser.add_argument('--follows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Number of iterations must be positive')
+        scenarios = [scenario for scenario in SCENARIOS
+                     if not options['endpoint'] or any(name in scenario.name for name in options['endpoint'])]
+        if not scenarios:
+            raise CommandError('No endpoints match --endpoint')
+        for route in get_uncovered_routes(urlpatterns, SCENARIOS):
+            self.stderr.write(self.style.WARNING(f'Route {route} has no benchmark scenario'))
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)['endpoints']
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f'Can not read baseline {options["baseline"]}: {error}')
+
+        results = {name: result._asdict() for name, result in self._run(scenarios, options).items()}
+        with open(options['output'], 'w') as output_file:
+            json.dump({
+                'created': datetime.now(timezone.utc).isoformat(),
+                'iterations': options['iterations'],
+                'seed': options['seed'],
+                'endpoints': results,
+            }, output_file, indent=2)
+
+        self._write_table(results)
+        self.stdout.write(f'Results written to {options["output"]}')
+        if baseline is None:
+            return
+
+        regressions = find_regressions(results, baseline, options['threshold'])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(
+                f'{regression.name}: {regression.metric} {regression.baseline} -> {regression.current}'))
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions against baseline {options["baseline"]}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against baseline {options["baseline"]}'))
+
+    def _run(self, scenarios, options):
+        """Run scenarios against test database seeded with BlogSeeder.
+
+        Cache is in process, Celery tasks run eagerly with test email backend and Redis stores
+        of blog use BENCHMARK_REDIS_URL, so run does not touch data of application.
+        """
+        volumes = SeedVolumes(
+            users=options['users'],
+            categories=options['categories'],
+            tags=options['tags'],
+            posts=options['posts'],
+            comments=options['comments'],
+            post_reactions=options['post_reactions'],
+            comment_reactions=options['comment_reactions'],
+            follows=options['follows'],
+        )
+        log = self.stdout.write if options['verbosity'] > 1 else None
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=options['verbosity'],
+                                                      autoclobber=not options['interactive'], serialize=False)
+        task_always_eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        RedisContainer.redis_client.override(
+            providers.Singleton(Redis.from_url, settings.BENCHMARK_REDIS_URL, decode_responses=True))
+        try:
+            with override_settings(DEBUG=False,
+                                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+                try:
+                    RedisContainer.redis_client().flushdb()
+                except RedisError as error:
+                    self.stderr.write(self.style.WARNING(f'Redis is not available, endpoints using it fail: {error}'))
+
+                self.stdout.write('Seeding test database')
+                BlogSeeder(options['seed'], 5000, 1.1, 'seed', 'password', log=log).seed(volumes)
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+                runner = BenchmarkRunner(options['iterations'], options['warmup'], options['memory_iterations'],
+                                         'password', log=log)
+                return runner.run(scenarios)
+        finally:
+            RedisContainer.redis_client.reset_override()
+            celery_app.conf.task_always_eager = task_always_eager
+            connection.creation.destroy_test_db(old_name, verbosity=options['verbosity'])
+            teardown_test_environment()
+
+    def _write_table(self, results):
+        self.stdout.write(f'{"endpoint":<48}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}'
+                          f'{"alloc KiB":>11}{"errors":>8}')
+        for name, result in results.items():
+            line = (f'{name:<48}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+                    f'{result["queries"]:>9.2f}{result["allocated_kib"]:>11.1f}{result["errors"]:>8}')
+            self.stdout.write(self.style.ERROR(line) if result['errors'] else line)
@@ -0,0 +1,100 @@
+import json
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from api.replay import ANONYMOUS, TrafficReplayer, get_schedule, obtain_tokens, read_recorded_requests, summarize
+
+
+class Command(BaseCommand):
+    help = 'Replay recorded requests from JSONL against running server and report latency and errors per route'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='JSONL with method, path, query, body, role and timestamp of requests')
+        parser.add_argument('--base-url', default='http://localhost', help='Address of running server')
+        parser.add_argument('--concurrency', type=int, default=10, help='Number of requests sent in parallel')
+        timing = parser.add_mutually_exclusive_group()
+        timing.add_argument('--rate', type=float, help='Send requests evenly, number per second')
+        timing.add_argument('--speed', type=float,
+                            help='Keep recorded timing, sped up by factor, e.g. 2 replays twice as fast')
+        parser.add_argument('--credentials', action='append', default=[], metavar='ROLE=EMAIL:PASSWORD',
+                            help='Obtain JWT token of role from credentials')
+        parser.add_argument('--token', action='append', default=[], metavar='ROLE=TOKEN',
+                            help='JWT access token of role')
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout of request in seconds')
+        parser.add_argument('--output', help='File to write report to in JSON')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('Concurrency must be positive')
+        if (options['rate'] is not None and options['rate'] <= 0) or \
+                (options['speed'] is not None and options['speed'] <= 0):
+            raise CommandError('Rate and speed must be positive')
+
+        try:
+            with open(options['file']) as records_file:
+                records = read_recorded_requests(records_file)
+            schedule = get_schedule(records, options['rate'], options['speed'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        if not records:
+            raise CommandError(f'No requests in {options["file"]}')
+
+        base_url = options['base_url'].rstrip('/')
+        tokens = self._parse_pairs(options['token'], '--token')
+        credentials = {}
+        for role, value in self._parse_pairs(options['credentials'], '--credentials').items():
+            email, separator, password = value.partition(':')
+            if not separator:
+                raise CommandError('--credentials must be in form ROLE=EMAIL:PASSWORD')
+            credentials[role] = (email, password)
+        try:
+            tokens.update(obtain_tokens(base_url, credentials, options['timeout']))
+        except (ValueError, requests.RequestException) as error:
+            raise CommandError(error)
+
+        missing_roles = {record.role for record in records} - set(tokens) - {ANONYMOUS}
+        if missing_roles:
+            raise CommandError(f'No token or credentials of roles: {", ".join(sorted(missing_roles))}')
+
+        self.stdout.write(f'Replaying {len(records)} requests against {base_url}')
+        replayer = TrafficReplayer(base_url, options['concurrency'], tokens, options['timeout'])
+        results, elapsed = replayer.replay(records, schedule)
+        reports = summarize(results, elapsed)
+
+        lags = sorted(result.lag for result in results)
+        self._write_table(reports, options['verbosity'])
+        self.stdout.write(f'{len(results)} requests in {elapsed:.2f} s, {len(results) / elapsed:.2f} requests/s, '
+                          f'max lag behind schedule {lags[-1] * 1000:.1f} ms')
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump({
+                    'requests': len(results),
+                    'elapsed_seconds': round(elapsed, 3),
+                    'throughput': round(len(results) / elapsed, 2),
+                    'max_lag_ms': round(lags[-1] * 1000, 3),
+                    'routes': {route: report._asdict() for route, report in reports.items()},
+                }, output_file, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+    @staticmethod
+    def _parse_pairs(values, option: str):
+        pairs = {}
+        for value in values:
+            role, separator, secret = value.partition('=')
+            if not separator or not role or not secret:
+                raise CommandError(f'{option} must be in form ROLE=VALUE')
+            pairs[role] = secret
+        return pairs
+
+    def _write_table(self, reports, verbosity: int):
+        self.stdout.write(f'{"route":<52}{"requests":>9}{"req/s":>9}{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}'
+                          f'{"p99 ms":>9}')
+        for route, report in reports.items():
+            line = (f'{route:<52}{report.requests:>9}{report.throughput:>9.2f}{report.error_rate:>8.1%}'
+                    f'{report.p50_ms:>9.2f}{report.p95_ms:>9.2f}{report.p99_ms:>9.2f}')
+            self.stdout.write(self.style.ERROR(line) if report.errors else line)
+            if verbosity > 1:
+                histogram = ', '.join(f'<={bound} ms: {total}' for bound, total in report.histogram.items() if total)
+                self.stdout.write(f'    {histogram}')
@@ -3,18 +3,20 @@ from typing import Union
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from api.exceptions import ForbiddenException, UnauthorizedException
-from blog.dto import PostDTO, CommentDTO
+from blog.dto import PostDTO, CommentDTO, OwnerDTO
 
 
 class JWTPermissionValidator:
     @classmethod
     def validate_jwt_authentication_or_raise(cls, request):
-        """Check jwt token and authenticate"""
+        """Check jwt token and authenticate, user authenticated by view is reused without loading it again"""
         jwt_auth = JWTAuthentication()
         header = jwt_auth.get_header(request)
         if header is None:
             raise UnauthorizedException()
 
+        if request.user.is_authenticated:
+            return request.user, request.auth
         return jwt_auth.authenticate(request)
 
     @classmethod
@@ -25,7 +27,7 @@ class JWTPermissionValidator:
             raise ForbiddenException("only superuser allow")
 
     @classmethod
-    def is_superuser_or_object_author_or_raise(cls, request, object_dto: Union[PostDTO, CommentDTO]):
+    def is_superuser_or_object_author_or_raise(cls, request, object_dto: Union[PostDTO, CommentDTO, OwnerDTO]):
         """Check permission to only allow post author or superuser to update object."""
         user, _ = cls.validate_jwt_authentication_or_raise(request)
         if not (object_dto.author_id == user.id or user.is_superuser):
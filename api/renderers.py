@@ -0,0 +1,60 @@
+import json
+from json.encoder import encode_basestring
+from typing import Any
+
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+from api.encoders import DTOPayload
+
+
+class DTOJSONRenderer(JSONRenderer):
+    """JSONRenderer which writes DTOPayload values with compiled DTO encoders.
+
+    Compact output is built as one string without intermediate dicts, other values are
+    encoded exactly like JSONRenderer does. Indented output (browsable API, indent media type
+    parameter) falls back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(self._to_primitive(data), accepted_media_type, renderer_context)
+
+        ret = self._encode(data)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+    def _encode(self, value: Any) -> str:
+        if isinstance(value, str):
+            return encode_basestring(value)
+        if value is None:
+            return 'null'
+        if value is True:
+            return 'true'
+        if value is False:
+            return 'false'
+        if isinstance(value, int):
+            return int.__repr__(value)
+        if isinstance(value, DTOPayload):
+            return value.encode()
+        if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+            return '{' + ','.join([encode_basestring(key) + ':' + self._encode(item)
+                                   for key, item in value.items()]) + '}'
+        if isinstance(value, (list, tuple)):
+            return '[' + ','.join([self._encode(item) for item in value]) + ']'
+        return json.dumps(value, cls=self.encoder_class, ensure_ascii=self.ensure_ascii,
+                          allow_nan=not self.strict, separators=SHORT_SEPARATORS)
+
+    def _to_primitive(self, value: Any) -> Any:
+        if isinstance(value, DTOPayload):
+            return value.to_primitive()
+        if isinstance(value, dict):
+            return {key: self._to_primitive(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._to_primitive(item) for item in value]
+        return value
@@ -0,0 +1,202 @@
+import json
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from django.urls import Resolver404, resolve, reverse
+
+from api.benchmarks import percentile
+from core.metrics import LATENCY_BUCKETS
+
+ANONYMOUS = 'anonymous'
+
+
+class RecordedRequest(NamedTuple):
+    method: str
+    path: str
+    query: str
+    body: Optional[Any]
+    role: str
+    offset: Optional[float]
+
+
+class ReplayResult(NamedTuple):
+    route: str
+    status: int
+    duration: float
+    lag: float
+
+
+class RouteReport(NamedTuple):
+    requests: int
+    errors: int
+    error_rate: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    statuses: Dict[str, int]
+    histogram: Dict[str, int]
+
+
+def read_recorded_requests(lines: Iterable[str]) -> List[RecordedRequest]:
+    """Parse JSONL with one request per line.
+
+    Line is object with method and path and optional query (string or object), body, role
+    (anonymous by default) and timestamp (seconds or ISO 8601). Offset of request is time from
+    the earliest timestamp, None when request has no timestamp.
+    """
+    records = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            method = record['method'].lower()
+            path = record['path']
+            timestamp = record.get('timestamp')
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f'Invalid recorded request on line {number}: {error!r}')
+
+        query = record.get('query') or ''
+        if isinstance(query, dict):
+            query = urlencode(query, doseq=True)
+        records.append(RecordedRequest(method=method, path=path, query=query.lstrip('?'), body=record.get('body'),
+                                       role=record.get('role') or ANONYMOUS, offset=timestamp))
+
+    timestamps = [record.offset for record in records if record.offset is not None]
+    start = min(timestamps, default=0)
+    return [record if record.offset is None else record._replace(offset=record.offset - start)
+            for record in records]
+
+
+def get_schedule(records: List[RecordedRequest], rate: Optional[float] = None,
+                 speed: Optional[float] = None) -> List[float]:
+    """Return send time of every request in seconds from start of replay.
+
+    With speed requests keep recorded timing divided by speed, with rate requests are sent
+    evenly rate per second, otherwise all requests are sent as fast as workers can.
+    """
+    if speed is not None:
+        if any(record.offset is None for record in records):
+            raise ValueError('Recorded timing needs timestamp in every recorded request')
+        return [record.offset / speed for record in records]
+    if rate is not None:
+        return [index / rate for index in range(len(records))]
+    return [0.0] * len(records)
+
+
+def get_route(path: str) -> str:
+    """Return name of url pattern of path, so requests to the same route with other ids are grouped"""
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        return path
+
+
+def obtain_tokens(base_url: str, credentials: Dict[str, Tuple[str, str]], timeout: float) -> Dict[str, str]:
+    """Return JWT access tokens of roles obtained with email and password"""
+    tokens = {}
+    for role, (email, password) in credentials.items():
+        response = requests.post(base_url + reverse('api:token_obtain_pair'),
+                                 json={'email': email, 'password': password}, timeout=timeout)
+        if response.status_code != 200:
+            raise ValueError(f'Can not obtain token of role {role}: {response.status_code} {response.text[:200]}')
+        tokens[role] = response.json()['access']
+    return tokens
+
+
+class TrafficReplayer:
+    """Replayer of recorded requests against running server.
+
+    Main thread releases requests at their scheduled time to worker threads, each worker has
+    its own HTTP session. Lag is delay of sending behind schedule, it grows when workers can not
+    keep up with schedule. Connection errors are results with status 0.
+    """
+
+    def __init__(self, base_url: str, concurrency: int, tokens: Dict[str, str], timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.tokens = tokens
+        self.timeout = timeout
+
+    def replay(self, records: List[RecordedRequest], schedule: List[float]) -> Tuple[List[ReplayResult], float]:
+        """Send requests, return results in order of completion and elapsed seconds"""
+        pending = queue.Queue(maxsize=self.concurrency * 2)
+        results = []
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def work():
+            with requests.Session() as session:
+                while (item := pending.get()) is not None:
+                    record, scheduled = item
+                    result = self._send(session, record, start + scheduled)
+                    with lock:
+                        results.append(result)
+
+        workers = [threading.Thread(target=work, daemon=True) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for record, scheduled in sorted(zip(records, schedule), key=lambda item: item[1]):
+            delay = start + scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pending.put((record, scheduled))
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+        return results, time.perf_counter() - start
+
+    def _send(self, session: requests.Session, record: RecordedRequest, scheduled: float) -> ReplayResult:
+        url = self.base_url + record.path + (f'?{record.query}' if record.query else '')
+        headers = {'Authorization': f'Bearer {self.tokens[record.role]}'} if record.role in self.tokens else {}
+        sent = time.perf_counter()
+        try:
+            response = session.request(record.method, url, json=record.body, headers=headers, timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = 0
+        return ReplayResult(route=f'{record.method.upper()} {get_route(record.path)}', status=status,
+                            duration=time.perf_counter() - sent, lag=max(sent - scheduled, 0.0))
+
+
+def get_histogram(durations: List[float]) -> Dict[str, int]:
+    """Count durations by latency buckets of metrics, keys are upper bounds in milliseconds"""
+    counts = Counter(bisect_left(LATENCY_BUCKETS, duration) for duration in durations)
+    bounds = [f'{bound * 1000:g}' for bound in LATENCY_BUCKETS] + ['+Inf']
+    return {bound: counts[index] for index, bound in enumerate(bounds)}
+
+
+def summarize(results: List[ReplayResult], elapsed: float) -> Dict[str, RouteReport]:
+    """Aggregate results by route, throughput is requests per second of whole replay"""
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result.route].append(result)
+
+    reports = {}
+    for route, route_results in sorted(by_route.items()):
+        durations = [result.duration for result in route_results]
+        durations_ms = [duration * 1000 for duration in durations]
+        errors = sum(1 for result in route_results if result.status == 0 or result.status >= 400)
+        reports[route] = RouteReport(
+            requests=len(route_results),
+            errors=errors,
+            error_rate=round(errors / len(route_results), 4),
+            throughput=round(len(route_results) / elapsed, 2) if elapsed else 0.0,
+            p50_ms=round(percentile(durations_ms, 50), 3),
+            p95_ms=round(percentile(durations_ms, 95), 3),
+            p99_ms=round(percentile(durations_ms, 99), 3),
+            statuses={str(status): total for status, total in sorted(Counter(r.status for r in route_results).items())},
+            histogram=get_histogram(durations),
+        )
+    return reports
@@ -0,0 +1,41 @@
+from json.encoder import encode_basestring
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from django.http import StreamingHttpResponse
+
+from api.encoders import DTOEncoder
+
+
+class StreamingDTOResponse(StreamingHttpResponse):
+    """Stream {"<key>": [...]} JSON object, DTOs are encoded and sent batch by batch.
+
+    Output is the same as DTOJSONRenderer renders for {"<key>": DTOPayload(dtos)}, but memory
+    does not grow with number of DTOs when dtos is a lazy iterator.
+    """
+    BATCH_SIZE = 100
+
+    def __init__(self, key: str, dtos: Iterable[Any], fields: Optional[Sequence[str]] = None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(self._stream(key, dtos, fields), **kwargs)
+
+    def _stream(self, key: str, dtos: Iterable[Any], fields: Optional[Sequence[str]]) -> Iterator[bytes]:
+        yield ('{' + encode_basestring(key) + ':[').encode()
+
+        encode = None
+        batch = []
+        separator = ''
+        for dto in dtos:
+            if encode is None:
+                encode = DTOEncoder.for_type(type(dto), fields).encode
+            batch.append(encode(dto))
+            if len(batch) == self.BATCH_SIZE:
+                yield self._chunk(separator + ','.join(batch))
+                separator = ','
+                batch = []
+        if batch:
+            yield self._chunk(separator + ','.join(batch))
+
+        yield b']}'
+
+    def _chunk(self, content: str) -> bytes:
+        return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
@@ -21,7 +21,20 @@ comments_response_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={
         "post_comments": openapi.Schema(type=openapi.TYPE_ARRAY, items=comment_dto_schema,
-                                        description="List of post comments")
+                                        description="Page of post comments, newest first"),
+        "prev_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has previous page"),
+        "next_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has next page"),
+        "prev_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="Cursor of previous page",
+                                      x_nullable=True),
+        "next_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="Cursor of next page",
+                                      x_nullable=True),
+    }
+)
+
+comment_reactions_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "comment": comment_dto_schema,
     }
 )
 
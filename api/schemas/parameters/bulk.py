@@ -0,0 +1,9 @@
+from drf_yasg import openapi
+
+post_ids_parameter = openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                description="Return posts with listed ids (comma-separated list) in the same order "
+                            "instead of page of posts, ids of missing posts are returned in missing_ids",
+                type=openapi.TYPE_STRING,
+            )
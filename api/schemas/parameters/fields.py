@@ -0,0 +1,9 @@
+from drf_yasg import openapi
+
+post_fields_parameter = openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Return only listed post fields (comma-separated list), "
+                            "use excerpt instead of content to skip loading post bodies",
+                type=openapi.TYPE_STRING,
+            )
@@ -20,3 +20,10 @@ period_filter_parameter = openapi.Parameter(
                 description="Filter by period (day, week, month)",
                 type=openapi.TYPE_STRING,
             )
+
+search_filter_parameter = openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Full text search in title and content, results are ordered by relevance",
+                type=openapi.TYPE_STRING,
+            )
@@ -11,9 +11,32 @@ page_param = openapi.Parameter(
 page_size_param = openapi.Parameter(
     "page_size",
     openapi.IN_QUERY,
-    description="Number of items per page",
+    description="Number of items per page, at most 100",
     type=openapi.TYPE_INTEGER,
     default=4,
 )
 
+comments_page_size_param = openapi.Parameter(
+    "page_size",
+    openapi.IN_QUERY,
+    description="Number of comments per page, at most 100",
+    type=openapi.TYPE_INTEGER,
+    default=20,
+)
+
+cursor_param = openapi.Parameter(
+    "cursor",
+    openapi.IN_QUERY,
+    description="Cursor of page (next_cursor or prev_cursor), pass empty value to get first page in cursor mode",
+    type=openapi.TYPE_STRING,
+)
+
+posts_page_size_param = openapi.Parameter(
+    "page_size",
+    openapi.IN_QUERY,
+    description="Number of posts per page, at most 100",
+    type=openapi.TYPE_INTEGER,
+    default=20,
+)
+
 pagination_parameters = [page_param, page_size_param]
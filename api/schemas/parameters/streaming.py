@@ -0,0 +1,9 @@
+from drf_yasg import openapi
+
+stream_parameter = openapi.Parameter(
+                "stream",
+                openapi.IN_QUERY,
+                description="Stream response in chunks instead of building it in memory (true or false)",
+                type=openapi.TYPE_BOOLEAN,
+                default=False,
+            )
@@ -0,0 +1,16 @@
+from drf_yasg import openapi
+
+tag_prefix_parameter = openapi.Parameter(
+    "prefix",
+    openapi.IN_QUERY,
+    description="Only tags which names start with prefix, case insensitive",
+    type=openapi.TYPE_STRING,
+)
+
+tag_limit_parameter = openapi.Parameter(
+    "limit",
+    openapi.IN_QUERY,
+    description="Number of tags with most posts, at most 500",
+    type=openapi.TYPE_INTEGER,
+    default=50,
+)
@@ -9,6 +9,7 @@ post_schema = openapi.Schema(
         "author": openapi.Schema(type=openapi.TYPE_STRING, description="Author name"),
         "author_id": openapi.Schema(type=openapi.TYPE_INTEGER, description="Author ID"),
         "content": openapi.Schema(type=openapi.TYPE_STRING, description="Post content"),
+        "excerpt": openapi.Schema(type=openapi.TYPE_STRING, description="Short preview of post content"),
         "publish": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, description="Publish date"),
         "post_image_url": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI,
                                          description="Post image URL"),
@@ -28,7 +29,11 @@ posts_response_schema = openapi.Schema(
         "pages": openapi.Schema(type=openapi.TYPE_INTEGER, description="Total posts pages"),
         "current_page": openapi.Schema(type=openapi.TYPE_INTEGER, description="Current page"),
         "prev_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has previously page"),
-        "next_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has next page")
+        "next_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has next page"),
+        "next_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="Cursor of next page (cursor mode)"),
+        "prev_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="Cursor of previous page (cursor mode)"),
+        "missing_ids": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                                      description="Requested ids without published post (ids mode)"),
     },
 )
 
@@ -55,6 +60,47 @@ created_post_response_schema = openapi.Schema(
     },
 )
 
+bulk_new_posts_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "posts": openapi.Schema(type=openapi.TYPE_ARRAY, items=new_post_request_schema,
+                                description="New posts, at most POST_BULK_CREATE_MAX_POSTS"),
+    },
+    required=["posts"],
+)
+
+bulk_created_posts_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "created": openapi.Schema(type=openapi.TYPE_INTEGER, description="Number of created posts"),
+        "results": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "index": openapi.Schema(type=openapi.TYPE_INTEGER, description="Index of post in request"),
+                    "post": post_schema,
+                    "errors": openapi.Schema(type=openapi.TYPE_OBJECT, description="Validation errors of post"),
+                },
+            ),
+            description="Result of every requested post, in request order"),
+    },
+)
+
+post_reactions_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "post": openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "id": openapi.Schema(type=openapi.TYPE_INTEGER, description="Post ID"),
+                "likes_count": openapi.Schema(type=openapi.TYPE_INTEGER, description="Number of likes"),
+                "dislikes_count": openapi.Schema(type=openapi.TYPE_INTEGER, description="Number of dislikes"),
+            },
+        ),
+    },
+)
+
 partial_post_request_schema = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={
@@ -71,3 +117,13 @@ partial_post_request_schema = openapi.Schema(
     },
     required=[]
 )
+
+timeline_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "posts": openapi.Schema(type=openapi.TYPE_ARRAY, items=post_schema),
+        "prev_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has previously page"),
+        "next_page": openapi.Schema(type=openapi.TYPE_BOOLEAN, description="Has next page"),
+        "next_cursor": openapi.Schema(type=openapi.TYPE_STRING, description="Cursor of next page"),
+    },
+)
@@ -0,0 +1,16 @@
+from drf_yasg import openapi
+
+tag_stat_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "name": openapi.Schema(type=openapi.TYPE_STRING, description="Tag name"),
+        "posts_count": openapi.Schema(type=openapi.TYPE_INTEGER, description="Number of published posts with tag"),
+    },
+)
+
+tag_stats_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "tags": openapi.Schema(type=openapi.TYPE_ARRAY, items=tag_stat_schema),
+    },
+)
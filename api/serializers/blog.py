@@ -1,3 +1,6 @@
+from typing import List, Optional
+
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -37,6 +40,7 @@ class PostDTOSerializer(serializers.Serializer):
     author = serializers.CharField()
     author_id = serializers.IntegerField()
     content = serializers.CharField()
+    excerpt = serializers.CharField()
     publish = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     post_image_url = serializers.URLField()
     category = serializers.CharField()
@@ -45,6 +49,13 @@ class PostDTOSerializer(serializers.Serializer):
     dislikes_count = serializers.IntegerField()
     tags = serializers.ListSerializer(child=serializers.CharField())
 
+    def __init__(self, *args, fields: Optional[List[str]] = None, **kwargs):
+        """Serialize only requested fields, all fields by default"""
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
     def create(self, validated_data):
         raise NotImplementedError('Method not implemented')
 
@@ -81,6 +92,17 @@ class NewPostDTOSerializer(serializers.Serializer):
         raise NotImplementedError('Method not implemented')
 
 
+class BulkNewPostsSerializer(serializers.Serializer):
+    posts = serializers.ListField(child=serializers.DictField(), allow_empty=False,
+                                  max_length=settings.POST_BULK_CREATE_MAX_POSTS)
+
+    def create(self, validated_data):
+        raise NotImplementedError('Method not implemented')
+
+    def update(self, instance, validated_data):
+        raise NotImplementedError('Method not implemented')
+
+
 class PartialPostDTOSerializer(serializers.Serializer):
     title = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     content = serializers.CharField(required=False, allow_blank=True, allow_null=True)
@@ -1,3 +1,563 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
 
-# Create your tests here.
+from dependency_injector import containers, providers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import ActivationToken, PasswordResetToken, Profile
+
+from api import urls as api_urls
+from api.benchmarks import SCENARIOS, BenchmarkRunner, Regression, find_regressions, get_uncovered_routes, percentile
+from api.encoders import DTOEncoder, DTOPayload
+from api.replay import RecordedRequest, ReplayResult, get_route, get_schedule, read_recorded_requests, summarize
+from api.renderers import DTOJSONRenderer
+from api.responses import StreamingDTOResponse
+from api.serializers.blog import CategoryDTOSerializer, CommentDTOSerializer, PostDTOSerializer
+from api.views.blog import ApiPostListView
+from blog.dto import CategoryDTO, CommentDTO, PostDTO
+from blog.models import Category, Comment, Post
+from blog.repositories import CategoryRepository
+from blog.reactions import DISLIKE, LIKE
+from blog.registries import CategoryRegistry
+from blog.seeding import BlogSeeder, SeedVolumes
+from blog.services import CommentService
+from blog.testing import MemoryReactionBuffer
+from core.containers import RedisContainer, RegistryContainer, ServiceContainer
+from core.metrics import instrument_container
+from core.queries import count_queries
+from core.testing import QueryBudgetTestCase
+
+User = get_user_model()
+
+
+class DTOJSONRendererTest(SimpleTestCase):
+    """Compiled encoders must produce the same bytes as DTO serializers"""
+
+    def setUp(self):
+        self.posts = [
+            PostDTO(id=1, title='Plain "quoted" title\\', slug='plain', author='alice', author_id=1,
+                    content='Line\nbreak\ttab \u2028 separator', excerpt='Line break', publish=datetime(
+                        2023, 5, 1, 22, 30, 15, 123, tzinfo=dt_timezone.utc),
+                    post_image_url=None, category='Café ☕', category_id=3, likes_count=10, dislikes_count=0,
+                    tags=['python', 'юнікод', '😀']),
+            PostDTO(id=2, title='Naive', slug='naive', author='bob', author_id=2, content='', excerpt='',
+                    publish=datetime(2023, 1, 1, 0, 0), post_image_url='https://example.com/a.png',
+                    category='News', category_id=4, likes_count=0, dislikes_count=5, tags=[]),
+        ]
+        self.comments = [
+            CommentDTO(id=1, body='Nice </script>', post_id=1, author='alice', author_id=1,
+                       created=datetime(2023, 5, 1, 10, 0, tzinfo=dt_timezone.utc),
+                       updated=datetime(2023, 5, 2, 10, 0, tzinfo=dt_timezone.utc), likes=1, dislikes=2),
+        ]
+        self.categories = [CategoryDTO(id=1, name='Ünïcode', slug='unicode'), CategoryDTO(id=2, name='B', slug='b')]
+
+    def assertSameBytes(self, serialized_data, payload_data, **render_kwargs):
+        self.assertEqual(JSONRenderer().render(serialized_data, **render_kwargs),
+                         DTOJSONRenderer().render(payload_data, **render_kwargs))
+
+    def test_posts(self):
+        self.assertSameBytes(
+            {'posts': PostDTOSerializer(self.posts, many=True).data, 'pages': 2, 'next_cursor': None},
+            {'posts': DTOPayload(self.posts), 'pages': 2, 'next_cursor': None},
+        )
+
+    def test_post_fields(self):
+        fields = ['tags', 'id', 'publish']
+        self.assertSameBytes(
+            {'post': PostDTOSerializer(self.posts[0], fields=fields).data},
+            {'post': DTOPayload(self.posts[0], fields)},
+        )
+
+    def test_encoder_cache(self):
+        encoder = DTOEncoder.for_type(PostDTO, ['tags', 'id'])
+        self.assertIs(DTOEncoder.for_type(PostDTO, ['id', 'tags', 'id', 'unknown']), encoder)
+        self.assertEqual(encoder.fields, ['id', 'tags'])
+        self.assertIs(DTOEncoder.for_type(PostDTO, PostDTO._fields[::-1]), DTOEncoder.for_type(PostDTO))
+
+    def test_comments(self):
+        self.assertSameBytes(
+            {'post_comments': CommentDTOSerializer(self.comments, many=True).data},
+            {'post_comments': DTOPayload(self.comments)},
+        )
+
+    def test_categories(self):
+        self.assertSameBytes(
+            {'categories': CategoryDTOSerializer(self.categories, many=True).data, 'empty': []},
+            {'categories': DTOPayload(self.categories), 'empty': DTOPayload([])},
+        )
+
+    def test_indented(self):
+        self.assertSameBytes(
+            {'posts': PostDTOSerializer(self.posts, many=True).data},
+            {'posts': DTOPayload(self.posts)},
+            accepted_media_type='application/json; indent=4',
+        )
+
+
+class PostListParametersTest(TestCase):
+    """Post list must cap page size and reject cursor combined with orderings"""
+    POSTS = 101
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                        last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        Post.objects.bulk_create(
+            Post(title=f'Post {i}', slug=f'post-{i}', author=user, category=category, body='Body',
+                 status='published', tag_names=['python'])
+            for i in range(cls.POSTS)
+        )
+
+    def setUp(self):
+        cache.clear()
+        RedisContainer.reaction_buffer.override(providers.Object(MemoryReactionBuffer()))
+        self.addCleanup(RedisContainer.reaction_buffer.reset_override)
+        self.url = reverse('api:api-blog-post-list')
+
+    def test_page_size(self):
+        self.assertEqual(len(self.client.get(self.url).json()['posts']), ApiPostListView.PAGE_SIZE)
+        response = self.client.get(self.url, {'page': 3, 'page_size': 10}).json()
+        self.assertEqual((len(response['posts']), response['current_page']), (10, 3))
+        response = self.client.get(self.url, {'page': 'x', 'page_size': 1000}).json()
+        self.assertEqual((len(response['posts']), response['current_page']), (ApiPostListView.MAX_PAGE_SIZE, 1))
+
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 1000}).json()
+        self.assertEqual(len(response['posts']), ApiPostListView.MAX_PAGE_SIZE)
+        # page size is read from page_size like in other paginated views, unknown per_page is ignored
+        self.assertEqual(len(self.client.get(self.url, {'per_page': 1000}).json()['posts']), ApiPostListView.PAGE_SIZE)
+
+    def test_cursor_with_ordering(self):
+        next_cursor = self.client.get(self.url, {'cursor': '', 'page_size': 1}).json()['next_cursor']
+        for params in ({'tags': 'python'}, {'q': 'post'}):
+            response = self.client.get(self.url, {'cursor': next_cursor, **params})
+            self.assertEqual(response.status_code, 400, response.content)
+
+
+class ViewQueryBudgetTest(QueryBudgetTestCase):
+    """Views must stay within their query budgets, views which need Redis or broker are not requested"""
+    PASSWORD = 'Str0ng!Passw0rd'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin@example.com', username='admin', first_name='First',
+                                                  last_name='Last', password=cls.PASSWORD)
+        cls.category = Category.objects.create(name='Category', slug='category')
+        cls.posts = Post.objects.bulk_create(
+            Post(title=f'Post {i}', slug=f'post-{i}', author=cls.admin, category=cls.category, body='Body',
+                 status='published', tag_names=['python'])
+            for i in range(2)
+        )
+        cls.comments = Comment.objects.bulk_create(
+            Comment(post=cls.posts[0], author=cls.admin, body=f'Comment {i}') for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.auth_headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.admin).access_token}'}
+
+    def assertRequestWithinBudget(self, method: str, url: str, expected_status: int, data=None, **headers):
+        response = getattr(self.client, method)(url, data, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, expected_status, response.content)
+        self.assertWithinQueryBudget(response)
+        self.assertEqual(response['X-DB-Query-Count'], str(response.wsgi_request.query_stats.count))
+        return response
+
+    def test_categories(self):
+        self.assertRequestWithinBudget('get', reverse('api:api-blog-category-list'), 200)
+        self.assertRequestWithinBudget('post', reverse('api:api-blog-category-list'), 201, {'name': 'New'},
+                                       **self.auth_headers)
+        url = reverse('api:api-blog-category-detail', args=[self.category.id])
+        self.assertRequestWithinBudget('get', url, 200)
+        self.assertRequestWithinBudget('put', url, 200, {'name': 'Renamed'}, **self.auth_headers)
+        self.assertRequestWithinBudget('delete', url, 204, **self.auth_headers)
+
+    def test_tags(self):
+        self.assertRequestWithinBudget('get', reverse('api:api-blog-tag-list'), 200)
+
+    def test_deletes(self):
+        post, other_post = self.posts
+        self.assertRequestWithinBudget(
+            'delete', reverse('api:api-blog-post-comments-detail', args=[post.id, self.comments[0].id]), 204,
+            **self.auth_headers)
+        self.assertRequestWithinBudget('delete', reverse('api:api-blog-post-detail', args=[post.id]), 204,
+                                       **self.auth_headers)
+        self.assertRequestWithinBudget('delete', reverse('api:api-blog-post-detail', args=[other_post.id]), 204,
+                                       **self.auth_headers)
+
+    def test_auth(self):
+        user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                        last_name='Last', password=self.PASSWORD, is_active=False)
+        Profile.objects.create(user=user, avatar='https://example.com/avatar.png', gender='male',
+                               date_of_birth=date(1990, 1, 1), bio='Bio', info='Info')
+        ActivationToken.objects.create(user=user, token='activation')
+        self.assertRequestWithinBudget('post', reverse('api:api-activate-user'), 200,
+                                       {'email': user.email, 'token': 'activation'})
+
+        PasswordResetToken.objects.create(user=user, token='reset')
+        self.assertRequestWithinBudget('post', reverse('api:api-password-reset'), 200,
+                                       {'email': user.email, 'token': 'reset', 'new_password': 'An0ther!Passw0rd'})
+
+        response = self.assertRequestWithinBudget('post', reverse('api:token_obtain_pair'), 200,
+                                                  {'email': user.email, 'password': 'An0ther!Passw0rd'})
+        self.assertRequestWithinBudget('post', reverse('api:token_refresh'), 200,
+                                       {'refresh': response.json()['refresh']})
+
+
+class ConditionalGetTest(TestCase):
+    """ETag of post and comments must change with everything rendered in them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                            last_name='Last', password='password')
+        cls.category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(title='Post', slug='post', author=cls.user, category=cls.category,
+                                       body='Body', status='published')
+        Comment.objects.create(post=cls.post, author=cls.user, body='Comment')
+
+    def setUp(self):
+        cache.clear()
+        RedisContainer.reaction_buffer.override(providers.Object(MemoryReactionBuffer()))
+        self.addCleanup(RedisContainer.reaction_buffer.reset_override)
+
+    def assertConditionalGet(self, url: str, change, field: str, expected: str):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'"{field}":"{expected}"', response.content.decode().replace(' ', ''))
+
+    def test_post_category_renamed(self):
+        self.assertConditionalGet(
+            reverse('api:api-blog-post-detail', args=[self.post.id]),
+            lambda: ServiceContainer.category_service().update_category(
+                CategoryDTO(id=self.category.id, name='Renamed', slug='renamed')),
+            'category', 'Renamed',
+        )
+
+    def test_post_author_renamed(self):
+        self.assertConditionalGet(reverse('api:api-blog-post-detail', args=[self.post.id]),
+                                  self._rename_user, 'author', 'renamed')
+
+    def test_comments_author_renamed(self):
+        self.assertConditionalGet(reverse('api:api-blog-post-comments-list', args=[self.post.id]),
+                                  self._rename_user, 'author', 'renamed')
+
+    def test_last_login_keeps_etag(self):
+        url = reverse('api:api-blog-post-comments-list', args=[self.post.id])
+        etag = self.client.get(url)['ETag']
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def _rename_user(self):
+        self.user.username = 'renamed'
+        self.user.save()
+
+
+class PostProjectionTest(TestCase):
+    """Field projections of post views must not load body and must reject unknown fields"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                        last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(title='Post', slug='post', author=user, category=category,
+                                       body='Long body ' * 100, status='published')
+        # excerpt differs from body, so response shows where it was read from
+        Post.objects.filter(pk=cls.post.id).update(excerpt='Stored excerpt')
+
+    def setUp(self):
+        cache.clear()
+        RedisContainer.reaction_buffer.override(providers.Object(MemoryReactionBuffer()))
+        self.addCleanup(RedisContainer.reaction_buffer.reset_override)
+
+    def assertProjection(self, url: str, key: str):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'fields': 'id,title,excerpt'})
+        self.assertEqual(response.status_code, 200, response.content)
+        post = response.json()[key]
+        self.assertEqual(post[0] if isinstance(post, list) else post,
+                         {'id': self.post.id, 'title': 'Post', 'excerpt': 'Stored excerpt'})
+
+        post_queries = [query['sql'] for query in context.captured_queries if '"blog_post"' in query['sql']]
+        self.assertTrue(any('"blog_post"."excerpt"' in sql for sql in post_queries), post_queries)
+        self.assertFalse([sql for sql in post_queries if '"blog_post"."body"' in sql])
+
+    def test_list(self):
+        self.assertProjection(reverse('api:api-blog-post-list'), 'posts')
+
+    def test_detail(self):
+        self.assertProjection(reverse('api:api-blog-post-detail', args=[self.post.id]), 'post')
+
+    def test_unknown_fields(self):
+        for url in (reverse('api:api-blog-post-list'), reverse('api:api-blog-post-detail', args=[self.post.id])):
+            response = self.client.get(url, {'fields': 'id,search_vector'})
+            self.assertEqual(response.status_code, 400, response.content)
+            self.assertIn('search_vector', response.content.decode())
+
+
+class RecordingReactionBuffer(MemoryReactionBuffer):
+    """Memory reaction buffer which records ids of every pending deltas read"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_ids = []
+
+    def get_pending_deltas(self, target, target_ids):
+        self.requested_ids.append(list(target_ids))
+        return super().get_pending_deltas(target, target_ids)
+
+
+class PostCommentsStreamTest(TestCase):
+    """Streamed comments must be the same JSON as comments page, with pending reactions added by chunks"""
+    COMMENTS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                            last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(title='Post', slug='post', author=cls.user, category=category,
+                                       body='Body', status='published')
+        cls.comments = [Comment.objects.create(post=cls.post, author=cls.user, body=f'Comment \u2028 {i}',
+                                               likes_count=i)
+                        for i in range(cls.COMMENTS)]
+
+    def setUp(self):
+        cache.clear()
+        self.buffer = RecordingReactionBuffer(deltas={
+            self.comments[0].id: {LIKE: 2, DISLIKE: 1},
+            self.comments[-1].id: {LIKE: -1, DISLIKE: 0},
+        })
+        RedisContainer.reaction_buffer.override(providers.Object(self.buffer))
+        self.addCleanup(RedisContainer.reaction_buffer.reset_override)
+        for cls, name in ((CommentService, 'REACTIONS_CHUNK_SIZE'), (StreamingDTOResponse, 'BATCH_SIZE')):
+            self.addCleanup(setattr, cls, name, getattr(cls, name))
+            setattr(cls, name, 2)
+
+    def test_stream_matches_page(self):
+        url = reverse('api:api-blog-post-comments-list', args=[self.post.id])
+        page = self.client.get(url, {'page_size': self.COMMENTS}).json()
+
+        self.buffer.requested_ids.clear()
+        response = self.client.get(url, {'stream': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), {'post_comments': page['post_comments']})
+
+        comment_ids = [comment.id for comment in reversed(self.comments)]
+        # post existence check reads post without counters
+        self.assertEqual([ids for ids in self.buffer.requested_ids if ids],
+                         [comment_ids[:2], comment_ids[2:4], comment_ids[4:]])
+        comments = {comment['id']: comment for comment in page['post_comments']}
+        self.assertEqual((comments[self.comments[0].id]['likes'], comments[self.comments[0].id]['dislikes']), (2, 1))
+        self.assertEqual(comments[self.comments[-1].id]['likes'], self.COMMENTS - 2)
+
+
+class QueryStatsTest(TestCase):
+    """Repeated query shapes must be reported with their call site"""
+
+    def test_repeated_queries(self):
+        categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}') for i in range(5)
+        )
+        with count_queries(repeat_threshold=5) as stats:
+            Category.objects.count()
+            for category in categories:
+                Category.objects.get(pk=category.id)
+
+        self.assertEqual(stats.count, 6)
+        self.assertEqual(list(stats.repeated_queries.values()), [5])
+        call_site, = stats.call_sites.values()
+        self.assertTrue(call_site.startswith('api/tests.py:'), call_site)
+        self.assertTrue(call_site.endswith('in test_repeated_queries'), call_site)
+
+
+class MetricsTest(TestCase):
+    """Layers must be timed only when metrics are enabled and exposed in Prometheus format"""
+
+    def test_instrument_container(self):
+        class Container(containers.DeclarativeContainer):
+            category_repository = providers.Factory(CategoryRepository)
+
+        instrument_container(Container, 'repository')
+        instrument_container(Container, 'repository')
+        labels = {'layer': 'repository', 'component': 'CategoryRepository', 'method': 'get_all_categories'}
+        calls = REGISTRY.get_sample_value('layer_call_duration_seconds_count', labels) or 0
+
+        repository = Container.category_repository()
+        self.assertEqual(repository.get_all_categories(), [])
+        self.assertEqual(REGISTRY.get_sample_value('layer_call_duration_seconds_count', labels), calls + 1)
+        self.assertIsInstance(repository._target, CategoryRepository)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_metrics_view(self):
+        cache.clear()
+        self.client.get(reverse('api:api-blog-category-list'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn('layer_call_duration_seconds_count{component="ApiCategoryListView",layer="view",method="GET"}',
+                      content)
+        self.assertIn('request_db_queries_count{method="GET",view="ApiCategoryListView"}', content)
+
+
+class BenchmarkTest(TestCase):
+    """Benchmark must cover every route and flag regressions against baseline"""
+    RESULT = {'p95_ms': 10.0, 'allocated_kib': 100.0, 'queries': 2, 'errors': 0}
+
+    def test_scenarios_cover_routes(self):
+        self.assertEqual(get_uncovered_routes(api_urls.urlpatterns, SCENARIOS), [])
+        names = [scenario.name for scenario in SCENARIOS]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_percentile(self):
+        self.assertEqual(percentile([5.0], 99), 5.0)
+        self.assertEqual(percentile([4.0, 1.0, 3.0, 2.0], 50), 2.5)
+        self.assertEqual(percentile(list(range(101)), 95), 95)
+
+    def test_find_regressions(self):
+        results = {
+            'GET slower': {**self.RESULT, 'p95_ms': 12.5},
+            'GET within threshold': {**self.RESULT, 'p95_ms': 11.9, 'allocated_kib': 119.0},
+            'GET more queries': {**self.RESULT, 'queries': 3},
+            'GET new': {**self.RESULT, 'errors': 1},
+        }
+        baseline = {name: self.RESULT for name in results if name != 'GET new'}
+
+        self.assertEqual(find_regressions(results, baseline, 0.2), [
+            Regression('GET slower', 'p95_ms', 10.0, 12.5),
+            Regression('GET more queries', 'queries', 2, 3),
+        ])
+
+    def test_run(self):
+        cache.clear()
+        BlogSeeder(seed=0, chunk_size=100, exponent=1.1, prefix='seed', password='password').seed(
+            SeedVolumes(users=10, categories=2, tags=5, posts=20, comments=20, post_reactions=0,
+                        comment_reactions=0, follows=0))
+        scenarios = [scenario for scenario in SCENARIOS if scenario.url_name in (
+            'api-blog-category-list', 'api-blog-category-detail', 'api-blog-tag-list', 'token_obtain_pair')]
+
+        results = BenchmarkRunner(iterations=3, warmup=1, memory_iterations=1, password='password').run(scenarios)
+
+        self.assertEqual(list(results), [scenario.name for scenario in scenarios])
+        for name, result in results.items():
+            self.assertEqual(result.errors, 0, name)
+            self.assertEqual(result.requests, 3, name)
+            self.assertLessEqual(result.p50_ms, result.p95_ms)
+            self.assertGreater(result.allocated_kib, 0)
+        self.assertEqual(results['GET api-blog-tag-list'].queries, 1)
+        self.assertEqual(results['POST api-blog-category-list'].queries, 4)
+        self.assertEqual(Category.objects.count(), 2)
+        # versions published by rolled back writes are dropped with the rest of cache
+        self.assertIsNone(cache.get(CategoryRegistry.VERSION_KEY))
+        self.assertEqual(len(RegistryContainer.category_registry().get_all_categories()), 2)
+
+
+class ReplayTest(SimpleTestCase):
+    """Recorded requests must be parsed, scheduled and aggregated by route"""
+
+    def test_read_recorded_requests(self):
+        records = read_recorded_requests([
+            '{"method": "GET", "path": "/api/v1/blog/posts/", "query": {"page": 2}, "timestamp": "2024-01-01T00:00:02Z"}',
+            '',
+            '{"method": "post", "path": "/api/v1/blog/categories/", "body": {"name": "New"}, "role": "admin", '
+            '"timestamp": "2024-01-01T00:00:01+00:00"}',
+            '{"method": "GET", "path": "/api/v1/blog/tags/", "query": "?prefix=py"}',
+        ])
+
+        self.assertEqual(records, [
+            RecordedRequest('get', '/api/v1/blog/posts/', 'page=2', None, 'anonymous', 1.0),
+            RecordedRequest('post', '/api/v1/blog/categories/', '', {'name': 'New'}, 'admin', 0.0),
+            RecordedRequest('get', '/api/v1/blog/tags/', 'prefix=py', None, 'anonymous', None),
+        ])
+        with self.assertRaisesMessage(ValueError, 'line 2'):
+            read_recorded_requests(['{"method": "GET", "path": "/"}', '{"path": "/"}'])
+
+    def test_get_schedule(self):
+        records = [RecordedRequest('get', '/', '', None, 'anonymous', offset) for offset in (0.0, 3.0, 1.0)]
+
+        self.assertEqual(get_schedule(records, speed=2), [0.0, 1.5, 0.5])
+        self.assertEqual(get_schedule(records, rate=4), [0.0, 0.25, 0.5])
+        self.assertEqual(get_schedule(records), [0.0, 0.0, 0.0])
+        with self.assertRaises(ValueError):
+            get_schedule(records + [records[0]._replace(offset=None)], speed=1)
+
+    def test_summarize(self):
+        results = [
+            ReplayResult('GET api:api-blog-post-detail', 200, 0.004, 0.0),
+            ReplayResult('GET api:api-blog-post-detail', 404, 0.02, 0.0),
+            ReplayResult('GET api:api-blog-post-detail', 0, 30.0, 0.0),
+        ]
+
+        report = summarize(results, elapsed=2.0)['GET api:api-blog-post-detail']
+        self.assertEqual(report.requests, 3)
+        self.assertEqual(report.errors, 2)
+        self.assertEqual(report.throughput, 1.5)
+        self.assertEqual(report.statuses, {'0': 1, '200': 1, '404': 1})
+        self.assertEqual(report.histogram['5'], 1)
+        self.assertEqual(report.histogram['25'], 1)
+        self.assertEqual(report.histogram['+Inf'], 1)
+        self.assertEqual(sum(report.histogram.values()), 3)
+        self.assertEqual(get_route('/api/v1/blog/posts/12'), 'api:api-blog-post-detail')
+
+
+class ReplayTrafficCommandTest(LiveServerTestCase):
+    """Recorded requests must be replayed against running server with tokens of their roles"""
+
+    def test_replay(self):
+        User.objects.create_superuser(email='admin@example.com', username='admin', first_name='First',
+                                      last_name='Last', password='Str0ng!Passw0rd')
+        lines = [
+            {'method': 'GET', 'path': '/api/v1/blog/categories/', 'timestamp': 0},
+            {'method': 'POST', 'path': '/api/v1/blog/categories/', 'body': {'name': 'Replayed'}, 'role': 'admin',
+             'timestamp': 0.05},
+            {'method': 'GET', 'path': '/api/v1/blog/categories/999999', 'timestamp': 0.1},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            records_path = os.path.join(directory, 'requests.jsonl')
+            output_path = os.path.join(directory, 'report.json')
+            with open(records_path, 'w') as records_file:
+                records_file.write('\n'.join(json.dumps(line) for line in lines))
+
+            call_command('replay_traffic', records_path, base_url=self.live_server_url, speed=1, concurrency=2,
+                         credentials=['admin=admin@example.com:Str0ng!Passw0rd'], output=output_path,
+                         stdout=StringIO())
+            with open(output_path) as output_file:
+                report = json.load(output_file)
+
+        self.assertEqual(report['requests'], 3)
+        self.assertEqual(report['routes']['POST api:api-blog-category-list']['statuses'], {'201': 1})
+        self.assertEqual(report['routes']['GET api:api-blog-category-detail']['errors'], 1)
+        self.assertTrue(Category.objects.filter(name='Replayed').exists())
+
+        with self.assertRaisesMessage(CommandError, 'roles: admin'):
+            with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as records_file:
+                records_file.write(json.dumps(lines[1]))
+                records_file.flush()
+                call_command('replay_traffic', records_file.name, base_url=self.live_server_url, stdout=StringIO())
@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from api.views import root
 from api.views import auth
 from api.views import blog
+from blog.reactions import LIKE, DISLIKE
 
 app_name = 'api'
 
@@ -19,10 +20,22 @@ urlpatterns = [
     path('jwt/token/refresh/', auth.JWTTokenRefreshView.as_view(), name='token_refresh'),
     path('blog/categories/', blog.ApiCategoryListView.as_view(), name='api-blog-category-list'),
     path('blog/categories/<int:category_id>', blog.ApiCategoryDetailView.as_view(), name='api-blog-category-detail'),
+    path('blog/tags/', blog.ApiTagListView.as_view(), name='api-blog-tag-list'),
     path('blog/posts/', blog.ApiPostListView.as_view(), name='api-blog-post-list'),
+    path('blog/timeline/', blog.ApiTimelineView.as_view(), name='api-blog-timeline'),
+    path('blog/posts/bulk/', blog.ApiPostBulkCreateView.as_view(), name='api-blog-post-bulk-create'),
+    path('blog/posts/trending/', blog.ApiTrendingPostsView.as_view(), name='api-blog-post-trending'),
     path('blog/posts/<int:post_id>', blog.ApiPostDetailView.as_view(), name='api-blog-post-detail'),
+    path('blog/posts/<int:post_id>/like', blog.ApiPostReactionView.as_view(reaction=LIKE),
+         name='api-blog-post-like'),
+    path('blog/posts/<int:post_id>/dislike', blog.ApiPostReactionView.as_view(reaction=DISLIKE),
+         name='api-blog-post-dislike'),
     path('blog/posts/<int:post_id>/comments', blog.ApiPostCommentsListView.as_view(),
          name='api-blog-post-comments-list'),
     path('blog/posts/<int:post_id>/comments/<int:comment_id>', blog.ApiPostCommentsDetailView.as_view(),
          name='api-blog-post-comments-detail'),
+    path('blog/posts/<int:post_id>/comments/<int:comment_id>/like', blog.ApiCommentReactionView.as_view(reaction=LIKE),
+         name='api-blog-post-comment-like'),
+    path('blog/posts/<int:post_id>/comments/<int:comment_id>/dislike',
+         blog.ApiCommentReactionView.as_view(reaction=DISLIKE), name='api-blog-post-comment-dislike'),
 ]
@@ -43,6 +43,7 @@ from api.views.base import ApiBaseView
 
 class JWTTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    QUERY_BUDGET = {'post': 1}
 
     @swagger_auto_schema(
         operation_description="Generate JWT access and refresh tokens by email and password",
@@ -57,6 +58,8 @@ class JWTTokenObtainPairView(TokenObtainPairView):
 
 
 class JWTTokenRefreshView(TokenRefreshView):
+    QUERY_BUDGET = {'post': 0}
+
     @swagger_auto_schema(
         operation_description="Generate a new JWT access token using the refresh token",
         request_body=TokenRefreshSerializer,
@@ -71,6 +74,7 @@ class JWTTokenRefreshView(TokenRefreshView):
 
 class ApiRegisterView(APIView, ApiBaseView):
     """Register user with profile"""
+    QUERY_BUDGET = {'post': 6}
 
     @swagger_auto_schema(
         operation_description="Register a new user with profile",
@@ -115,6 +119,7 @@ class ApiRegisterView(APIView, ApiBaseView):
 
 class ApiActivateUserView(APIView, ApiBaseView):
     """Activate user with token by email"""
+    QUERY_BUDGET = {'post': 7}
 
     @swagger_auto_schema(
         operation_description="Activate a user account",
@@ -155,6 +160,7 @@ class ApiActivateUserView(APIView, ApiBaseView):
 
 class ApiReactivateUserTokenView(APIView, ApiBaseView):
     """Create reactivation token"""
+    QUERY_BUDGET = {'post': 10}
 
     @swagger_auto_schema(
         operation_description="Reactivate user activation token",
@@ -197,6 +203,7 @@ class ApiReactivateUserTokenView(APIView, ApiBaseView):
 
 class ApiRequestPasswordResetView(APIView, ApiBaseView):
     """Create password reset token"""
+    QUERY_BUDGET = {'post': 8}
 
     @swagger_auto_schema(
         operation_description="Request to create reset password token via email",
@@ -238,6 +245,7 @@ class ApiRequestPasswordResetView(APIView, ApiBaseView):
 
 class ApiResetPasswordView(APIView, ApiBaseView):
     """Set new password using password reset token and email"""
+    QUERY_BUDGET = {'post': 8}
 
     @swagger_auto_schema(
         operation_description="Reset user password",
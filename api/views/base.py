@@ -1,8 +1,18 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import status
 from rest_framework.response import Response
 
 
 class ApiBaseView:
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
     def _create_response_for_invalid_serializers(self, *serializers):
         errors = {field: error for serializer in serializers for field, error in serializer.errors.items()}
         return Response(
@@ -18,3 +28,36 @@ class ApiBaseView:
         return Response(
             {"error": str(exception.message)},
             status=status.HTTP_404_NOT_FOUND)
+
+    def _get_fields_from_request(self, request) -> Optional[List[str]]:
+        fields = request.GET.get("fields")
+        if not fields:
+            return None
+        return list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip())) or None
+
+    def _get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.GET.get("page_size", self.PAGE_SIZE))
+        except ValueError:
+            page_size = self.PAGE_SIZE
+        return min(max(page_size, 1), self.MAX_PAGE_SIZE)
+
+    def _is_stream_requested(self, request) -> bool:
+        return request.GET.get("stream", "").lower() in ("1", "true")
+
+    def _get_validators(self, request, version: Any) -> Dict[str, str]:
+        """Return ETag header of representation built from request url and data version.
+
+        Last-Modified is not sent, counter updates, deletes and category renames do not change
+        any timestamp of representation, so If-Modified-Since alone would get stale 304.
+        """
+        payload = json.dumps([request.get_full_path(), version], default=str)
+        return {"ETag": quote_etag(hashlib.md5(payload.encode()).hexdigest())}
+
+    def _create_not_modified_response(self, request, validators: Dict[str, str]) -> Optional[HttpResponse]:
+        """Return 304 response if client already has actual representation, else None"""
+        response = get_conditional_response(request, etag=validators["ETag"])
+        if response is not None:
+            for header, value in validators.items():
+                response.headers[header] = value
+        return response
@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -16,32 +16,54 @@ from api.schemas.category_schema import (
 from api.schemas.comment_schema import (
     comments_response_schema,
     new_comment_schema,
-    comment_dto_schema
+    comment_dto_schema,
+    comment_reactions_response_schema
 )
+from api.schemas.tag_schema import tag_stats_response_schema
 from api.schemas.parameters.fillters import (
     author_filter_parameter,
     tags_filter_parameter,
-    period_filter_parameter
+    period_filter_parameter,
+    search_filter_parameter
 )
-from api.schemas.parameters.pagination import pagination_parameters
+from api.schemas.parameters.bulk import post_ids_parameter
+from api.schemas.parameters.fields import post_fields_parameter
+from api.schemas.parameters.pagination import (
+    pagination_parameters,
+    page_param,
+    cursor_param,
+    comments_page_size_param,
+    posts_page_size_param
+)
+from api.schemas.parameters.streaming import stream_parameter
+from api.schemas.parameters.tags import tag_prefix_parameter, tag_limit_parameter
 from api.schemas.post_schema import (
     posts_response_schema,
     new_post_request_schema,
     created_post_response_schema,
     post_schema,
-    partial_post_request_schema
+    partial_post_request_schema,
+    bulk_new_posts_request_schema,
+    bulk_created_posts_response_schema,
+    post_reactions_response_schema,
+    timeline_response_schema
 )
 from blog.exceptions import (
     CategoryAlreadyExistsError,
     CategoryDoesNotExistsError,
     PostDoesNotExistsError,
-    PostCommentDoesNotExistsError
+    PostCommentDoesNotExistsError,
+    InvalidCursorError,
+    InvalidPostFieldsError,
+    InvalidPostIdsError
 )
 from core.containers import (
     ProjectContainer as BlogContainer,
     FilterSpecificationContainer,
     OrderSpecificationContainer
 )
+from api.encoders import DTOPayload
+from api.responses import StreamingDTOResponse
 from api.views.base import ApiBaseView
 from api.serializers.blog import (
     CategoryDTOSerializer,
@@ -49,6 +71,7 @@ from api.serializers.blog import (
     PostDTOSerializer,
     NewPostDTOSerializer,
     PartialPostDTOSerializer,
+    BulkNewPostsSerializer,
     CommentDTOSerializer,
     NewCommentDTOSerializer
 )
@@ -63,11 +86,13 @@ from blog.dto import (
 
 class ApiCategoryListView(APIView, ApiBaseView):
     """Get list of categories, add new category"""
+    QUERY_BUDGET = {'get': 1, 'post': 4}
 
     @swagger_auto_schema(
         operation_description="Get list of categories",
         responses={
             200: categories_response_schema,
+            304: "Not modified",
             400: "Bad Request",
         },
         tags=["categories"],
@@ -78,11 +103,16 @@ class ApiCategoryListView(APIView, ApiBaseView):
         category_interactor = BlogContainer.category_interactor()
         categories_dto = category_interactor.get_all_categories()
 
-        categories_serializer = CategoryDTOSerializer(categories_dto, many=True)
-        categories_serialized_data = categories_serializer.data
+        validators = self._get_validators(request, categories_dto)
+        not_modified_response = self._create_not_modified_response(request, validators)
+        if not_modified_response:
+            return not_modified_response
+
+        categories_serialized_data = DTOPayload(categories_dto)
         return Response({
             'categories': categories_serialized_data},
-            status=status.HTTP_200_OK)
+            status=status.HTTP_200_OK,
+            headers=validators)
 
     @swagger_auto_schema(
         operation_description="Create new category if category not exists",
@@ -124,6 +154,7 @@ class ApiCategoryListView(APIView, ApiBaseView):
 
 class ApiCategoryDetailView(APIView, ApiBaseView):
     """Get, update, delete category"""
+    QUERY_BUDGET = {'get': 1, 'put': 4, 'delete': 14}
 
     @swagger_auto_schema(
         operation_description="Get list of categories",
@@ -144,8 +175,7 @@ class ApiCategoryDetailView(APIView, ApiBaseView):
         except CategoryDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
 
-        category_serializer = CategoryDTOSerializer(category_dto)
-        category_serialized_data = category_serializer.data
+        category_serialized_data = DTOPayload(category_dto)
         return Response(
             {"category": category_serialized_data},
             status=status.HTTP_200_OK
@@ -216,13 +246,49 @@ class ApiCategoryDetailView(APIView, ApiBaseView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ApiTagListView(APIView, ApiBaseView):
+    """Get tags with numbers of published posts"""
+    QUERY_BUDGET = {'get': 1}
+    LIMIT = 50
+    MAX_LIMIT = 500
+
+    @swagger_auto_schema(
+        operation_description="Get tags with most published posts",
+        responses={
+            200: openapi.Response("Tags", tag_stats_response_schema),
+        },
+        tags=["tags"],
+        security=[],
+        manual_parameters=[tag_prefix_parameter, tag_limit_parameter],
+    )
+    def get(self, request):
+        """Get tags with most published posts"""
+        prefix = request.GET.get("prefix", "").strip() or None
+        try:
+            limit = int(request.GET.get("limit", self.LIMIT))
+        except ValueError:
+            limit = self.LIMIT
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+
+        tag_interactor = BlogContainer.tag_interactor()
+        tag_stats_dto = tag_interactor.get_tag_stats(prefix, limit)
+
+        tag_stats_serializer_data = DTOPayload(tag_stats_dto)
+        return Response({
+            'tags': tag_stats_serializer_data},
+            status=status.HTTP_200_OK)
+
+
 class ApiPostListView(APIView, ApiBaseView):
     """Get list of posts, add new post"""
+    QUERY_BUDGET = {'get': 4, 'post': 15}
+    PAGE_SIZE = 4
 
     @swagger_auto_schema(
         operation_description="Get list of posts",
         responses={
             200: posts_response_schema,
+            304: "Not modified",
             400: "Bad Request",
         },
         tags=["posts"],
@@ -230,29 +296,53 @@ class ApiPostListView(APIView, ApiBaseView):
         manual_parameters=[
             # Pagination parameters
             *pagination_parameters,
+            cursor_param,
             # Filter parameters
             author_filter_parameter,
             tags_filter_parameter,
-            period_filter_parameter
+            period_filter_parameter,
+            search_filter_parameter,
+            # Projection parameters
+            post_fields_parameter,
+            # Bulk read parameters
+            post_ids_parameter
         ],
     )
     def get(self, request):
         """Get list of posts"""
         conditions = self.build_conditions_from_request(request)
         page, page_size = self._get_pagination_parameters(request)
+        fields = self._get_fields_from_request(request)
 
         post_interactor = BlogContainer.post_interactor()
-        posts_dto, paginated_result_dto = post_interactor.get_paginated_posts(page, page_size, conditions)
 
-        posts_serializer = PostDTOSerializer(posts_dto, many=True)
-        posts_serializer_data = posts_serializer.data
+        if "ids" in request.GET:
+            return self._get_posts_by_ids(request, post_interactor, fields)
+
+        watermark = post_interactor.get_posts_watermark(conditions)
+        validators = self._get_validators(request, watermark)
+        not_modified_response = self._create_not_modified_response(request, validators)
+        if not_modified_response:
+            return not_modified_response
+
+        if "cursor" in request.GET:
+            return self._get_cursor_paginated_posts(request, post_interactor, page_size, conditions, fields,
+                                                    validators)
+
+        try:
+            posts_dto, paginated_result_dto = post_interactor.get_paginated_posts(page, page_size, conditions, fields)
+        except InvalidPostFieldsError as exception:
+            return self._create_response_for_exception(exception)
+
+        posts_serializer_data = DTOPayload(posts_dto, fields)
         return Response({
             'posts': posts_serializer_data,
             'pages': paginated_result_dto.total_pages,
             'current_page': paginated_result_dto.current_page,
             'prev_page': paginated_result_dto.has_previous,
             'next_page': paginated_result_dto.has_next},
-            status=status.HTTP_200_OK)
+            status=status.HTTP_200_OK,
+            headers=validators)
 
     @swagger_auto_schema(
         operation_description="Create a new post",
@@ -321,45 +411,152 @@ class ApiPostListView(APIView, ApiBaseView):
             period_spec = filter_specifications['period']
             conditions.append({"spec": period_spec, "value": period})
 
+        search = request.GET.get("q", "").strip()
+        if search:
+            search_spec = filter_specifications['search']
+            conditions.append({"spec": search_spec, "value": search})
+            search_rank_spec = order_specifications["search_rank"]
+            conditions.append({"spec": search_rank_spec, "value": search})
+
         return conditions
 
+    def _get_cursor_paginated_posts(self, request, post_interactor, page_size: int, conditions: List[Dict],
+                                    fields: Optional[List[str]], validators: Dict[str, str]):
+        cursor = request.GET.get("cursor") or None
+
+        try:
+            posts_dto, paginated_result_dto = post_interactor.get_cursor_paginated_posts(cursor, page_size, conditions,
+                                                                                         fields)
+        except (InvalidCursorError, InvalidPostFieldsError) as exception:
+            return self._create_response_for_exception(exception)
+
+        posts_serializer_data = DTOPayload(posts_dto, fields)
+        return Response({
+            'posts': posts_serializer_data,
+            'prev_page': paginated_result_dto.has_previous,
+            'next_page': paginated_result_dto.has_next,
+            'prev_cursor': paginated_result_dto.prev_cursor,
+            'next_cursor': paginated_result_dto.next_cursor},
+            status=status.HTTP_200_OK,
+            headers=validators)
+
+    def _get_posts_by_ids(self, request, post_interactor, fields: Optional[List[str]]):
+        try:
+            post_ids = self._get_post_ids_from_request(request)
+            posts_dto, missing_ids = post_interactor.get_posts_by_ids(post_ids, fields)
+        except (InvalidPostIdsError, InvalidPostFieldsError) as exception:
+            return self._create_response_for_exception(exception)
+
+        posts_serializer_data = DTOPayload(posts_dto, fields)
+        return Response({
+            'posts': posts_serializer_data,
+            'missing_ids': missing_ids},
+            status=status.HTTP_200_OK)
+
+    def _get_post_ids_from_request(self, request) -> List[int]:
+        try:
+            return [int(post_id) for post_id in request.GET["ids"].split(',') if post_id.strip()]
+        except ValueError:
+            raise InvalidPostIdsError("Post ids must be comma-separated integers")
+
     def _get_pagination_parameters(self, request) -> Tuple[int, int]:
         try:
             page = int(request.GET.get("page", 1))
-            page_size = int(request.GET.get("page_size", 4))
         except ValueError:
             page = 1
-            page_size = 4
-        return page, page_size
+        return page, self._get_page_size(request)
+
+
+class ApiPostBulkCreateView(APIView, ApiBaseView):
+    """Add many posts at once"""
+    QUERY_BUDGET = {'post': 8}
+
+    @swagger_auto_schema(
+        operation_description="Create many posts in one transaction, invalid posts are reported and skipped",
+        request_body=bulk_new_posts_request_schema,
+        responses={
+            201: bulk_created_posts_response_schema,
+            400: "Bad Request",
+            401: "Unauthorized",
+        },
+        tags=["posts"],
+        security=[{"Token Auth": []}],
+    )
+    def post(self, request):
+        """Create new posts"""
+        JWTPermissionValidator.validate_jwt_authentication_or_raise(request)
+
+        bulk_serializer = BulkNewPostsSerializer(data=request.data)
+        if not bulk_serializer.is_valid():
+            return self._create_response_for_invalid_serializers(bulk_serializer)
+
+        results = {}
+        new_posts_dto = []
+        new_posts_indexes = []
+        for index, post_data in enumerate(bulk_serializer.validated_data["posts"]):
+            new_post_serializer = NewPostDTOSerializer(data={**post_data, "author_id": request.user.id})
+            if new_post_serializer.is_valid():
+                new_posts_dto.append(NewPostDTO(**new_post_serializer.validated_data))
+                new_posts_indexes.append(index)
+            else:
+                results[index] = {"index": index, "errors": new_post_serializer.errors}
+
+        post_interactor = BlogContainer.post_interactor()
+        for result in post_interactor.bulk_create_posts(new_posts_dto):
+            index = new_posts_indexes[result.index]
+            if result.post:
+                results[index] = {"index": index, "post": DTOPayload(result.post)}
+            else:
+                results[index] = {"index": index, "errors": result.errors}
+
+        created = sum(1 for result in results.values() if "post" in result)
+        return Response({
+            'created': created,
+            'results': [results[index] for index in sorted(results)]},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
 
 
 class ApiPostDetailView(APIView, ApiBaseView):
     """Get, update, delete post"""
+    QUERY_BUDGET = {'get': 2, 'put': 11, 'patch': 11, 'delete': 13}
 
     @swagger_auto_schema(
         operation_description="Get list of posts",
         responses={
             200: post_schema,
+            304: "Not modified",
             400: "Bad Request",
             404: "Post not found"
         },
         tags=["posts"],
         security=[],
+        manual_parameters=[post_fields_parameter],
     )
     def get(self, request, post_id: int):
         """Get post detail by id"""
+        fields = self._get_fields_from_request(request)
         post_interactor = BlogContainer.post_interactor()
 
+        validators = {}
+        watermark = post_interactor.get_post_watermark(post_id)
+        if watermark:
+            validators = self._get_validators(request, watermark)
+            not_modified_response = self._create_not_modified_response(request, validators)
+            if not_modified_response:
+                return not_modified_response
+
         try:
-            post_dto = post_interactor.get_post_by_id(post_id)
+            post_dto = post_interactor.get_post_by_id(post_id, fields)
         except PostDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
+        except InvalidPostFieldsError as exception:
+            return self._create_response_for_exception(exception)
 
-        post_serializer = PostDTOSerializer(post_dto)
-        post_serializer_data = post_serializer.data
+        post_serializer_data = DTOPayload(post_dto, fields)
         return Response(
             {"post": post_serializer_data},
-            status=status.HTTP_200_OK)
+            status=status.HTTP_200_OK,
+            headers=validators)
 
     @swagger_auto_schema(
         operation_description="Update all fields in post",
@@ -388,17 +585,19 @@ class ApiPostDetailView(APIView, ApiBaseView):
         post_interactor = BlogContainer.post_interactor()
 
         try:
-            post_dto = post_interactor.get_post_by_id(post_id)
+            post_owner = post_interactor.get_post_owner(post_id)
         except PostDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
 
-        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_dto)
+        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_owner)
         update_post_dto = NewPostDTO(**update_post_serializer.validated_data)
 
         try:
             updated_post_dto = post_interactor.update_post(update_post_dto, post_id)
         except CategoryDoesNotExistsError as exception:
             return self._create_response_for_exception(exception)
+        except PostDoesNotExistsError as exception:
+            return self._create_response_not_found(exception)
 
         post_serializer = PostDTOSerializer(updated_post_dto)
         post_serializer_data = post_serializer.data
@@ -433,16 +632,16 @@ class ApiPostDetailView(APIView, ApiBaseView):
         post_interactor = BlogContainer.post_interactor()
 
         try:
-            post_dto = post_interactor.get_post_by_id(post_id)
+            post_owner = post_interactor.get_post_owner(post_id)
         except PostDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
 
-        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_dto)
+        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_owner)
         partial_post_dto = PartialPostDTO(**partial_post_serializer.validated_data)
 
         try:
             updated_post_dto = post_interactor.update_partial_post(partial_post_dto, post_id)
-        except CategoryDoesNotExistsError as exception:
+        except (CategoryDoesNotExistsError, PostDoesNotExistsError) as exception:
             return self._create_response_not_found(exception)
 
         post_serializer = PostDTOSerializer(updated_post_dto)
@@ -468,12 +667,15 @@ class ApiPostDetailView(APIView, ApiBaseView):
         post_interactor = BlogContainer.post_interactor()
 
         try:
-            post_dto = post_interactor.get_post_by_id(post_id)
+            post_owner = post_interactor.get_post_owner(post_id)
         except PostDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
 
-        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_dto)
-        post_interactor.delete_post_by_id(post_id)
+        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_owner)
+        try:
+            post_interactor.delete_post_by_id(post_id)
+        except PostDoesNotExistsError as exception:
+            return self._create_response_not_found(exception)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def _get_user_id_from_request(self, request):
@@ -485,29 +687,58 @@ class ApiPostDetailView(APIView, ApiBaseView):
 
 class ApiPostCommentsListView(APIView, ApiBaseView):
     """Get list of post comments, add new comment to post"""
+    QUERY_BUDGET = {'get': 4, 'post': 4}
 
     @swagger_auto_schema(
         operation_description="Get list of post comments",
         responses={
             200: openapi.Response("Post comments", comments_response_schema),
+            304: "Not modified",
             404: "Post not found",
         },
         tags=["post comments"],
-        security=[]
+        security=[],
+        manual_parameters=[comments_page_size_param, cursor_param, stream_parameter],
     )
     def get(self, request, post_id: int):
         """Get list of post comments"""
         comment_interactor = BlogContainer.comment_interactor()
+
+        validators = {}
+        watermark = comment_interactor.get_post_comments_watermark(post_id)
+        if watermark:
+            validators = self._get_validators(request, watermark)
+            not_modified_response = self._create_not_modified_response(request, validators)
+            if not_modified_response:
+                return not_modified_response
+
+        if self._is_stream_requested(request):
+            try:
+                post_comments_dto = comment_interactor.iterate_post_comments(post_id)
+            except PostDoesNotExistsError as exception:
+                return self._create_response_not_found(exception)
+            return StreamingDTOResponse('post_comments', post_comments_dto, headers=validators)
+
+        cursor = request.GET.get("cursor") or None
+        page_size = self._get_page_size(request)
+
         try:
-            post_comments_dto = comment_interactor.get_all_post_comments(post_id)
+            post_comments_dto, paginated_result_dto = comment_interactor.get_cursor_paginated_post_comments(
+                post_id, cursor, page_size)
         except PostDoesNotExistsError as exception:
             return self._create_response_not_found(exception)
+        except InvalidCursorError as exception:
+            return self._create_response_for_exception(exception)
 
-        post_comments_serializer = CommentDTOSerializer(post_comments_dto, many=True)
-        post_comments_serializer_data = post_comments_serializer.data
+        post_comments_serializer_data = DTOPayload(post_comments_dto)
         return Response({
-            'post_comments': post_comments_serializer_data},
-            status=status.HTTP_200_OK)
+            'post_comments': post_comments_serializer_data,
+            'prev_page': paginated_result_dto.has_previous,
+            'next_page': paginated_result_dto.has_next,
+            'prev_cursor': paginated_result_dto.prev_cursor,
+            'next_cursor': paginated_result_dto.next_cursor},
+            status=status.HTTP_200_OK,
+            headers=validators)
 
     @swagger_auto_schema(
         operation_description="Create a new post comment",
@@ -554,6 +785,7 @@ class ApiPostCommentsListView(APIView, ApiBaseView):
 
 class ApiPostCommentsDetailView(APIView, ApiBaseView):
     """Get, update, delete post comment"""
+    QUERY_BUDGET = {'get': 2, 'put': 4, 'delete': 6}
 
     @swagger_auto_schema(
         operation_description="Post comment",
@@ -572,8 +804,7 @@ class ApiPostCommentsDetailView(APIView, ApiBaseView):
         except (PostDoesNotExistsError, PostCommentDoesNotExistsError) as exception:
             return self._create_response_not_found(exception)
 
-        post_comment_serializer = CommentDTOSerializer(post_comment_dto)
-        post_comment_serializer_data = post_comment_serializer.data
+        post_comment_serializer_data = DTOPayload(post_comment_dto)
         return Response({
             'comment': post_comment_serializer_data},
             status=status.HTTP_200_OK)
@@ -610,13 +841,16 @@ class ApiPostCommentsDetailView(APIView, ApiBaseView):
         comment_interactor = BlogContainer.comment_interactor()
 
         try:
-            old_post_comment_dto = comment_interactor.get_post_comment_by_id(post_id, comment_id)
+            post_comment_owner = comment_interactor.get_post_comment_owner(post_id, comment_id)
         except (PostDoesNotExistsError, PostCommentDoesNotExistsError) as exception:
             return self._create_response_not_found(exception)
 
-        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, old_post_comment_dto)
+        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_comment_owner)
 
-        updated_post_comment_dto = comment_interactor.update_post_comment(update_post_comment_dto, old_post_comment_dto)
+        try:
+            updated_post_comment_dto = comment_interactor.update_post_comment(update_post_comment_dto, comment_id)
+        except PostCommentDoesNotExistsError as exception:
+            return self._create_response_not_found(exception)
 
         updated_post_comment_serializer = CommentDTOSerializer(updated_post_comment_dto)
         updated_post_comment_serializer_data = updated_post_comment_serializer.data
@@ -641,11 +875,186 @@ class ApiPostCommentsDetailView(APIView, ApiBaseView):
         comment_interactor = BlogContainer.comment_interactor()
 
         try:
-            post_comment = comment_interactor.get_post_comment_by_id(post_id, comment_id)
+            post_comment_owner = comment_interactor.get_post_comment_owner(post_id, comment_id)
         except (PostDoesNotExistsError, PostCommentDoesNotExistsError) as exception:
             return self._create_response_not_found(exception)
 
-        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_comment)
+        JWTPermissionValidator.is_superuser_or_object_author_or_raise(request, post_comment_owner)
 
         comment_interactor.delete_comment_by_id(comment_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ApiPostReactionView(APIView, ApiBaseView):
+    """Set or remove like or dislike of post, reaction is set in url conf"""
+    QUERY_BUDGET = {'post': 4, 'delete': 4}
+    reaction = None
+
+    @swagger_auto_schema(
+        operation_description="Like or dislike post, like removes dislike and vice versa",
+        responses={
+            200: post_reactions_response_schema,
+            401: "Unauthorized",
+            404: "Post not found",
+        },
+        tags=["reactions"],
+        security=[{"Token Auth": []}],
+    )
+    def post(self, request, post_id: int):
+        """Set reaction of user to post"""
+        return self._set_reaction(request, post_id, True)
+
+    @swagger_auto_schema(
+        operation_description="Remove like or dislike of post",
+        responses={
+            200: post_reactions_response_schema,
+            401: "Unauthorized",
+            404: "Post not found",
+        },
+        tags=["reactions"],
+        security=[{"Token Auth": []}],
+    )
+    def delete(self, request, post_id: int):
+        """Remove reaction of user to post"""
+        return self._set_reaction(request, post_id, False)
+
+    def _set_reaction(self, request, post_id: int, active: bool):
+        JWTPermissionValidator.validate_jwt_authentication_or_raise(request)
+
+        reaction_interactor = BlogContainer.reaction_interactor()
+        try:
+            post_dto = reaction_interactor.set_post_reaction(post_id, request.user.id, self.reaction, active)
+        except PostDoesNotExistsError as exception:
+            return self._create_response_not_found(exception)
+
+        post_serializer_data = DTOPayload(post_dto, reaction_interactor.REACTION_COUNTER_FIELDS)
+        return Response({
+            'post': post_serializer_data},
+            status=status.HTTP_200_OK)
+
+
+class ApiCommentReactionView(APIView, ApiBaseView):
+    """Set or remove like or dislike of post comment, reaction is set in url conf"""
+    QUERY_BUDGET = {'post': 5, 'delete': 5}
+    reaction = None
+
+    @swagger_auto_schema(
+        operation_description="Like or dislike post comment, like removes dislike and vice versa",
+        responses={
+            200: comment_reactions_response_schema,
+            401: "Unauthorized",
+            404: "Post or comment not found",
+        },
+        tags=["reactions"],
+        security=[{"Token Auth": []}],
+    )
+    def post(self, request, post_id: int, comment_id: int):
+        """Set reaction of user to comment"""
+        return self._set_reaction(request, post_id, comment_id, True)
+
+    @swagger_auto_schema(
+        operation_description="Remove like or dislike of post comment",
+        responses={
+            200: comment_reactions_response_schema,
+            401: "Unauthorized",
+            404: "Post or comment not found",
+        },
+        tags=["reactions"],
+        security=[{"Token Auth": []}],
+    )
+    def delete(self, request, post_id: int, comment_id: int):
+        """Remove reaction of user to comment"""
+        return self._set_reaction(request, post_id, comment_id, False)
+
+    def _set_reaction(self, request, post_id: int, comment_id: int, active: bool):
+        JWTPermissionValidator.validate_jwt_authentication_or_raise(request)
+
+        reaction_interactor = BlogContainer.reaction_interactor()
+        try:
+            comment_dto = reaction_interactor.set_comment_reaction(post_id, comment_id, request.user.id,
+                                                                   self.reaction, active)
+        except (PostDoesNotExistsError, PostCommentDoesNotExistsError) as exception:
+            return self._create_response_not_found(exception)
+
+        comment_serializer_data = DTOPayload(comment_dto)
+        return Response({
+            'comment': comment_serializer_data},
+            status=status.HTTP_200_OK)
+
+
+class ApiTimelineView(APIView, ApiBaseView):
+    """Get home timeline of user with posts of followed authors"""
+    QUERY_BUDGET = {'get': 5}
+
+    @swagger_auto_schema(
+        operation_description="Get newest posts of authors followed by user",
+        responses={
+            200: openapi.Response("Home timeline", timeline_response_schema),
+            400: "Bad Request",
+            401: "Unauthorized",
+        },
+        tags=["timeline"],
+        security=[{"Token Auth": []}],
+        manual_parameters=[posts_page_size_param, cursor_param, post_fields_parameter],
+    )
+    def get(self, request):
+        """Get page of home timeline"""
+        JWTPermissionValidator.validate_jwt_authentication_or_raise(request)
+
+        cursor = request.GET.get("cursor") or None
+        page_size = self._get_page_size(request)
+        fields = self._get_fields_from_request(request)
+
+        timeline_interactor = BlogContainer.timeline_interactor()
+        try:
+            posts_dto, paginated_result_dto = timeline_interactor.get_home_timeline(
+                request.user.id, cursor, page_size, fields)
+        except (InvalidCursorError, InvalidPostFieldsError) as exception:
+            return self._create_response_for_exception(exception)
+
+        posts_serializer_data = DTOPayload(posts_dto, fields)
+        return Response({
+            'posts': posts_serializer_data,
+            'prev_page': paginated_result_dto.has_previous,
+            'next_page': paginated_result_dto.has_next,
+            'next_cursor': paginated_result_dto.next_cursor},
+            status=status.HTTP_200_OK)
+
+
+class ApiTrendingPostsView(APIView, ApiBaseView):
+    """Get recent posts ordered by time decayed reactions and comments"""
+    QUERY_BUDGET = {'get': 1}
+
+    @swagger_auto_schema(
+        operation_description="Get trending posts, ranking is recalculated periodically",
+        responses={
+            200: openapi.Response("Trending posts", posts_response_schema),
+            400: "Bad Request",
+        },
+        tags=["posts"],
+        security=[],
+        manual_parameters=[page_param, posts_page_size_param, post_fields_parameter],
+    )
+    def get(self, request):
+        """Get page of trending posts"""
+        try:
+            page = int(request.GET.get("page", 1))
+        except ValueError:
+            page = 1
+        page_size = self._get_page_size(request)
+        fields = self._get_fields_from_request(request)
+
+        trending_interactor = BlogContainer.trending_interactor()
+        try:
+            posts_dto, paginated_result_dto = trending_interactor.get_trending_posts(page, page_size, fields)
+        except InvalidPostFieldsError as exception:
+            return self._create_response_for_exception(exception)
+
+        posts_serializer_data = DTOPayload(posts_dto, fields)
+        return Response({
+            'posts': posts_serializer_data,
+            'pages': paginated_result_dto.total_pages,
+            'current_page': paginated_result_dto.current_page,
+            'prev_page': paginated_result_dto.has_previous,
+            'next_page': paginated_result_dto.has_next},
+            status=status.HTTP_200_OK)
@@ -10,6 +10,8 @@ from blog.models import (
     PostDislike,
     Follow
 )
+from blog.counters import change_tag_stats, get_tag_stats_deltas
+from blog.specifications import SearchSpecification
 
 
 @admin.register(Category)
@@ -27,6 +29,33 @@ class PostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     raw_id_fields = ('author',)
     ordering = ('-status', '-publish')
+    readonly_fields = ('likes_count', 'dislikes_count')
+
+    def save_related(self, request, form, formsets, change):
+        """Keep denormalized tag names and tag stats in sync with tags saved by form"""
+        post = form.instance
+        old_published = change and form.initial.get('status') == 'published'
+        old_tag_names = post.tag_names if old_published else []
+        super().save_related(request, form, formsets, change)
+        post.tag_names = list(post.tags.names())
+        post.save(update_fields=['tag_names'])
+        change_tag_stats(get_tag_stats_deltas(old_tag_names, post.tag_names if post.status == 'published' else []))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        change_tag_stats(get_tag_stats_deltas(obj.tag_names if obj.status == 'published' else [], []))
+
+    def delete_queryset(self, request, queryset):
+        tag_names = [name for tag_names in queryset.filter(status='published').values_list('tag_names', flat=True)
+                     for name in tag_names]
+        super().delete_queryset(request, queryset)
+        change_tag_stats(get_tag_stats_deltas(tag_names, []))
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search title and body using full text search index instead of ILIKE scans"""
+        if not search_term:
+            return queryset, False
+        return queryset.filter(SearchSpecification().build_query(search_term)), False
 
 
 @admin.register(Comment)
@@ -34,6 +63,7 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'post', 'author', 'created', 'active')
     list_filter = ('active', 'created', 'updated')
     search_fields = ('author', 'body')
+    readonly_fields = ('likes_count', 'dislikes_count')
     actions = ['deactivate_comments', 'activate_comments']
 
     def deactivate_comments(self, request, queryset):
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from blog.counters import REACTION_COUNTERS, increment_reaction_counter, decrement_reaction_counter
+        from blog.registries import invalidate_authors_version
+        from blog.timelines import drop_follower_timeline
+
+        for _, reaction_name, _, _ in REACTION_COUNTERS:
+            reaction = self.get_model(reaction_name)
+            post_save.connect(increment_reaction_counter, sender=reaction,
+                              dispatch_uid=f'increment_{reaction_name}_counter')
+            post_delete.connect(decrement_reaction_counter, sender=reaction,
+                                dispatch_uid=f'decrement_{reaction_name}_counter')
+        post_save.connect(invalidate_authors_version, sender=settings.AUTH_USER_MODEL,
+                          dispatch_uid='invalidate_authors_version')
+        post_save.connect(drop_follower_timeline, sender=self.get_model('Follow'),
+                          dispatch_uid='drop_follower_timeline_on_follow')
+        post_delete.connect(drop_follower_timeline, sender=self.get_model('Follow'),
+                            dispatch_uid='drop_follower_timeline_on_unfollow')
@@ -0,0 +1,117 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional
+
+from django.apps import apps as django_apps
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce, Greatest
+
+# (counter model, reaction model, reaction foreign key, counter field)
+REACTION_COUNTERS = (
+    ('Post', 'PostLike', 'post', 'likes_count'),
+    ('Post', 'PostDislike', 'post', 'dislikes_count'),
+    ('Comment', 'CommentLike', 'comment', 'likes_count'),
+    ('Comment', 'CommentDislike', 'comment', 'dislikes_count'),
+)
+
+
+def change_reaction_counter(reaction, delta: int) -> None:
+    """Atomically add delta to counter of object which reaction belongs to"""
+    for model_name, reaction_name, foreign_key, field in REACTION_COUNTERS:
+        if reaction._meta.object_name != reaction_name:
+            continue
+
+        model = django_apps.get_model('blog', model_name)
+        query = model.objects.filter(pk=getattr(reaction, f'{foreign_key}_id'))
+        if delta < 0:
+            query = query.filter(**{f'{field}__gte': -delta})
+        query.update(**{field: F(field) + delta})
+
+
+def increment_reaction_counter(sender, instance, created: bool, raw: bool = False, **kwargs) -> None:
+    """post_save receiver for like and dislike models"""
+    if created and not raw:
+        change_reaction_counter(instance, 1)
+
+
+def decrement_reaction_counter(sender, instance, **kwargs) -> None:
+    """post_delete receiver for like and dislike models"""
+    change_reaction_counter(instance, -1)
+
+
+def rebuild_reaction_counters() -> None:
+    """Recalculate all like and dislike counters from reaction tables"""
+    for _, reaction_name, _, _ in REACTION_COUNTERS:
+        refresh_reaction_counters(reaction_name)
+
+
+def refresh_reaction_counters(reaction_name: str, pks: Optional[Iterable[int]] = None) -> None:
+    """Recalculate counter of reaction for objects with pks (all objects by default) from reaction table"""
+    for model_name, counted_reaction_name, foreign_key, field in REACTION_COUNTERS:
+        if counted_reaction_name != reaction_name:
+            continue
+
+        model = django_apps.get_model('blog', model_name)
+        reaction = django_apps.get_model('blog', reaction_name)
+        reactions_count = reaction.objects.filter(**{foreign_key: OuterRef('pk')}) \
+            .order_by() \
+            .values(foreign_key) \
+            .annotate(total=Count('pk')) \
+            .values('total')
+        query = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+        query.update(**{field: Coalesce(Subquery(reactions_count), 0)})
+
+
+def get_tag_stats_deltas(old_tag_names: Iterable[str], tag_names: Iterable[str]) -> Counter:
+    """Return changes of numbers of published posts of tags, names are repeated once per post"""
+    deltas = Counter(tag_names)
+    deltas.subtract(old_tag_names)
+    return deltas
+
+
+def change_tag_stats(deltas: Dict[str, int]) -> None:
+    """Atomically add deltas to numbers of published posts of tags, stats of tags left without posts are deleted"""
+    tag_stat = django_apps.get_model('blog', 'TagStat')
+    added = sorted((name, delta) for name, delta in deltas.items() if delta > 0)
+    removed = defaultdict(list)
+    for name, delta in deltas.items():
+        if delta < 0:
+            removed[delta].append(name)
+
+    with transaction.atomic(savepoint=False):
+        if added:
+            table = connection.ops.quote_name(tag_stat._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} (name, posts_count) VALUES {", ".join(["(%s, %s)"] * len(added))} '
+                    f'ON CONFLICT (name) DO UPDATE SET posts_count = {table}.posts_count + EXCLUDED.posts_count',
+                    [value for name_delta in added for value in name_delta])
+        for delta, names in removed.items():
+            tag_stat.objects.filter(name__in=names).update(posts_count=Greatest(F('posts_count') + delta, 0))
+        if removed:
+            tag_stat.objects.filter(name__in=[name for names in removed.values() for name in names],
+                                    posts_count=0).delete()
+
+
+def rebuild_tag_stats() -> None:
+    """Recalculate numbers of published posts of all tags from tag links"""
+    post = django_apps.get_model('blog', 'Post')
+    tag_stat = django_apps.get_model('blog', 'TagStat')
+    tagged_item = django_apps.get_model('taggit', 'TaggedItem')
+
+    posts_counts = dict(
+        tagged_item.objects.filter(
+            content_type__app_label='blog',
+            content_type__model='post',
+            object_id__in=post.objects.filter(status='published').values('pk'))
+        .order_by()
+        .values_list('tag__name')
+        .annotate(total=Count('pk')))
+
+    with transaction.atomic(savepoint=False):
+        tag_stat.objects.exclude(name__in=posts_counts.keys()).delete()
+        tag_stat.objects.bulk_create(
+            [tag_stat(name=name, posts_count=posts_count) for name, posts_count in posts_counts.items()],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['posts_count'])
@@ -1,4 +1,4 @@
-from typing import NamedTuple, List, Optional
+from typing import NamedTuple, List, Optional, Dict, Tuple
 from datetime import datetime
 
 
@@ -20,6 +20,7 @@ class PostDTO(NamedTuple):
     author: str
     author_id: int
     content: str
+    excerpt: str
     publish: datetime
     post_image_url: str
     category: str
@@ -61,6 +62,11 @@ class CommentDTO(NamedTuple):
     dislikes: int
 
 
+class OwnerDTO(NamedTuple):
+    id: int
+    author_id: int
+
+
 class NewCommentDTO(NamedTuple):
     body: str
     post_id: int
@@ -73,3 +79,49 @@ class PaginatedResultDTO(NamedTuple):
     has_previous: bool
     has_next: bool
 
+
+class WatermarkDTO(NamedTuple):
+    last_modified: Optional[datetime] = None
+    count: Optional[int] = None
+    likes_count: Optional[int] = None
+    dislikes_count: Optional[int] = None
+    generation: Optional[int] = None
+    reactions_version: Optional[int] = None
+    categories_version: Optional[str] = None
+    authors_version: Optional[str] = None
+
+
+class CursorPaginatedResultDTO(NamedTuple):
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+    has_previous: bool
+    has_next: bool
+
+
+class UpdatedPostDTO(NamedTuple):
+    post: PostDTO
+    # post was not published before update
+    published: bool
+
+
+class BulkPostResultDTO(NamedTuple):
+    index: int
+    post: Optional[PostDTO] = None
+    errors: Optional[Dict] = None
+
+
+class ReactionChangesDTO(NamedTuple):
+    target: str
+    reaction: str
+    added: List[Tuple[int, int]]
+    removed: List[Tuple[int, int]]
+
+
+class TimelineEntryDTO(NamedTuple):
+    post_id: int
+    score: float
+
+
+class TagStatDTO(NamedTuple):
+    name: str
+    posts_count: int
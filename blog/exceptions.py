@@ -19,3 +19,18 @@ class PostDoesNotExistsError(ValidationError):
 class PostCommentDoesNotExistsError(ValidationError):
     def __init__(self, message="Post comment not exists", *args, **kwargs):
         super().__init__(message, *args, **kwargs)
+
+
+class InvalidCursorError(ValidationError):
+    def __init__(self, message="Invalid pagination cursor", *args, **kwargs):
+        super().__init__(message, *args, **kwargs)
+
+
+class InvalidPostIdsError(ValidationError):
+    def __init__(self, message="Invalid post ids", *args, **kwargs):
+        super().__init__(message, *args, **kwargs)
+
+
+class InvalidPostFieldsError(ValidationError):
+    def __init__(self, message="Invalid post fields", *args, **kwargs):
+        super().__init__(message, *args, **kwargs)
@@ -1,10 +1,18 @@
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Iterator
 
 from blog.dto import (
     CategoryDTO,
-    NewCategoryDTO, PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO
+    NewCategoryDTO, PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO,
+    CursorPaginatedResultDTO, WatermarkDTO, BulkPostResultDTO, TagStatDTO, OwnerDTO
 )
-from blog.interfaces import CategoryServiceInterface, PostServiceInterface, CommentServiceInterface
+from blog.exceptions import CategoryDoesNotExistsError, PostDoesNotExistsError, PostCommentDoesNotExistsError
+from blog.interfaces import (
+    CategoryServiceInterface, PostServiceInterface, CommentServiceInterface, ReactionServiceInterface,
+    TimelineServiceInterface, TimelinePublisherInterface, TrendingServiceInterface, TagServiceInterface
+)
+from blog.reactions import POST, COMMENT, LIKE, DISLIKE
+
+PUBLISHED = 'published'
 
 
 class CategoryInteractor:
@@ -32,19 +40,53 @@ class CategoryInteractor:
         self.category_service.delete_category_by_id(category_id)
 
 
+class TagInteractor:
+    def __init__(self, tag_service: TagServiceInterface):
+        self.tag_service = tag_service
+
+    def get_tag_stats(self, prefix: Optional[str], limit: int) -> List[TagStatDTO]:
+        """Get tags with most published posts"""
+        return self.tag_service.get_tag_stats(prefix, limit)
+
+
 class PostInteractor:
-    def __init__(self, post_service: PostServiceInterface, category_service: CategoryServiceInterface):
+    def __init__(self, post_service: PostServiceInterface, category_service: CategoryServiceInterface,
+                 timeline_publisher: TimelinePublisherInterface):
         self.post_service = post_service
         self.category_service = category_service
+        self.timeline_publisher = timeline_publisher
 
-    def get_paginated_posts(self, page: int, per_page: int, conditions: Optional[List[Dict]] = None)\
-            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+    def get_paginated_posts(self, page: int, per_page: int, conditions: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
         """Get all posts"""
-        return self.post_service.get_paginated_posts(page, per_page, conditions)
+        return self.post_service.get_paginated_posts(page, per_page, conditions, fields)
+
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int, conditions: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        """Get posts page by cursor"""
+        return self.post_service.get_cursor_paginated_posts(cursor, per_page, conditions, fields)
 
-    def get_post_by_id(self, post_id: int) -> PostDTO:
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> PostDTO:
         """Get post by id"""
-        return self.post_service.get_post_by_id(post_id)
+        return self.post_service.get_post_by_id(post_id, fields)
+
+    def get_post_owner(self, post_id: int) -> OwnerDTO:
+        """Get id and author id of post to check permissions"""
+        return self.post_service.get_post_owner(post_id)
+
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], List[int]]:
+        """Get posts in order of post_ids and list of missing ids"""
+        return self.post_service.get_posts_by_ids(post_ids, fields)
+
+    def get_posts_watermark(self, conditions: Optional[List[Dict]] = None) -> WatermarkDTO:
+        """Get watermark of posts list"""
+        return self.post_service.get_posts_watermark(conditions)
+
+    def get_post_watermark(self, post_id: int) -> Optional[WatermarkDTO]:
+        """Get watermark of post or None if post not exists"""
+        return self.post_service.get_post_watermark(post_id)
 
     def delete_post_by_id(self, post_id: int) -> None:
         """Delete post by id"""
@@ -53,18 +95,43 @@ class PostInteractor:
     def create_post(self, post_dto: NewPostDTO) -> PostDTO:
         """Create new post"""
         self.category_service.get_category_by_id(post_dto.category_id)
-        return self.post_service.create_post(post_dto)
+        post = self.post_service.create_post(post_dto)
+        if post_dto.status == PUBLISHED:
+            self.timeline_publisher.publish_posts([post.id])
+        return post
+
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[BulkPostResultDTO]:
+        """Create posts with existing categories in one batch, report posts with missing categories"""
+        categories = self.category_service.get_categories_by_ids([post_dto.category_id for post_dto in posts_dto])
+        posts_dto_to_create = [post_dto for post_dto in posts_dto if post_dto.category_id in categories]
+        posts = self.post_service.bulk_create_posts(posts_dto_to_create)
+        self.timeline_publisher.publish_posts(
+            [post.id for post, post_dto in zip(posts, posts_dto_to_create) if post_dto.status == PUBLISHED])
+        created_posts = iter(posts)
+
+        category_error = {"category_id": [CategoryDoesNotExistsError().message]}
+        return [
+            BulkPostResultDTO(index=index, post=next(created_posts)) if post_dto.category_id in categories
+            else BulkPostResultDTO(index=index, errors=category_error)
+            for index, post_dto in enumerate(posts_dto)
+        ]
 
     def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> PostDTO:
-        """Update post"""
+        """Update post, post which becomes published is pushed to timelines of followers"""
         self.category_service.get_category_by_id(update_post_dto.category_id)
-        return self.post_service.update_post(update_post_dto, post_id)
+        updated_post = self.post_service.update_post(update_post_dto, post_id)
+        if updated_post.published:
+            self.timeline_publisher.publish_posts([post_id])
+        return updated_post.post
 
     def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> PostDTO:
-        """Update post partial"""
+        """Update post partial, post which becomes published is pushed to timelines of followers"""
         if partial_post_dto.category_id is not None:
             self.category_service.get_category_by_id(partial_post_dto.category_id)
-        return self.post_service.update_partial_post(partial_post_dto, post_id)
+        updated_post = self.post_service.update_partial_post(partial_post_dto, post_id)
+        if updated_post.published:
+            self.timeline_publisher.publish_posts([post_id])
+        return updated_post.post
 
 
 class CommentInteractor:
@@ -74,28 +141,123 @@ class CommentInteractor:
 
     def get_all_post_comments(self, post_id: int) -> List[CommentDTO]:
         """Check if post exists. Get all comments by post_id"""
-        self.post_service.get_post_by_id(post_id)
+        self.post_service.get_post_by_id(post_id, ['id'])
         post_comments = self.comment_service.get_all_post_comments(post_id)
         return post_comments
 
+    def iterate_post_comments(self, post_id: int) -> Iterator[CommentDTO]:
+        """Check if post exists. Iterate all comments by post_id"""
+        self.post_service.get_post_by_id(post_id, ['id'])
+        return self.comment_service.iterate_post_comments(post_id)
+
+    def get_cursor_paginated_post_comments(self, post_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[CommentDTO], CursorPaginatedResultDTO]:
+        """Check if post exists. Get page of comments by post_id"""
+        self.post_service.get_post_by_id(post_id, ['id'])
+        return self.comment_service.get_cursor_paginated_post_comments(post_id, cursor, per_page)
+
+    def get_post_comments_watermark(self, post_id: int) -> Optional[WatermarkDTO]:
+        """Get watermark of post comments or None if post not exists"""
+        return self.comment_service.get_post_comments_watermark(post_id)
+
     def get_post_comment_by_id(self, post_id: int, comment_id: int) -> CommentDTO:
         """Check if post exists. Get comment by comment_id"""
-        self.post_service.get_post_by_id(post_id)
+        self.post_service.get_post_by_id(post_id, ['id'])
         post_comment = self.comment_service.get_post_comment_by_id(post_id, comment_id)
         return post_comment
 
+    def get_post_comment_owner(self, post_id: int, comment_id: int) -> OwnerDTO:
+        """Get id and author id of comment to check permissions, post is checked only if comment is not found"""
+        try:
+            return self.comment_service.get_post_comment_owner(post_id, comment_id)
+        except PostCommentDoesNotExistsError:
+            self.post_service.get_post_owner(post_id)
+            raise
+
     def create_post_comment(self, new_comment: NewCommentDTO) -> CommentDTO:
         """Check if post exists and create post comment"""
-        self.post_service.get_post_by_id(new_comment.post_id)
+        self.post_service.get_post_by_id(new_comment.post_id, ['id'])
         new_comment = self.comment_service.create_post_comment(new_comment)
         return new_comment
 
-    def update_post_comment(self, update_comment: NewCommentDTO, old_comment: CommentDTO) -> CommentDTO:
+    def update_post_comment(self, update_comment: NewCommentDTO, comment_id: int) -> CommentDTO:
         """Update post comment"""
-        updated_comment = self.comment_service.update_post_comment(update_comment, old_comment)
+        updated_comment = self.comment_service.update_post_comment(update_comment, comment_id)
         return updated_comment
 
     def delete_comment_by_id(self, comment_id: int) -> None:
         """Check if post exists and delete comment"""
         self.comment_service.delete_comment_by_id(comment_id)
 
+
+class ReactionInteractor:
+    REACTION_COUNTER_FIELDS = ['id', 'likes_count', 'dislikes_count']
+    # counter fields of DTOs by reaction
+    POST_COUNTERS = {LIKE: 'likes_count', DISLIKE: 'dislikes_count'}
+    COMMENT_COUNTERS = {LIKE: 'likes', DISLIKE: 'dislikes'}
+
+    def __init__(self, reaction_service: ReactionServiceInterface, post_service: PostServiceInterface,
+                 comment_service: CommentServiceInterface):
+        self.reaction_service = reaction_service
+        self.post_service = post_service
+        self.comment_service = comment_service
+
+    def set_post_reaction(self, post_id: int, user_id: int, reaction: str, active: bool) -> PostDTO:
+        """Check if post exists. Set or remove reaction of user, return post reaction counters"""
+        post = self.post_service.get_post_by_id(post_id, self.REACTION_COUNTER_FIELDS)
+        deltas = self.reaction_service.set_reaction(POST, post_id, user_id, reaction, active)
+        return self._with_deltas(post, deltas, self.POST_COUNTERS)
+
+    def set_comment_reaction(self, post_id: int, comment_id: int, user_id: int, reaction: str,
+                             active: bool) -> CommentDTO:
+        """Check if post and comment exist. Set or remove reaction of user, return comment"""
+        self.post_service.get_post_by_id(post_id, ['id'])
+        comment = self.comment_service.get_post_comment_by_id(post_id, comment_id)
+        deltas = self.reaction_service.set_reaction(COMMENT, comment_id, user_id, reaction, active)
+        return self._with_deltas(comment, deltas, self.COMMENT_COUNTERS)
+
+    def _with_deltas(self, item, deltas: Dict[str, int], counters: Dict[str, str]):
+        """Add changes of counters made by reaction to DTO loaded before it"""
+        return item._replace(**{field: max(getattr(item, field) + deltas[reaction], 0)
+                                for reaction, field in counters.items()})
+
+
+class TimelineInteractor:
+    def __init__(self, timeline_service: TimelineServiceInterface, post_service: PostServiceInterface):
+        self.timeline_service = timeline_service
+        self.post_service = post_service
+
+    def fan_out_post(self, post_id: int) -> int:
+        """Push published post to timelines of followers of its author"""
+        try:
+            post = self.post_service.get_post_by_id(post_id, ['id', 'author_id', 'publish'])
+        except PostDoesNotExistsError:
+            return 0
+        return self.timeline_service.fan_out_post(post.id, post.author_id, post.publish)
+
+    def get_home_timeline(self, user_id: int, cursor: Optional[str], per_page: int,
+                          fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        """Get page of posts of authors followed by user, drop deleted and unpublished posts from timeline"""
+        post_ids, paginated_result_dto = self.timeline_service.get_home_timeline(user_id, cursor, per_page)
+        if not post_ids:
+            return [], paginated_result_dto
+
+        posts, missing_ids = self.post_service.get_posts_by_ids(post_ids, fields)
+        self.timeline_service.remove_posts(user_id, missing_ids)
+        return posts, paginated_result_dto
+
+
+class TrendingInteractor:
+    def __init__(self, trending_service: TrendingServiceInterface, post_service: PostServiceInterface):
+        self.trending_service = trending_service
+        self.post_service = post_service
+
+    def get_trending_posts(self, page: int, per_page: int, fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+        """Get page of trending posts, posts deleted or unpublished after last refresh are skipped"""
+        post_ids, paginated_result_dto = self.trending_service.get_trending_post_ids(page, per_page)
+        if not post_ids:
+            return [], paginated_result_dto
+
+        posts, _ = self.post_service.get_posts_by_ids(post_ids, fields)
+        return posts, paginated_result_dto
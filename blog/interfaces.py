@@ -1,9 +1,11 @@
 from abc import ABCMeta, abstractmethod
-from typing import List, Union, Optional, Dict, Tuple
+from datetime import datetime
+from typing import List, Union, Optional, Dict, Tuple, Iterator, Iterable, Callable, ContextManager, Set
 from .dto import (
     CategoryDTO,
     NewCategoryDTO,
-    PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO
+    PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO, CursorPaginatedResultDTO,
+    WatermarkDTO, ReactionChangesDTO, TimelineEntryDTO, TagStatDTO, OwnerDTO, UpdatedPostDTO
 )
 
 
@@ -59,16 +61,163 @@ class CategoryRepositoryInterface(metaclass=ABCMeta):
         pass
 
 
+class CategoryRegistryInterface(metaclass=ABCMeta):
+    """Interface for in-process CategoryRegistry"""
+
+    @abstractmethod
+    def get_all_categories(self) -> List[CategoryDTO]:
+        pass
+
+    @abstractmethod
+    def get_category_by_id(self, category_id: int) -> Union[CategoryDTO, None]:
+        pass
+
+    @abstractmethod
+    def get_categories_by_ids(self, category_ids: Iterable[int]) -> Dict[int, CategoryDTO]:
+        pass
+
+    @abstractmethod
+    def get_version(self) -> str:
+        pass
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        pass
+
+
+class SharedVersionInterface(metaclass=ABCMeta):
+    """Interface for version token shared by all workers"""
+
+    @abstractmethod
+    def get_version(self) -> str:
+        pass
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        pass
+
+
+class ReactionBufferInterface(metaclass=ABCMeta):
+    """Interface for buffer of not flushed reactions"""
+
+    @abstractmethod
+    def set_reaction(self, target: str, target_id: int, user_id: int, reaction: str, active: bool,
+                     stored: Callable[[], bool]) -> bool:
+        pass
+
+    @abstractmethod
+    def get_pending_deltas(self, target: str, target_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        pass
+
+    @abstractmethod
+    def get_version(self) -> int:
+        pass
+
+    @abstractmethod
+    def flushing(self) -> ContextManager[List[ReactionChangesDTO]]:
+        pass
+
+    @abstractmethod
+    def drop_flushed(self) -> None:
+        pass
+
+
+class TimelineStoreInterface(metaclass=ABCMeta):
+    """Interface for store of home timelines"""
+    size: int
+
+    @abstractmethod
+    def exists(self, user_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def add_entries(self, user_id: int, entries: List[TimelineEntryDTO]) -> None:
+        pass
+
+    @abstractmethod
+    def push_entry(self, entry: TimelineEntryDTO, user_ids: List[int]) -> int:
+        pass
+
+    @abstractmethod
+    def get_entries(self, user_id: int, before: Optional[Tuple[float, int]], limit: int) -> List[TimelineEntryDTO]:
+        pass
+
+    @abstractmethod
+    def remove_entries(self, user_id: int, post_ids: List[int]) -> None:
+        pass
+
+    @abstractmethod
+    def get_high_follower_authors(self) -> Set[int]:
+        pass
+
+    @abstractmethod
+    def set_high_follower_author(self, author_id: int, high_follower: bool) -> None:
+        pass
+
+
+class TimelinePublisherInterface(metaclass=ABCMeta):
+    """Interface for publisher of new posts to timelines"""
+
+    @abstractmethod
+    def publish_posts(self, post_ids: List[int]) -> None:
+        pass
+
+
+class TrendingStoreInterface(metaclass=ABCMeta):
+    """Interface for store of trending posts ranking"""
+
+    @abstractmethod
+    def replace_scores(self, scores: Iterator[Dict[int, float]]) -> int:
+        pass
+
+    @abstractmethod
+    def get_post_ids(self, offset: int, limit: int) -> List[int]:
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+
 class PostRepositoryInterface(metaclass=ABCMeta):
     """Interface for PostRepository"""
 
     @abstractmethod
-    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None)\
-            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
+        pass
+
+    @abstractmethod
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int,
+                                   specifications: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        pass
+
+    @abstractmethod
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> Union[PostDTO, None]:
+        pass
+
+    @abstractmethod
+    def get_post_owner(self, post_id: int) -> Union[OwnerDTO, None]:
+        """Get id and author id of published post"""
+        pass
+
+    @abstractmethod
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None) -> List[PostDTO]:
+        """Get existing posts in order of post_ids"""
+        pass
+
+    @abstractmethod
+    def get_posts_watermark(self, specifications: Optional[List[Dict]] = None) -> WatermarkDTO:
         pass
 
     @abstractmethod
-    def get_post_by_id(self, post_id: int) -> Union[PostDTO, None]:
+    def get_post_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
         pass
 
     @abstractmethod
@@ -76,15 +225,28 @@ class PostRepositoryInterface(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> PostDTO:
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[PostDTO]:
+        """Create posts in one transaction, in order of posts_dto"""
         pass
 
     @abstractmethod
-    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> PostDTO:
+    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
+        """Update post, None if post not exists"""
         pass
 
     @abstractmethod
-    def delete_post_by_id(self, post_id: int) -> None:
+    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
+        """Update some fields of post, None if post not exists"""
+        pass
+
+    @abstractmethod
+    def delete_post_by_id(self, post_id: int) -> bool:
+        """Delete post, False if post not exists"""
+        pass
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        """Drop cached posts after write which changes posts without repository"""
         pass
 
 
@@ -96,18 +258,40 @@ class CommentRepositoryInterface(metaclass=ABCMeta):
         """Get all comments by post_id"""
         pass
 
+    @abstractmethod
+    def iterate_post_comments(self, post_id: int) -> Iterator[CommentDTO]:
+        """Iterate all comments by post_id without loading them at once"""
+        pass
+
+    @abstractmethod
+    def get_cursor_paginated_post_comments(self, post_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[CommentDTO], CursorPaginatedResultDTO]:
+        """Get page of comments by post_id after or before cursor"""
+        pass
+
+    @abstractmethod
+    def get_post_comments_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
+        """Get watermark of post comments, None if post not exists"""
+        pass
+
     @abstractmethod
     def get_post_comment_by_id(self, post_id: int, comment_id: int) -> Union[CommentDTO, None]:
         """Get post comment by id"""
         pass
 
+    @abstractmethod
+    def get_post_comment_owner(self, post_id: int, comment_id: int) -> Union[OwnerDTO, None]:
+        """Get id and author id of active comment of published post"""
+        pass
+
     @abstractmethod
     def create_post_comment(self, body: str, post_id: int, author_id: int) -> CommentDTO:
         """Create post comment"""
         pass
 
-    def update_post_comment(self, body: str, comment_id: int) -> CommentDTO:
-        """Update post comment"""
+    @abstractmethod
+    def update_post_comment(self, body: str, comment_id: int) -> Union[CommentDTO, None]:
+        """Update post comment, None if comment not exists"""
         pass
 
     @abstractmethod
@@ -116,6 +300,69 @@ class CommentRepositoryInterface(metaclass=ABCMeta):
         pass
 
 
+class ReactionRepositoryInterface(metaclass=ABCMeta):
+    """Interface for ReactionRepository"""
+
+    @abstractmethod
+    def has_reaction(self, target: str, target_id: int, user_id: int, reaction: str) -> bool:
+        """Check if reaction of user is stored"""
+        pass
+
+    @abstractmethod
+    def apply_reaction_changes(self, changes: List[ReactionChangesDTO]) -> None:
+        """Store added and delete removed reactions"""
+        pass
+
+
+class TagRepositoryInterface(metaclass=ABCMeta):
+    """Interface for TagRepository"""
+
+    @abstractmethod
+    def get_tag_stats(self, prefix: Optional[str], limit: int) -> List[TagStatDTO]:
+        """Get tags with most published posts"""
+        pass
+
+
+class TimelineRepositoryInterface(metaclass=ABCMeta):
+    """Interface for TimelineRepository"""
+
+    @abstractmethod
+    def count_followers(self, author_id: int) -> int:
+        """Count followers of author"""
+        pass
+
+    @abstractmethod
+    def iterate_follower_ids(self, author_id: int, chunk_size: int) -> Iterator[List[int]]:
+        """Iterate ids of followers of author in chunks"""
+        pass
+
+    @abstractmethod
+    def get_followed_author_ids(self, user_id: int, author_ids: Set[int]) -> List[int]:
+        """Get authors followed by user among author_ids"""
+        pass
+
+    @abstractmethod
+    def get_followed_entries(self, user_id: int, exclude_author_ids: Set[int], limit: int) -> List[TimelineEntryDTO]:
+        """Get newest published posts of authors followed by user"""
+        pass
+
+    @abstractmethod
+    def get_authors_entries(self, author_ids: List[int], before: Optional[Tuple[float, int]],
+                            limit: int) -> List[TimelineEntryDTO]:
+        """Get newest published posts of authors older than before position"""
+        pass
+
+
+class TrendingRepositoryInterface(metaclass=ABCMeta):
+    """Interface for TrendingRepository"""
+
+    @abstractmethod
+    def iterate_post_scores(self, since: datetime, now: datetime, half_life: float, comment_weight: float,
+                            chunk_size: int) -> Iterator[Dict[int, float]]:
+        """Iterate trending scores of posts published in window by post id in chunks"""
+        pass
+
+
 class CategoryServiceInterface(metaclass=ABCMeta):
     """Interface for CategoryService"""
 
@@ -127,6 +374,11 @@ class CategoryServiceInterface(metaclass=ABCMeta):
     def get_category_by_id(self, category_id: int) -> CategoryDTO:
         pass
 
+    @abstractmethod
+    def get_categories_by_ids(self, category_ids: List[int]) -> Dict[int, CategoryDTO]:
+        """Get existing categories by ids"""
+        pass
+
     @abstractmethod
     def create_category(self, new_category_dto: NewCategoryDTO) -> CategoryDTO:
         pass
@@ -144,12 +396,38 @@ class PostServiceInterface(metaclass=ABCMeta):
     """Interface for PostService"""
 
     @abstractmethod
-    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None)\
-            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
+        pass
+
+    @abstractmethod
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int,
+                                   specifications: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
         pass
 
     @abstractmethod
-    def get_post_by_id(self, post_id: int) -> Union[PostDTO, None]:
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> Union[PostDTO, None]:
+        pass
+
+    @abstractmethod
+    def get_post_owner(self, post_id: int) -> OwnerDTO:
+        """Get id and author id of post to check existence and ownership"""
+        pass
+
+    @abstractmethod
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], List[int]]:
+        """Get posts in order of post_ids and list of missing ids"""
+        pass
+
+    @abstractmethod
+    def get_posts_watermark(self, specifications: Optional[List[Dict]] = None) -> WatermarkDTO:
+        pass
+
+    @abstractmethod
+    def get_post_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
         pass
 
     @abstractmethod
@@ -157,11 +435,16 @@ class PostServiceInterface(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> PostDTO:
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[PostDTO]:
+        """Create posts in one transaction, in order of posts_dto"""
+        pass
+
+    @abstractmethod
+    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> UpdatedPostDTO:
         pass
 
     @abstractmethod
-    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> PostDTO:
+    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> UpdatedPostDTO:
         pass
 
     @abstractmethod
@@ -177,22 +460,105 @@ class CommentServiceInterface(metaclass=ABCMeta):
         """Get all comments by post_id"""
         pass
 
+    @abstractmethod
+    def iterate_post_comments(self, post_id: int) -> Iterator[CommentDTO]:
+        """Iterate all comments by post_id without loading them at once"""
+        pass
+
+    @abstractmethod
+    def get_cursor_paginated_post_comments(self, post_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[CommentDTO], CursorPaginatedResultDTO]:
+        """Get page of comments by post_id after or before cursor"""
+        pass
+
+    @abstractmethod
+    def get_post_comments_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
+        """Get watermark of post comments, None if post not exists"""
+        pass
+
     @abstractmethod
     def get_post_comment_by_id(self, post_id, comment_id: int) -> CommentDTO:
         """Get post comment by id"""
         pass
 
+    @abstractmethod
+    def get_post_comment_owner(self, post_id: int, comment_id: int) -> OwnerDTO:
+        """Get id and author id of comment to check existence and ownership"""
+        pass
+
     @abstractmethod
     def create_post_comment(self, new_comment: NewCommentDTO) -> CommentDTO:
         """Create post comment"""
         pass
 
     @abstractmethod
-    def update_post_comment(self, update_comment: NewCommentDTO, old_comment: CommentDTO) -> CommentDTO:
+    def update_post_comment(self, update_comment: NewCommentDTO, comment_id: int) -> CommentDTO:
         """Update post comment"""
         pass
 
     @abstractmethod
     def delete_comment_by_id(self, comment_id: int) -> None:
         """Delete comment by id"""
-        pass
\ No newline at end of file
+        pass
+
+
+class ReactionServiceInterface(metaclass=ABCMeta):
+    """Interface for ReactionService"""
+
+    @abstractmethod
+    def set_reaction(self, target: str, target_id: int, user_id: int, reaction: str, active: bool) -> Dict[str, int]:
+        """Set or remove reaction of user, return changes of counters by reaction"""
+        pass
+
+    @abstractmethod
+    def flush_reactions(self) -> int:
+        """Write pending reactions to database"""
+        pass
+
+
+class TimelineServiceInterface(metaclass=ABCMeta):
+    """Interface for TimelineService"""
+
+    @abstractmethod
+    def fan_out_post(self, post_id: int, author_id: int, publish: datetime) -> int:
+        """Push post to timelines of followers of author"""
+        pass
+
+    @abstractmethod
+    def get_home_timeline(self, user_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[int], CursorPaginatedResultDTO]:
+        """Get page of post ids of authors followed by user"""
+        pass
+
+    @abstractmethod
+    def remove_posts(self, user_id: int, post_ids: List[int]) -> None:
+        """Remove posts from timeline of user"""
+        pass
+
+    @abstractmethod
+    def drop_timeline(self, user_id: int) -> None:
+        """Drop timeline of user"""
+        pass
+
+
+class TrendingServiceInterface(metaclass=ABCMeta):
+    """Interface for TrendingService"""
+
+    @abstractmethod
+    def refresh_trending(self) -> int:
+        """Recalculate trending scores of recent posts"""
+        pass
+
+    @abstractmethod
+    def get_trending_post_ids(self, page: int, per_page: int) -> Tuple[List[int], PaginatedResultDTO]:
+        """Get page of trending post ids"""
+        pass
+
+
+class TagServiceInterface(metaclass=ABCMeta):
+    """Interface for TagService"""
+
+    @abstractmethod
+    def get_tag_stats(self, prefix: Optional[str], limit: int) -> List[TagStatDTO]:
+        """Get tags with most published posts"""
+        pass
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import rebuild_reaction_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalculate likes and dislikes counters of posts and comments'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_reaction_counters()
+        self.stdout.write(self.style.SUCCESS('Reaction counters rebuilt'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import rebuild_tag_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalculate numbers of published posts of tags'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_tag_stats()
+        self.stdout.write(self.style.SUCCESS('Tag stats rebuilt'))
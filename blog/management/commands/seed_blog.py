@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import BlogSeeder, SeedVolumes
+
+
+class Command(BaseCommand):
+    help = 'Fill database with synthetic users, posts, comments, reactions and follows for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--post-reactions', type=int, default=100000)
+        parser.add_argument('--comment-reactions', type=int, default=100000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0, help='Seed of random generator, same seed gives same data')
+        parser.add_argument('--zipf-exponent', type=float, default=1.1,
+                            help='Skew of popularity of authors, posts and followed users')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Number of rows inserted per query')
+        parser.add_argument('--prefix', default='seed', help='Prefix of usernames, emails, categories and tags')
+        parser.add_argument('--password', default='password', help='Password of all created users')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Chunk size must be positive')
+        if get_user_model().objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f'Users with prefix "{options["prefix"]}" already exist, use another --prefix')
+
+        volumes = SeedVolumes(
+            users=options['users'],
+            categories=options['categories'],
+            tags=options['tags'],
+            posts=options['posts'],
+            comments=options['comments'],
+            post_reactions=options['post_reactions'],
+            comment_reactions=options['comment_reactions'],
+            follows=options['follows'],
+        )
+        if min(volumes) < 0:
+            raise CommandError('Volumes must not be negative')
+
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        seeder = BlogSeeder(options['seed'], options['chunk_size'], options['zipf_exponent'], options['prefix'],
+                            options['password'], log=log)
+        created = seeder.seed(volumes)
+        summary = ', '.join(f'{total} {name}' for name, total in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary}'))
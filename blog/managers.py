@@ -5,4 +5,5 @@ class PublishedManager(models.Manager):
     def get_queryset(self):
         return (super(PublishedManager, self)
                 .get_queryset()
-                .filter(status='published'))
+                .filter(status='published')
+                .defer('search_vector'))
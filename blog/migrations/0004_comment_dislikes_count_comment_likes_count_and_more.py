@@ -0,0 +1,56 @@
+# Generated by Django 4.1.7 on 2026-10-17 01:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (counter model, reaction model, reaction foreign key, counter field)
+REACTION_COUNTERS = (
+    ('Post', 'PostLike', 'post', 'likes_count'),
+    ('Post', 'PostDislike', 'post', 'dislikes_count'),
+    ('Comment', 'CommentLike', 'comment', 'likes_count'),
+    ('Comment', 'CommentDislike', 'comment', 'dislikes_count'),
+)
+
+
+def fill_reaction_counters(apps, schema_editor):
+    for model_name, reaction_name, foreign_key, field in REACTION_COUNTERS:
+        model = apps.get_model('blog', model_name)
+        reaction = apps.get_model('blog', reaction_name)
+        reactions_count = reaction.objects.filter(**{foreign_key: OuterRef('pk')}) \
+            .order_by() \
+            .values(foreign_key) \
+            .annotate(total=Count('pk')) \
+            .values('total')
+        model.objects.update(**{field: Coalesce(Subquery(reactions_count), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_alter_commentdislike_comment_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_reaction_counters, migrations.RunPython.noop),
+    ]
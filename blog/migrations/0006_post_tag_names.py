@@ -0,0 +1,39 @@
+# Generated by Django 4.1.7 on 2026-10-17 01:41
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+FILL_TAG_NAMES_SQL = """
+UPDATE blog_post SET tag_names = COALESCE((
+    SELECT array_agg(taggit_tag.name ORDER BY taggit_taggeditem.id)
+    FROM taggit_taggeditem
+    JOIN taggit_tag ON taggit_tag.id = taggit_taggeditem.tag_id
+    JOIN django_content_type ON django_content_type.id = taggit_taggeditem.content_type_id
+    WHERE django_content_type.app_label = 'blog'
+      AND django_content_type.model = 'post'
+      AND taggit_taggeditem.object_id = blog_post.id
+), '{}');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_search_vector'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0005_auto_20220424_2025'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='tag_names',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_names'], name='blog_post_tag_names_idx'),
+        ),
+        migrations.RunSQL(FILL_TAG_NAMES_SQL, migrations.RunSQL.noop),
+    ]
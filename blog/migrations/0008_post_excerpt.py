@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-17 01:48
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for post in Post.objects.only('id', 'body').iterator(chunk_size=1000):
+        post.excerpt = Truncator(' '.join(post.body.split())).chars(200)
+        posts.append(post)
+        if len(posts) == 1000:
+            Post.objects.bulk_update(posts, ['excerpt'])
+            posts = []
+    Post.objects.bulk_update(posts, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
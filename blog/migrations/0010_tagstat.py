@@ -0,0 +1,47 @@
+# Generated by Django 4.1.7 on 2026-10-17 02:20
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.functions.text
+
+
+def fill_tag_stats(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    TagStat = apps.get_model('blog', 'TagStat')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+
+    posts_counts = TaggedItem.objects.filter(
+        content_type__app_label='blog',
+        content_type__model='post',
+        object_id__in=Post.objects.filter(status='published').values('pk'),
+    ).order_by().values_list('tag__name').annotate(total=Count('pk'))
+    TagStat.objects.bulk_create([TagStat(name=name, posts_count=posts_count) for name, posts_count in posts_counts])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_author_published_idx'),
+        ('taggit', '0005_auto_20220424_2025'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagstat',
+            index=models.Index(fields=['-posts_count', 'name'], name='blog_tagstat_posts_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tagstat',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='blog_tagstat_name_prefix_idx'),
+        ),
+        migrations.RunPython(fill_tag_stats, migrations.RunPython.noop),
+    ]
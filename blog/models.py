@@ -1,12 +1,24 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from taggit.managers import TaggableManager
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
+from django.utils.text import Truncator
 
 from blog.managers import PublishedManager
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 200
+
+
+def build_excerpt(body: str) -> str:
+    """Return short plain text preview of post body"""
+    return Truncator(' '.join(body.split())).chars(EXCERPT_LENGTH)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -32,6 +44,7 @@ class Post(models.Model):
                                on_delete=models.CASCADE,
                                related_name='blog_posts')
     body = models.TextField(verbose_name='Content')
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     publish = models.DateTimeField(default=timezone.now)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -42,6 +55,10 @@ class Post(models.Model):
     category = models.ForeignKey(Category,
                                  on_delete=models.CASCADE,
                                  related_name='posts')
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+    tag_names = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
     tags = TaggableManager()
 
     objects = models.Manager()
@@ -49,10 +66,37 @@ class Post(models.Model):
 
     class Meta:
         ordering = ('-publish',)
+        indexes = [
+            models.Index(fields=['-publish', '-id'], name='blog_post_published_idx',
+                         condition=models.Q(status='published')),
+            models.Index(fields=['author', '-publish', '-id'], name='blog_post_author_published_idx',
+                         condition=models.Q(status='published')),
+            GinIndex(fields=['search_vector'], name='blog_post_search_vector_idx'),
+            GinIndex(fields=['tag_names'], name='blog_post_tag_names_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.excerpt = build_excerpt(self.body)
+        super().save(*args, **kwargs)
+
+
+class TagStat(models.Model):
+    """Number of published posts with tag, updated by post repository on every change of post tags"""
+    name = models.CharField(max_length=100, unique=True)
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-posts_count', 'name'], name='blog_tagstat_posts_count_idx'),
+            models.Index(OpClass(Upper('name'), name='text_pattern_ops'), name='blog_tagstat_name_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.posts_count})'
+
 
 class PostLike(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
@@ -89,9 +133,15 @@ class Comment(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     active = models.BooleanField(default=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'], name='blog_comment_post_active_idx',
+                         condition=models.Q(active=True)),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} - {self.body}'
@@ -0,0 +1,166 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from redis import Redis
+from redis.exceptions import LockError
+
+from .dto import ReactionChangesDTO
+from .interfaces import ReactionBufferInterface
+
+POST = 'post'
+COMMENT = 'comment'
+LIKE = 'like'
+DISLIKE = 'dislike'
+REACTION_KINDS = ((POST, LIKE), (POST, DISLIKE), (COMMENT, LIKE), (COMMENT, DISLIKE))
+
+
+class RedisReactionBuffer(ReactionBufferInterface):
+    """Buffer of user reactions in Redis which are not written to database yet.
+
+    Every kind of reaction has set of added and set of removed "target_id:user_id" members and
+    hash of counter deltas by target id. Flush renames these keys to flushing keys, so reactions
+    made during flush are collected in new keys. Flushing deltas are still pending for readers until
+    drop_flushed deletes flushing keys after database commit.
+    """
+    KEY_PREFIX = 'blog:reactions'
+    FLUSHING_SUFFIX = ':flushing'
+    VERSION_KEY = 'blog:reactions:version'
+    LOCK_KEY = 'blog:reactions:flush-lock'
+    LOCK_TIMEOUT = 60
+
+    def __init__(self, client: Redis):
+        self.client = client
+
+    def set_reaction(self, target: str, target_id: int, user_id: int, reaction: str, active: bool,
+                     stored: Callable[[], bool]) -> bool:
+        """Set pending reaction of user, stored is called when buffer does not know reaction of user.
+
+        Return False if reaction already had requested state.
+        """
+        added_key, removed_key, deltas_key = self._keys(target, reaction)
+        member = f'{target_id}:{user_id}'
+        stored_state = []
+
+        def change(pipe) -> bool:
+            live = True
+            if pipe.sismember(added_key, member):
+                state = True
+            elif pipe.sismember(removed_key, member):
+                state = False
+            else:
+                live = False
+                if pipe.sismember(added_key + self.FLUSHING_SUFFIX, member):
+                    state = True
+                elif pipe.sismember(removed_key + self.FLUSHING_SUFFIX, member):
+                    state = False
+                else:
+                    if not stored_state:
+                        stored_state.append(stored())
+                    state = stored_state[0]
+            if state == active:
+                return False
+
+            pipe.multi()
+            if live:
+                pipe.srem(removed_key if active else added_key, member)
+            else:
+                pipe.sadd(added_key if active else removed_key, member)
+            pipe.hincrby(deltas_key, target_id, 1 if active else -1)
+            pipe.incr(self.VERSION_KEY)
+            return True
+
+        return self.client.transaction(change, added_key, removed_key, added_key + self.FLUSHING_SUFFIX,
+                                       removed_key + self.FLUSHING_SUFFIX, value_from_callable=True)
+
+    def get_pending_deltas(self, target: str, target_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """Get not flushed counter changes of targets by reaction, only for targets which have them"""
+        if not target_ids:
+            return {}
+
+        reactions = [reaction for reaction_target, reaction in REACTION_KINDS if reaction_target == target]
+        pipe = self.client.pipeline(transaction=False)
+        for reaction in reactions:
+            _, _, deltas_key = self._keys(target, reaction)
+            pipe.hmget(deltas_key, target_ids)
+            pipe.hmget(deltas_key + self.FLUSHING_SUFFIX, target_ids)
+        values = iter(pipe.execute())
+
+        pending_deltas = {}
+        for reaction in reactions:
+            deltas = zip(target_ids, next(values), next(values))
+            for target_id, live_delta, flushing_delta in deltas:
+                delta = int(live_delta or 0) + int(flushing_delta or 0)
+                if delta:
+                    pending_deltas.setdefault(target_id, dict.fromkeys(reactions, 0))[reaction] = delta
+        return pending_deltas
+
+    def get_version(self) -> int:
+        """Get number which changes with every pending reaction"""
+        return int(self.client.get(self.VERSION_KEY) or 0)
+
+    @contextmanager
+    def flushing(self) -> Iterator[List[ReactionChangesDTO]]:
+        """Take pending reactions under flush lock, they stay pending until drop_flushed is called.
+
+        Reactions which were not dropped are taken again by next flush, applying them again is idempotent.
+        If process dies between database commit and drop_flushed, reads count flushed reactions twice
+        until next flush. Yield empty list if other flush is running.
+        """
+        lock = self.client.lock(self.LOCK_KEY, timeout=self.LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            yield []
+            return
+
+        try:
+            live_keys = self._live_keys()
+            if not self.client.exists(*self._flushing_keys()):
+                self.client.transaction(lambda pipe: self._rename_to_flushing(pipe, live_keys), *live_keys)
+
+            yield self._get_flushing_changes()
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+
+    def drop_flushed(self) -> None:
+        """Delete flushing keys after their reactions are committed to database"""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*self._flushing_keys())
+        pipe.incr(self.VERSION_KEY)
+        pipe.execute()
+
+    def _live_keys(self) -> List[str]:
+        return [key for target, reaction in REACTION_KINDS for key in self._keys(target, reaction)]
+
+    def _flushing_keys(self) -> List[str]:
+        return [key + self.FLUSHING_SUFFIX for key in self._live_keys()]
+
+    def _rename_to_flushing(self, pipe, keys: List[str]) -> None:
+        existing_keys = [key for key in keys if pipe.exists(key)]
+        pipe.multi()
+        for key in existing_keys:
+            pipe.rename(key, key + self.FLUSHING_SUFFIX)
+
+    def _get_flushing_changes(self) -> List[ReactionChangesDTO]:
+        pipe = self.client.pipeline(transaction=False)
+        for target, reaction in REACTION_KINDS:
+            added_key, removed_key, _ = self._keys(target, reaction)
+            pipe.smembers(added_key + self.FLUSHING_SUFFIX)
+            pipe.smembers(removed_key + self.FLUSHING_SUFFIX)
+        members = iter(pipe.execute())
+
+        changes = []
+        for target, reaction in REACTION_KINDS:
+            added, removed = self._parse_members(next(members)), self._parse_members(next(members))
+            if added or removed:
+                changes.append(ReactionChangesDTO(target=target, reaction=reaction, added=added, removed=removed))
+        return changes
+
+    def _keys(self, target: str, reaction: str) -> Tuple[str, str, str]:
+        prefix = f'{self.KEY_PREFIX}:{target}:{reaction}'
+        return f'{prefix}:added', f'{prefix}:removed', f'{prefix}:deltas'
+
+    @staticmethod
+    def _parse_members(members: Set[str]) -> List[Tuple[int, int]]:
+        return [tuple(int(value) for value in member.split(':')) for member in members]
@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import BaseCache
+
+from .dto import CategoryDTO
+from .interfaces import CategoryRepositoryInterface, CategoryRegistryInterface, SharedVersionInterface
+
+AUTHORS_VERSION_KEY = 'blog:authors:version'
+
+
+class SharedVersion(SharedVersionInterface):
+    """Version token in shared cache, every write of versioned data publishes new token"""
+
+    def __init__(self, cache: BaseCache, key: str):
+        self.cache = cache
+        self.key = key
+
+    def get_version(self) -> str:
+        """Get current token, first reader publishes initial one"""
+        version = self.cache.get(self.key)
+        if version is None:
+            self.cache.add(self.key, uuid.uuid4().hex, timeout=None)
+            version = self.cache.get(self.key)
+        return version
+
+    def invalidate(self) -> None:
+        """Publish new token"""
+        self.cache.set(self.key, uuid.uuid4().hex, timeout=None)
+
+
+class CategoryRegistry(CategoryRegistryInterface):
+    """In-process registry of categories shared by all requests of worker.
+
+    Categories are reloaded when version token in shared cache changes (after every write
+    made through CategoryService in any worker) or when they are older than max_age seconds.
+    """
+    VERSION_KEY = 'blog:categories:version'
+
+    def __init__(self, repository: CategoryRepositoryInterface, cache: BaseCache, max_age: int):
+        self.repository = repository
+        self.version = SharedVersion(cache, self.VERSION_KEY)
+        self.max_age = max_age
+        self._categories: Dict[int, CategoryDTO] = {}
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_all_categories(self) -> List[CategoryDTO]:
+        """Get all categories ordered like in repository"""
+        return list(self._get_actual_categories().values())
+
+    def get_category_by_id(self, category_id: int) -> Optional[CategoryDTO]:
+        """Get category by id or None"""
+        return self._get_actual_categories().get(category_id)
+
+    def get_categories_by_ids(self, category_ids: Iterable[int]) -> Dict[int, CategoryDTO]:
+        """Get known categories by ids from one snapshot, version is checked once for all of them"""
+        categories = self._get_actual_categories()
+        return {category_id: categories[category_id] for category_id in category_ids if category_id in categories}
+
+    def get_version(self) -> str:
+        """Get version of categories shared by all workers"""
+        return self.version.get_version()
+
+    def invalidate(self) -> None:
+        """Publish new version, so every worker reloads categories"""
+        self.version.invalidate()
+
+    def _get_actual_categories(self) -> Dict[int, CategoryDTO]:
+        version = self.version.get_version()
+        if version != self._version or time.monotonic() - self._loaded_at > self.max_age:
+            with self._lock:
+                categories = self.repository.get_all_categories()
+                self._categories = {category.id: category for category in categories}
+                self._version = version
+                self._loaded_at = time.monotonic()
+        return self._categories
+
+
+def invalidate_authors_version(sender, instance, created: bool, update_fields=None, raw: bool = False,
+                               **kwargs) -> None:
+    """post_save receiver for user model, usernames are rendered as authors of posts and comments.
+
+    Saves of other fields only (e.g. last_login on every login) keep the version.
+    """
+    if created or raw or (update_fields is not None and 'username' not in update_fields):
+        return
+
+    # containers import this module
+    from core.containers import RegistryContainer
+
+    RegistryContainer.authors_version().invalidate()
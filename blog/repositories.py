@@ -1,21 +1,53 @@
-from typing import List, Union, Any, Dict, Tuple, Optional
+import hashlib
+import json
+import time
+from copy import copy
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+from typing import List, Union, Any, Dict, Tuple, Optional, Iterator, Set
 
 from annoying.functions import get_object_or_None
-from django.db.models import Q, Count, QuerySet
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import BaseCache
+from django.db import connection, transaction
+from django.db.models import (
+    Q, QuerySet, Count, Max, Sum, F, Value, Subquery, OuterRef, ExpressionWrapper, FloatField
+)
+from django.db.models.functions import Coalesce, Extract, Greatest, Power
 
 from .dto import (
     CategoryDTO,
-    PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, PaginatedResultDTO
+    PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, PaginatedResultDTO, CursorPaginatedResultDTO, WatermarkDTO,
+    ReactionChangesDTO, TimelineEntryDTO, TagStatDTO, OwnerDTO, UpdatedPostDTO
 )
 from .interfaces import (
     CategoryRepositoryInterface,
     PostRepositoryInterface, OrderSpecificationInterface, FilterSpecificationInterface, CommentRepositoryInterface,
-    PaginationSpecificationInterface,
+    PaginationSpecificationInterface, CategoryRegistryInterface, SharedVersionInterface, ReactionRepositoryInterface,
+    TagRepositoryInterface, TimelineRepositoryInterface, TrendingRepositoryInterface,
 )
 from .models import (
     Category,
-    Post, Comment
+    Post, Comment, PostLike, PostDislike, CommentLike, CommentDislike, Follow, TagStat, build_excerpt
 )
+from .counters import refresh_reaction_counters, change_tag_stats, get_tag_stats_deltas
+from .reactions import POST, COMMENT, LIKE, DISLIKE
+
+User = get_user_model()
+
+
+class WatermarkMixin:
+    """Build watermarks which change on every change of objects with reaction counters"""
+
+    def _get_watermark(self, query: QuerySet) -> WatermarkDTO:
+        watermark = query.order_by().aggregate(
+            last_modified=Max('updated'),
+            count=Count('pk'),
+            likes_count=Coalesce(Sum('likes_count'), 0),
+            dislikes_count=Coalesce(Sum('dislikes_count'), 0),
+        )
+        return WatermarkDTO(**watermark)
 
 
 class CategoryRepository(CategoryRepositoryInterface):
@@ -75,39 +107,96 @@ class CategoryRepository(CategoryRepositoryInterface):
         return categories_dto
 
 
-class PostRepository(PostRepositoryInterface):
+class PostRepository(PostRepositoryInterface, WatermarkMixin):
     """Post repository for DjangoORM"""
-    def __init__(self, paginator: PaginationSpecificationInterface):
+    UPDATE_FIELDS = ['title', 'slug', 'body', 'excerpt', 'image_url', 'status', 'category', 'tag_names', 'updated']
+    BULK_BATCH_SIZE = 1000
+    # post columns which must be loaded to build dto field
+    DTO_COLUMNS = {
+        'id': ('id',),
+        'title': ('title',),
+        'slug': ('slug',),
+        'author': ('author__username',),
+        'author_id': ('author',),
+        'content': ('body',),
+        'excerpt': ('excerpt',),
+        'publish': ('publish',),
+        'post_image_url': ('image_url',),
+        'category': ('category',),
+        'category_id': ('category',),
+        'likes_count': ('likes_count',),
+        'dislikes_count': ('dislikes_count',),
+        'tags': ('tag_names',),
+    }
+    # post attributes of dto fields named differently
+    DTO_ATTRIBUTES = {
+        'id': 'pk',
+        'content': 'body',
+        'post_image_url': 'image_url',
+    }
+
+    def __init__(self, paginator: PaginationSpecificationInterface,
+                 cursor_paginator: PaginationSpecificationInterface,
+                 category_registry: CategoryRegistryInterface,
+                 authors_version: SharedVersionInterface):
         self.pagination_spec = paginator
+        self.cursor_pagination_spec = cursor_paginator
+        self.category_registry = category_registry
+        self.authors_version = authors_version
 
-    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None)\
-            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
         """Get all posts"""
-        query = Post.published.select_related('category', 'author') \
-            .annotate(likes_count=Count('likes', distinct=True),
-                      dislikes_count=Count('dislikes', distinct=True)) \
-            .order_by("-publish")
-
-        if specifications:
-            query = self.apply_specifications(query, specifications)
-
-        posts = query.all()
+        posts = self._published_posts_query(specifications, fields)
         paginated_posts, paginated_result_dto = self.pagination_spec.paginate(posts, page, per_page)
-        posts_dto = self._posts_dto(paginated_posts)
+        posts_dto = self._posts_dto(paginated_posts, fields)
         return posts_dto, paginated_result_dto
 
-    def get_post_by_id(self, post_id: int) -> Union[PostDTO, None]:
-        """Get post by id"""
-        post = Post.published.filter(pk=post_id)\
-            .select_related('category', 'author') \
-            .annotate(likes_count=Count('likes', distinct=True),
-                      dislikes_count=Count('dislikes', distinct=True)) \
-            .first()
-        return self._post_dto(post) if post else None
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int,
+                                   specifications: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        """Get posts page after or before cursor"""
+        posts = self._published_posts_query(specifications, fields)
+        paginated_posts, paginated_result_dto = self.cursor_pagination_spec.paginate(posts, cursor, per_page)
+        posts_dto = self._posts_dto(paginated_posts, fields)
+        return posts_dto, paginated_result_dto
 
-    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> PostDTO:
-        """Update post"""
-        post = Post.objects.get(pk=post_id)
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> Union[PostDTO, None]:
+        """Get post by id"""
+        post = self._project(Post.published.filter(pk=post_id), fields).first()
+        return self._post_dto(post, fields) if post else None
+
+    def get_post_owner(self, post_id: int) -> Union[OwnerDTO, None]:
+        """Get id and author id of published post without loading other columns"""
+        owner = Post.published.filter(pk=post_id).values_list('id', 'author_id').first()
+        return OwnerDTO(*owner) if owner else None
+
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None) -> List[PostDTO]:
+        """Get published posts by ids with one query, in order of post_ids"""
+        posts = {post.pk: post for post in self._project(Post.published.filter(pk__in=post_ids).order_by(), fields)}
+        return self._posts_dto([posts[post_id] for post_id in post_ids if post_id in posts], fields)
+
+    def get_posts_watermark(self, specifications: Optional[List[Dict]] = None) -> WatermarkDTO:
+        """Get watermark of published posts matching filter specifications"""
+        filters = [condition for condition in specifications or []
+                   if isinstance(condition["spec"], FilterSpecificationInterface)]
+        return self._get_watermark(self.apply_specifications(Post.published.all(), filters))
+
+    def get_post_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
+        """Get watermark of published post, post is rendered with category name and author username"""
+        watermark = self._get_watermark(Post.published.filter(pk=post_id))
+        if not watermark.count:
+            return None
+        return watermark._replace(categories_version=self.category_registry.get_version(),
+                                  authors_version=self.authors_version.get_version())
+
+    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
+        """Update post loaded once with its author, only changed tag links are written"""
+        post = self._get_post_for_update(post_id)
+        if post is None:
+            return None
+        old_post = copy(post)
 
         post.title = update_post_dto.title
         post.slug = update_post_dto.slug
@@ -115,32 +204,42 @@ class PostRepository(PostRepositoryInterface):
         post.image_url = update_post_dto.post_image_url
         post.status = update_post_dto.status
         post.category_id = update_post_dto.category_id
+        post.tag_names = self._unique_tags(update_post_dto.tags)
 
-        post.tags.clear()
-        post.tags.add(*update_post_dto.tags)
-        post.save()
+        with transaction.atomic():
+            self._set_tags(post, old_post.tag_names)
+            post.save(update_fields=self.UPDATE_FIELDS)
+            self._change_tag_stats([old_post], [post])
+        return self._updated_post_dto(old_post, post)
 
-        post.likes_count = post.likes.count()
-        post.dislikes_count = post.dislikes.count()
-        return self._post_dto(post)
-
-    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> PostDTO:
+    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
         """Partial post update"""
-        post = Post.objects.get(pk=post_id)
+        post = self._get_post_for_update(post_id)
+        if post is None:
+            return None
+        old_post = copy(post)
         not_none_attributes = {key: value for key, value in partial_post_dto._asdict().items() if value is not None}
 
         for key, value in not_none_attributes.items():
             self._update_post_attribute(post, key, value)
 
-        post.save()
-        post.likes_count = post.likes.count()
-        post.dislikes_count = post.dislikes.count()
-        return self._post_dto(post)
-
-    def delete_post_by_id(self, post_id: int) -> None:
-        """Delete category by id"""
-        post = Post.objects.get(pk=post_id)
+        with transaction.atomic():
+            self._set_tags(post, old_post.tag_names)
+            post.save(update_fields=self.UPDATE_FIELDS)
+            self._change_tag_stats([old_post], [post])
+        return self._updated_post_dto(old_post, post)
+
+    def delete_post_by_id(self, post_id: int) -> bool:
+        """Delete post by id, only columns needed for tag stats are loaded"""
+        post = Post.objects.only('id', 'status', 'tag_names').filter(pk=post_id).first()
+        if post is None:
+            return False
         post.delete()
+        self._change_tag_stats([post], [])
+        return True
+
+    def invalidate(self) -> None:
+        """Nothing is cached"""
 
     def apply_specifications(self, query: QuerySet, conditions: List[Dict]) -> QuerySet:
         for condition in conditions:
@@ -152,6 +251,26 @@ class PostRepository(PostRepositoryInterface):
                 query = spec.build_order(query, value)
         return query
 
+    def _published_posts_query(self, specifications: Optional[List[Dict]] = None,
+                               fields: Optional[List[str]] = None) -> QuerySet:
+        """Return published posts query with applied specifications"""
+        query = self._project(Post.published.order_by("-publish"), fields)
+
+        if specifications:
+            query = self.apply_specifications(query, specifications)
+        return query
+
+    def _project(self, query: QuerySet, fields: Optional[List[str]] = None) -> QuerySet:
+        """Load only columns and joins needed for requested dto fields, all fields by default"""
+        fields = fields or PostDTO._fields
+        if 'author' in fields:
+            query = query.select_related('author')
+
+        columns = {'id', 'publish'}
+        for field in fields:
+            columns.update(self.DTO_COLUMNS.get(field, ()))
+        return query.only(*columns)
+
     def create_post(self, post_dto: NewPostDTO) -> PostDTO:
         """Create new post"""
         post = Post.objects.create(
@@ -161,37 +280,124 @@ class PostRepository(PostRepositoryInterface):
             body=post_dto.content,
             image_url=post_dto.post_image_url,
             status=post_dto.status,
-            category_id=post_dto.category_id)
-        post.tags.add(*post_dto.tags)
-        post.save()
-        post.likes_count = 0
-        post.dislikes_count = 0
+            category_id=post_dto.category_id,
+            tag_names=self._unique_tags(post_dto.tags))
+        post.tags.add(*post.tag_names)
+        self._change_tag_stats([], [post])
         return self._post_dto(post)
 
-    def _posts_dto(self, posts: List[Post]) -> List[PostDTO]:
-        """Return posts as list of dto objects"""
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[PostDTO]:
+        """Create posts with batched inserts, tags and tag links with set-based inserts, all in one transaction"""
+        if not posts_dto:
+            return []
+
+        authors = User.objects.only('id', 'username').in_bulk({post_dto.author_id for post_dto in posts_dto})
+        posts = [
+            Post(
+                title=post_dto.title,
+                slug=post_dto.slug,
+                author=authors[post_dto.author_id],
+                body=post_dto.content,
+                excerpt=build_excerpt(post_dto.content),
+                image_url=post_dto.post_image_url,
+                status=post_dto.status,
+                category_id=post_dto.category_id,
+                tag_names=self._unique_tags(post_dto.tags))
+            for post_dto in posts_dto
+        ]
+        with transaction.atomic():
+            Post.objects.bulk_create(posts, batch_size=self.BULK_BATCH_SIZE)
+            self._bulk_add_tags([(post, post.tag_names) for post in posts])
+            self._change_tag_stats([], posts)
+        return self._posts_dto(posts)
+
+    def _get_post_for_update(self, post_id: int) -> Union[Post, None]:
+        """Load post with author, dto of updated post is built from this row"""
+        return Post.objects.select_related('author').filter(pk=post_id).first()
+
+    def _set_tags(self, post: Post, old_tag_names: List[str]) -> None:
+        """Delete links of removed tags and add links of new tags, unchanged links are kept"""
+        tagged_item_model = Post.tags.through
+        removed_tag_names = set(old_tag_names) - set(post.tag_names)
+        if removed_tag_names:
+            tagged_item_model.objects.filter(content_type=ContentType.objects.get_for_model(Post),
+                                             object_id=post.pk, tag__name__in=removed_tag_names).delete()
+        self._bulk_add_tags([(post, [name for name in post.tag_names if name not in old_tag_names])])
+
+    def _bulk_add_tags(self, posts_tag_names: List[Tuple[Post, List[str]]]) -> None:
+        """Create missing tags and link them to posts"""
+        tag_names = {name for _, post_tag_names in posts_tag_names for name in post_tag_names}
+        if not tag_names:
+            return
+
+        tagged_item_model = Post.tags.through
+        tag_model = tagged_item_model.tag_model()
+        tag_model.objects.bulk_create(
+            [tag_model(name=name, slug=tag_model().slugify(name)) for name in tag_names],
+            batch_size=self.BULK_BATCH_SIZE,
+            ignore_conflicts=True)
+        tag_ids = dict(tag_model.objects.filter(name__in=tag_names).values_list('name', 'id'))
+        for name in tag_names - tag_ids.keys():
+            # slug is taken by tag with another name, taggit picks free slug on save
+            tag_ids[name] = tag_model.objects.get_or_create(name=name)[0].id
+
+        content_type = ContentType.objects.get_for_model(Post)
+        tagged_item_model.objects.bulk_create(
+            [tagged_item_model(content_type=content_type, object_id=post.pk, tag_id=tag_ids[name])
+             for post, post_tag_names in posts_tag_names for name in post_tag_names],
+            batch_size=self.BULK_BATCH_SIZE,
+            ignore_conflicts=True)
+
+    def _updated_post_dto(self, old_post: Post, post: Post) -> UpdatedPostDTO:
+        return UpdatedPostDTO(post=self._post_dto(post),
+                              published=old_post.status != 'published' and post.status == 'published')
+
+    def _change_tag_stats(self, old_posts: List[Post], posts: List[Post]) -> None:
+        """Apply to tag stats difference between published posts before and after change"""
+        change_tag_stats(get_tag_stats_deltas(self._published_tag_names(old_posts), self._published_tag_names(posts)))
+
+    def _published_tag_names(self, posts: List[Post]) -> List[str]:
+        return [name for post in posts if post.status == 'published' for name in post.tag_names]
+
+    def _unique_tags(self, tags: List[str]) -> List[str]:
+        """Return tag names without duplicates, keeping order"""
+        return list(dict.fromkeys(tags))
+
+    def _posts_dto(self, posts: List[Post], fields: Optional[List[str]] = None) -> List[PostDTO]:
+        """Return posts as list of dto objects, categories of all posts are resolved from one registry snapshot"""
+        categories = None
+        if posts and (not fields or 'category' in fields):
+            categories = self.category_registry.get_categories_by_ids({post.category_id for post in posts})
         posts_dto = []
         for post in posts:
-            post_dto = self._post_dto(post)
+            post_dto = self._post_dto(post, fields, categories)
             posts_dto.append(post_dto)
         return posts_dto
 
-    def _post_dto(self, post: Post) -> PostDTO:
-        """Return post as dto object"""
-        post_dto = PostDTO(id=post.pk,
-                           title=post.title,
-                           slug=post.slug,
-                           author=post.author.username,
-                           author_id=post.author.id,
-                           content=post.body,
-                           publish=post.publish,
-                           post_image_url=post.image_url,
-                           category=post.category.name,
-                           category_id=post.category.pk,
-                           likes_count=post.likes_count,
-                           dislikes_count=post.dislikes_count,
-                           tags=post.tags)
-        return post_dto
+    def _post_dto(self, post: Post, fields: Optional[List[str]] = None,
+                  categories: Optional[Dict[int, CategoryDTO]] = None) -> PostDTO:
+        """Return post as dto object, fields which are not requested are None"""
+        fields = fields or PostDTO._fields
+        return PostDTO(**{
+            field: self._post_dto_value(post, field, categories) if field in fields else None
+            for field in PostDTO._fields
+        })
+
+    def _post_dto_value(self, post: Post, field: str, categories: Optional[Dict[int, CategoryDTO]]) -> Any:
+        if field == 'author':
+            return post.author.username
+        if field == 'category':
+            return self._get_category_name(post, categories)
+        if field == 'tags':
+            return list(post.tag_names)
+        return getattr(post, self.DTO_ATTRIBUTES.get(field, field))
+
+    def _get_category_name(self, post: Post, categories: Optional[Dict[int, CategoryDTO]]) -> str:
+        """Return category name from registry, load category only if registry does not know it yet"""
+        if categories is None:
+            categories = self.category_registry.get_categories_by_ids([post.category_id])
+        category = categories.get(post.category_id)
+        return category.name if category else post.category.name
 
     def _update_post_attribute(self, post: Post, key: str, value: Any) -> None:
         if key == 'content':
@@ -199,30 +405,161 @@ class PostRepository(PostRepositoryInterface):
         elif key == 'post_image_url':
             post.image_url = value
         elif key == 'tags':
-            post.tags.clear()
-            post.tags.add(*value)
+            post.tag_names = self._unique_tags(value)
         else:
             setattr(post, key, value)
 
 
-class CommentRepository(CommentRepositoryInterface):
+class CachedPostRepository(PostRepositoryInterface):
+    """Post repository decorator which caches post list pages.
+
+    Every write bumps generation counter, so all cached pages become unreachable at once
+    and expire by timeout.
+    """
+    GENERATION_KEY = 'blog:posts:generation'
+    PAGE_KEY_PREFIX = 'blog:posts:page'
+
+    def __init__(self, repository: PostRepositoryInterface, cache: BaseCache, timeout: int):
+        self.repository = repository
+        self.cache = cache
+        self.timeout = timeout
+
+    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
+        """Get posts page from cache or repository"""
+        key = self._page_cache_key(specifications, page=page, per_page=per_page, fields=self._canonical_value(fields))
+        return self._get_or_set(key, self.repository.get_paginated_posts, page, per_page, specifications, fields)
+
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int,
+                                   specifications: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        """Get posts page by cursor from cache or repository"""
+        key = self._page_cache_key(specifications, cursor=cursor, per_page=per_page,
+                                   fields=self._canonical_value(fields))
+        return self._get_or_set(key, self.repository.get_cursor_paginated_posts, cursor, per_page, specifications,
+                                fields)
+
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> Union[PostDTO, None]:
+        return self.repository.get_post_by_id(post_id, fields)
+
+    def get_post_owner(self, post_id: int) -> Union[OwnerDTO, None]:
+        return self.repository.get_post_owner(post_id)
+
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None) -> List[PostDTO]:
+        return self.repository.get_posts_by_ids(post_ids, fields)
+
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[PostDTO]:
+        posts = self.repository.bulk_create_posts(posts_dto)
+        self.invalidate()
+        return posts
+
+    def get_posts_watermark(self, specifications: Optional[List[Dict]] = None) -> WatermarkDTO:
+        """Get watermark of posts list from cache generation, every write of posts bumps it"""
+        return WatermarkDTO(generation=self._get_generation())
+
+    def get_post_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
+        return self.repository.get_post_watermark(post_id)
+
+    def create_post(self, post_dto: NewPostDTO) -> PostDTO:
+        post = self.repository.create_post(post_dto)
+        self.invalidate()
+        return post
+
+    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
+        post = self.repository.update_post(update_post_dto, post_id)
+        self.invalidate()
+        return post
+
+    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> Union[UpdatedPostDTO, None]:
+        post = self.repository.update_partial_post(partial_post_dto, post_id)
+        self.invalidate()
+        return post
+
+    def delete_post_by_id(self, post_id: int) -> bool:
+        deleted = self.repository.delete_post_by_id(post_id)
+        self.invalidate()
+        return deleted
+
+    def invalidate(self) -> None:
+        """Move cache to next generation"""
+        try:
+            self.cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            # generation key was evicted or never set, new generation from clock is past all earlier ones
+            self.cache.set(self.GENERATION_KEY, self._initial_generation(), timeout=None)
+
+    def _get_generation(self) -> int:
+        return self.cache.get_or_set(self.GENERATION_KEY, self._initial_generation, timeout=None)
+
+    def _initial_generation(self) -> int:
+        # generation lost with evicted key must not repeat earlier one, ETags are built from it
+        return time.time_ns() // 1000
+
+    def _get_or_set(self, key: str, load, *args):
+        result = self.cache.get(key)
+        if result is None:
+            result = load(*args)
+            self.cache.set(key, result, self.timeout)
+        return result
+
+    def _page_cache_key(self, specifications: Optional[List[Dict]], **parameters) -> str:
+        """Return cache key built from canonical hash of page parameters and specifications"""
+        conditions = sorted(
+            [type(condition["spec"]).__name__, self._canonical_value(condition["value"])]
+            for condition in specifications or []
+        )
+        payload = json.dumps([parameters, conditions], sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f'{self.PAGE_KEY_PREFIX}:{self._get_generation()}:{digest}'
+
+    def _canonical_value(self, value: Any) -> Any:
+        if isinstance(value, (list, tuple, set)):
+            return sorted(value)
+        return value
+
+
+class CommentRepository(CommentRepositoryInterface, WatermarkMixin):
     """Comment repository for DjangoORM"""
 
+    def __init__(self, cursor_paginator: PaginationSpecificationInterface, authors_version: SharedVersionInterface):
+        self.cursor_pagination_spec = cursor_paginator
+        self.authors_version = authors_version
+
     def get_all_post_comments(self, post_id: int) -> List[CommentDTO]:
         """Get all comments by post id"""
         comments = Comment.objects.filter(post_id=post_id, active=True) \
-            .select_related('post', 'author') \
-            .annotate(likes=Count("comment_likes", distinct=True),
-                      dislikes=Count("comment_dislikes", distinct=True))\
+            .select_related('author') \
             .order_by("-created")
         return self._post_comments_dto(comments)
 
+    def iterate_post_comments(self, post_id: int, chunk_size: int = 1000) -> Iterator[CommentDTO]:
+        """Iterate comments by post id with server side cursor, without loading all of them in memory"""
+        comments = Comment.objects.filter(post_id=post_id, active=True) \
+            .select_related('author') \
+            .order_by("-created")
+        for comment in comments.iterator(chunk_size=chunk_size):
+            yield self._post_comment_dto(comment)
+
+    def get_cursor_paginated_post_comments(self, post_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[CommentDTO], CursorPaginatedResultDTO]:
+        """Get page of comments by post id, newest first, after or before cursor"""
+        comments = Comment.objects.filter(post_id=post_id, active=True) \
+            .select_related('author')
+        paginated_comments, paginated_result_dto = self.cursor_pagination_spec.paginate(comments, cursor, per_page)
+        return self._post_comments_dto(paginated_comments), paginated_result_dto
+
+    def get_post_comments_watermark(self, post_id: int) -> Union[WatermarkDTO, None]:
+        """Get watermark of active post comments, None if post not exists"""
+        if not Post.published.filter(pk=post_id).exists():
+            return None
+        watermark = self._get_watermark(Comment.objects.filter(post_id=post_id, active=True))
+        return watermark._replace(authors_version=self.authors_version.get_version())
+
     def get_post_comment_by_id(self, post_id, comment_id: int) -> Union[CommentDTO, None]:
         """Get post comment by id"""
         comment = Comment.objects.filter(id=comment_id, post_id=post_id, active=True)\
-            .select_related('post', 'author') \
-            .annotate(likes=Count("comment_likes", distinct=True),
-                      dislikes=Count("comment_dislikes", distinct=True)) \
+            .select_related('author') \
             .first()
         return self._post_comment_dto(comment) if comment else None
 
@@ -232,22 +569,27 @@ class CommentRepository(CommentRepositoryInterface):
             body=body,
             author_id=author_id,
             post_id=post_id)
-        comment.save()
-        comment.likes = 0
-        comment.dislikes = 0
         return self._post_comment_dto(comment)
 
-    def update_post_comment(self, body: str, comment_id: int) -> CommentDTO:
-        """Update post comment"""
-        comment = Comment.objects.get(id=comment_id, active=True)
+    def get_post_comment_owner(self, post_id: int, comment_id: int) -> Union[OwnerDTO, None]:
+        """Get id and author id of active comment of published post with one query"""
+        owner = Comment.objects.filter(id=comment_id, post_id=post_id, active=True, post__status='published')\
+            .values_list('id', 'author_id') \
+            .first()
+        return OwnerDTO(*owner) if owner else None
+
+    def update_post_comment(self, body: str, comment_id: int) -> Union[CommentDTO, None]:
+        """Update post comment, dto is built from the same row loaded with author"""
+        comment = Comment.objects.filter(id=comment_id, active=True).select_related('author').first()
+        if comment is None:
+            return None
         comment.body = body
-        comment.save()
-        return self.get_post_comment_by_id(comment.post.pk, comment.pk)
+        comment.save(update_fields=['body', 'updated'])
+        return self._post_comment_dto(comment)
 
     def delete_comment_by_id(self, comment_id: int) -> None:
-        """Delete category by id"""
-        comment = Comment.objects.get(pk=comment_id)
-        comment.delete()
+        """Delete comment by id"""
+        Comment.objects.filter(pk=comment_id).delete()
 
     def _post_comments_dto(self, comments: List[Comment]) -> List[CommentDTO]:
         """Return post comments as list of dto objects"""
@@ -262,12 +604,150 @@ class CommentRepository(CommentRepositoryInterface):
         comment_dto = CommentDTO(
             id=comment.pk,
             body=comment.body,
-            post_id=comment.post.pk,
+            post_id=comment.post_id,
             author=comment.author.username,
-            author_id=comment.author.id,
+            author_id=comment.author_id,
             created=comment.created,
             updated=comment.updated,
-            likes=comment.likes,
-            dislikes=comment.dislikes
+            likes=comment.likes_count,
+            dislikes=comment.dislikes_count
         )
         return comment_dto
+
+
+class ReactionRepository(ReactionRepositoryInterface):
+    """Reaction repository for DjangoORM"""
+    # (target, reaction): (target model, reaction model, foreign key of reaction model)
+    REACTION_MODELS = {
+        (POST, LIKE): (Post, PostLike, 'post'),
+        (POST, DISLIKE): (Post, PostDislike, 'post'),
+        (COMMENT, LIKE): (Comment, CommentLike, 'comment'),
+        (COMMENT, DISLIKE): (Comment, CommentDislike, 'comment'),
+    }
+    BULK_BATCH_SIZE = 1000
+
+    def has_reaction(self, target: str, target_id: int, user_id: int, reaction: str) -> bool:
+        """Check if reaction of user is stored"""
+        _, reaction_model, foreign_key = self.REACTION_MODELS[(target, reaction)]
+        return reaction_model.objects.filter(**{f'{foreign_key}_id': target_id, 'user_id': user_id}).exists()
+
+    def apply_reaction_changes(self, changes: List[ReactionChangesDTO]) -> None:
+        """Insert added and delete removed reactions in batches, recalculate counters of changed objects"""
+        with transaction.atomic():
+            for change in changes:
+                target_model, reaction_model, foreign_key = self.REACTION_MODELS[(change.target, change.reaction)]
+                self._add_reactions(target_model, reaction_model, foreign_key, change.added)
+                self._remove_reactions(reaction_model, foreign_key, change.removed)
+                target_ids = {target_id for target_id, _ in change.added + change.removed}
+                refresh_reaction_counters(reaction_model._meta.object_name, target_ids)
+
+    def _add_reactions(self, target_model, reaction_model, foreign_key: str,
+                       reactions: List[Tuple[int, int]]) -> None:
+        """Insert reactions of existing users to existing objects, skip already stored reactions"""
+        if not reactions:
+            return
+
+        target_ids = set(target_model.objects.filter(pk__in={target_id for target_id, _ in reactions})
+                         .values_list('pk', flat=True))
+        user_ids = set(User.objects.filter(pk__in={user_id for _, user_id in reactions})
+                       .values_list('pk', flat=True))
+        reaction_model.objects.bulk_create(
+            [reaction_model(**{f'{foreign_key}_id': target_id, 'user_id': user_id})
+             for target_id, user_id in reactions if target_id in target_ids and user_id in user_ids],
+            batch_size=self.BULK_BATCH_SIZE,
+            ignore_conflicts=True)
+
+    def _remove_reactions(self, reaction_model, foreign_key: str, reactions: List[Tuple[int, int]]) -> None:
+        # plain DELETE without per-row post_delete signals, counters are recalculated after all changes
+        table = connection.ops.quote_name(reaction_model._meta.db_table)
+        target_column = connection.ops.quote_name(reaction_model._meta.get_field(foreign_key).column)
+        user_column = connection.ops.quote_name(reaction_model._meta.get_field('user').column)
+        with connection.cursor() as cursor:
+            for start in range(0, len(reactions), self.BULK_BATCH_SIZE):
+                batch = reactions[start:start + self.BULK_BATCH_SIZE]
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE ({target_column}, {user_column}) IN '
+                    f'({", ".join(["(%s, %s)"] * len(batch))})',
+                    [value for reaction in batch for value in reaction])
+
+
+class TagRepository(TagRepositoryInterface):
+    """Tag repository for DjangoORM"""
+
+    def get_tag_stats(self, prefix: Optional[str], limit: int) -> List[TagStatDTO]:
+        """Get tags with most published posts from tag stats table, optionally only names starting with prefix"""
+        tag_stats = TagStat.objects.filter(posts_count__gt=0)
+        if prefix:
+            tag_stats = tag_stats.filter(name__istartswith=prefix)
+        return [TagStatDTO(name=name, posts_count=posts_count) for name, posts_count in
+                tag_stats.order_by('-posts_count', 'name').values_list('name', 'posts_count')[:limit]]
+
+
+class TimelineRepository(TimelineRepositoryInterface):
+    """Timeline repository for DjangoORM"""
+
+    def count_followers(self, author_id: int) -> int:
+        """Count followers of author"""
+        return Follow.objects.filter(followed_id=author_id).count()
+
+    def iterate_follower_ids(self, author_id: int, chunk_size: int) -> Iterator[List[int]]:
+        """Iterate ids of followers of author in chunks with server side cursor"""
+        follower_ids = Follow.objects.filter(followed_id=author_id)\
+            .values_list('follower_id', flat=True).iterator(chunk_size=chunk_size)
+        while chunk := list(islice(follower_ids, chunk_size)):
+            yield chunk
+
+    def get_followed_author_ids(self, user_id: int, author_ids: Set[int]) -> List[int]:
+        """Get authors followed by user among author_ids"""
+        return list(Follow.objects.filter(follower_id=user_id, followed_id__in=author_ids)
+                    .values_list('followed_id', flat=True))
+
+    def get_followed_entries(self, user_id: int, exclude_author_ids: Set[int], limit: int) -> List[TimelineEntryDTO]:
+        """Get newest published posts of authors followed by user except excluded authors"""
+        entries = Post.published.filter(author__followers__follower_id=user_id)\
+            .exclude(author_id__in=exclude_author_ids)\
+            .order_by('-publish', '-id')\
+            .values_list('id', 'publish')[:limit]
+        return [TimelineEntryDTO(post_id=post_id, score=publish.timestamp()) for post_id, publish in entries]
+
+    def get_authors_entries(self, author_ids: List[int], before: Optional[Tuple[float, int]],
+                            limit: int) -> List[TimelineEntryDTO]:
+        """Get newest published posts of authors older than before (score, post id) position"""
+        entries = Post.published.filter(author_id__in=author_ids)
+        if before is not None:
+            score, post_id = before
+            publish = datetime.fromtimestamp(score, tz=dt_timezone.utc)
+            entries = entries.filter(Q(publish__lt=publish) | Q(publish=publish, id__lt=post_id))
+        entries = entries.order_by('-publish', '-id').values_list('id', 'publish')[:limit]
+        return [TimelineEntryDTO(post_id=post_id, score=publish.timestamp()) for post_id, publish in entries]
+
+
+class TrendingRepository(TrendingRepositoryInterface):
+    """Trending repository for DjangoORM"""
+
+    def iterate_post_scores(self, since: datetime, now: datetime, half_life: float, comment_weight: float,
+                            chunk_size: int) -> Iterator[Dict[int, float]]:
+        """Iterate scores of posts published between since and now, computed by database for whole chunk.
+
+        Score is (likes - dislikes + comment_weight * active comments + 1) halved every half_life seconds
+        of post age, posts with more dislikes than other reactions are not ranked.
+        """
+        comments_count = Subquery(
+            Comment.objects.filter(post_id=OuterRef('pk'), active=True)
+            .order_by().values('post_id').annotate(count=Count('pk')).values('count'))
+        engagement = F('likes_count') - F('dislikes_count') + Coalesce(comments_count, 0) * comment_weight + 1
+        age = Value(now.timestamp()) - Extract('publish', 'epoch', tzinfo=dt_timezone.utc)
+        score = ExpressionWrapper(Greatest(engagement, 0) * Power(0.5, age / half_life), output_field=FloatField())
+
+        posts = Post.published.filter(publish__gte=since, publish__lte=now)\
+            .annotate(score=score)\
+            .order_by('-publish', '-id')\
+            .values_list('id', 'publish', 'score')
+        chunk = list(posts[:chunk_size])
+        while chunk:
+            yield {post_id: post_score for post_id, _, post_score in chunk if post_score > 0}
+            if len(chunk) < chunk_size:
+                break
+            last_id, last_publish, _ = chunk[-1]
+            older_posts = posts.filter(Q(publish__lt=last_publish) | Q(publish=last_publish, id__lt=last_id))
+            chunk = list(older_posts[:chunk_size])
@@ -0,0 +1,289 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+from collections import Counter
+from itertools import accumulate, islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from taggit.models import Tag, TaggedItem
+
+from accounts.models import Profile
+from .counters import rebuild_tag_stats
+from .models import (
+    Category, Post, Comment, PostLike, PostDislike, CommentLike, CommentDislike, Follow, build_excerpt
+)
+
+User = get_user_model()
+
+WORDS = (
+    'django', 'python', 'database', 'query', 'index', 'cache', 'server', 'request', 'response', 'model',
+    'service', 'repository', 'pattern', 'design', 'testing', 'deploy', 'docker', 'network', 'latency',
+    'memory', 'thread', 'process', 'async', 'queue', 'worker', 'schema', 'migration', 'security', 'token',
+    'session', 'frontend', 'backend', 'api', 'json', 'search', 'scale', 'cluster', 'replica', 'backup',
+    'monitor', 'metric', 'profile', 'release', 'feature', 'review', 'refactor', 'library', 'framework',
+    'travel', 'music', 'garden', 'coffee', 'book', 'movie', 'sport', 'health', 'recipe', 'photo', 'city',
+)
+
+
+class SeedVolumes(NamedTuple):
+    users: int
+    categories: int
+    tags: int
+    posts: int
+    comments: int
+    post_reactions: int
+    comment_reactions: int
+    follows: int
+
+
+class ZipfSampler:
+    """Sampler of items where k-th most popular item is chosen with probability proportional to 1 / k^exponent.
+
+    Popularity ranks are shuffled, so popular items are spread over the whole sequence.
+    """
+
+    def __init__(self, rng: random.Random, items: Sequence, exponent: float):
+        self.rng = rng
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(accumulate(1 / rank ** exponent for rank in range(1, len(self.items) + 1)))
+
+    def sample(self, k: int) -> List:
+        return self.rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+
+    def sample_distinct(self, k: int) -> List:
+        """Return at most k distinct items, popular items collapse into one"""
+        return list(dict.fromkeys(self.sample(k)))
+
+
+class BlogSeeder:
+    """Generator of synthetic blog data for load testing.
+
+    Rows are generated deterministically from seed, so the same seed and volumes give the same
+    data on an empty database. Rows are inserted with bulk_create in chunks, link tables (tags,
+    reactions, follows) are loaded with COPY. Authors, categories, tags, commented and reacted
+    posts and followed users are Zipf distributed. Signals are not sent: ids of posts and comments
+    are reserved before reactions are sampled, so rows are inserted with final reaction counters,
+    and tag stats are rebuilt once at the end.
+    """
+    PUBLISHED_RATIO = 0.9
+    LIKE_RATIO = 0.8
+    MAX_POST_TAGS = 4
+    PUBLISH_DAYS = 365
+
+    def __init__(self, seed: int, chunk_size: int, exponent: float, prefix: str, password: str,
+                 log: Optional[Callable[[str], None]] = None):
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.exponent = exponent
+        self.prefix = prefix
+        self.password = password
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def seed(self, volumes: SeedVolumes) -> Dict[str, int]:
+        """Insert rows of all models in one transaction, return number of inserted rows by model"""
+        with transaction.atomic():
+            user_ids = self.create_users(volumes.users)
+            category_ids = self.create_categories(volumes.categories)
+            tag_names = self.create_tags(volumes.tags)
+
+            has_posts = bool(user_ids and category_ids)
+            post_ids = self._reserve_ids(Post, volumes.posts if has_posts else 0)
+            comment_ids = self._reserve_ids(Comment, volumes.comments if post_ids else 0)
+            post_likes, post_dislikes = self.sample_reactions(volumes.post_reactions, user_ids, post_ids)
+            comment_likes, comment_dislikes = self.sample_reactions(volumes.comment_reactions, user_ids, comment_ids)
+
+            self.create_posts(post_ids, user_ids, category_ids, tag_names, post_likes, post_dislikes)
+            self.create_comments(comment_ids, user_ids, post_ids, comment_likes, comment_dislikes)
+            self._copy(PostLike, ['user_id', 'post_id', 'created'], (like + (self.now,) for like in post_likes))
+            self._copy(PostDislike, ['user_id', 'post_id', 'created'],
+                       (dislike + (self.now,) for dislike in post_dislikes))
+            self._copy(CommentLike, ['user_id', 'comment_id'], comment_likes)
+            self._copy(CommentDislike, ['user_id', 'comment_id'], comment_dislikes)
+            follows = self.create_follows(volumes.follows, user_ids)
+
+            self.log('Rebuilding tag stats')
+            rebuild_tag_stats()
+
+        return {
+            'users': len(user_ids),
+            'categories': len(category_ids),
+            'tags': len(tag_names),
+            'posts': len(post_ids),
+            'comments': len(comment_ids),
+            'post reactions': len(post_likes) + len(post_dislikes),
+            'comment reactions': len(comment_likes) + len(comment_dislikes),
+            'follows': follows,
+        }
+
+    def create_users(self, total: int) -> List[int]:
+        """Create active users with profiles, all users have the same password"""
+        password = make_password(self.password)
+        users = (
+            User(email=f'{self.prefix}{number}@example.com', username=f'{self.prefix}{number}',
+                 first_name=self.rng.choice(WORDS).title(), last_name=self.rng.choice(WORDS).title(),
+                 password=password, is_active=True)
+            for number in range(total)
+        )
+        user_ids = self._bulk_create(User, users, total)
+        profiles = (
+            Profile(user_id=user_id, gender=self.rng.choice(('male', 'female')),
+                    date_of_birth=date(1950, 1, 1) + timedelta(days=self.rng.randrange(50 * 365)),
+                    bio=self._sentence(20), info=self._sentence(8))
+            for user_id in user_ids
+        )
+        self._bulk_create(Profile, profiles, total)
+        return user_ids
+
+    def create_categories(self, total: int) -> List[int]:
+        categories = (
+            Category(name=f'{self.prefix} category {number}', slug=slugify(f'{self.prefix} category {number}'))
+            for number in range(total)
+        )
+        return self._bulk_create(Category, categories, total)
+
+    def create_tags(self, total: int) -> List[str]:
+        names = [f'{self.rng.choice(WORDS)}-{self.prefix}{number}' for number in range(total)]
+        self._bulk_create(Tag, (Tag(name=name, slug=slugify(name)) for name in names), total)
+        return names
+
+    def sample_reactions(self, total: int, user_ids: List[int],
+                         object_ids: List[int]) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Return likes and dislikes as (user id, object id) of users on popular objects.
+
+        User reacts to object at most once.
+        """
+        if not user_ids or not object_ids:
+            return [], []
+
+        objects = ZipfSampler(self.rng, object_ids, self.exponent)
+        reacted = set()
+        likes, dislikes = [], []
+        for reaction in zip(self.rng.choices(user_ids, k=total), objects.sample(total)):
+            if reaction in reacted:
+                continue
+            reacted.add(reaction)
+            reactions = likes if self.rng.random() < self.LIKE_RATIO else dislikes
+            reactions.append(reaction)
+        return likes, dislikes
+
+    def create_posts(self, post_ids: List[int], user_ids: List[int], category_ids: List[int], tag_names: List[str],
+                     likes: List[Tuple[int, int]], dislikes: List[Tuple[int, int]]) -> None:
+        """Create posts of popular authors in popular categories with popular tags and link their tags"""
+        if not post_ids:
+            return
+
+        total = len(post_ids)
+        authors = ZipfSampler(self.rng, user_ids, self.exponent)
+        categories = ZipfSampler(self.rng, category_ids, self.exponent)
+        tags = ZipfSampler(self.rng, tag_names, self.exponent) if tag_names else None
+        likes_counts = Counter(post_id for _, post_id in likes)
+        dislikes_counts = Counter(post_id for _, post_id in dislikes)
+        posts_tag_names = []
+
+        def generate_posts() -> Iterator[Post]:
+            for number, (post_id, author_id, category_id) in enumerate(
+                    zip(post_ids, authors.sample(total), categories.sample(total))):
+                title = self._sentence(6).capitalize()
+                body = '\n\n'.join(self._sentence(self.rng.randint(20, 60)) for _ in range(self.rng.randint(1, 5)))
+                names = tags.sample_distinct(self.rng.randint(0, self.MAX_POST_TAGS)) if tags else []
+                posts_tag_names.append(names)
+                yield Post(
+                    id=post_id, title=title, slug=f'{slugify(title)[:180]}-{number}', author_id=author_id,
+                    body=body, excerpt=build_excerpt(body), category_id=category_id, tag_names=names,
+                    status='published' if self.rng.random() < self.PUBLISHED_RATIO else 'draft',
+                    publish=self.now - timedelta(seconds=self.rng.randrange(self.PUBLISH_DAYS * 24 * 3600)),
+                    likes_count=likes_counts[post_id], dislikes_count=dislikes_counts[post_id])
+
+        self._bulk_create(Post, generate_posts(), total)
+
+        tag_ids = dict(Tag.objects.filter(name__in=tag_names).values_list('name', 'id'))
+        content_type_id = ContentType.objects.get_for_model(Post).id
+        tagged_items = (
+            (tag_ids[name], content_type_id, post_id)
+            for post_id, names in zip(post_ids, posts_tag_names)
+            for name in names
+        )
+        self._copy(TaggedItem, ['tag_id', 'content_type_id', 'object_id'], tagged_items)
+
+    def create_comments(self, comment_ids: List[int], user_ids: List[int], post_ids: List[int],
+                        likes: List[Tuple[int, int]], dislikes: List[Tuple[int, int]]) -> None:
+        """Create comments of active users on popular posts"""
+        if not comment_ids:
+            return
+
+        total = len(comment_ids)
+        commenters = ZipfSampler(self.rng, user_ids, self.exponent)
+        posts = ZipfSampler(self.rng, post_ids, self.exponent)
+        likes_counts = Counter(comment_id for _, comment_id in likes)
+        dislikes_counts = Counter(comment_id for _, comment_id in dislikes)
+        comments = (
+            Comment(id=comment_id, post_id=post_id, author_id=author_id,
+                    body=self._sentence(self.rng.randint(3, 30))[:255],
+                    likes_count=likes_counts[comment_id], dislikes_count=dislikes_counts[comment_id])
+            for comment_id, post_id, author_id in zip(comment_ids, posts.sample(total), commenters.sample(total))
+        )
+        self._bulk_create(Comment, comments, total)
+
+    def create_follows(self, total: int, user_ids: List[int]) -> int:
+        """Create follows of users on popular users, so few authors have most followers"""
+        if len(user_ids) < 2:
+            return 0
+
+        followed = ZipfSampler(self.rng, user_ids, self.exponent)
+        follows = {
+            (follower_id, followed_id)
+            for follower_id, followed_id in zip(self.rng.choices(user_ids, k=total), followed.sample(total))
+            if follower_id != followed_id
+        }
+        self._copy(Follow, ['follower_id', 'followed_id', 'created'],
+                   (follow + (self.now,) for follow in sorted(follows)))
+        return len(follows)
+
+    def _sentence(self, words: int) -> str:
+        return ' '.join(self.rng.choices(WORDS, k=words))
+
+    @staticmethod
+    def _reserve_ids(model, total: int) -> List[int]:
+        """Take next total values of id sequence of model table"""
+        if not total:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                           [model._meta.db_table, model._meta.pk.column, total])
+            return [row[0] for row in cursor.fetchall()]
+
+    def _bulk_create(self, model, objects: Iterable[models.Model], total: int) -> List[int]:
+        """Insert objects in chunks, return their ids in order of objects"""
+        ids = []
+        objects = iter(objects)
+        while chunk := list(islice(objects, self.chunk_size)):
+            model.objects.bulk_create(chunk)
+            ids.extend(obj.pk for obj in chunk)
+            self.log(f'{model._meta.verbose_name_plural}: {len(ids)}/{total}')
+        return ids
+
+    def _copy(self, model, fields: List[str], rows: Iterable[tuple]) -> None:
+        """Load rows into table of model with COPY in chunks"""
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+        sql = f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+        copied = 0
+        rows = iter(rows)
+        with connection.cursor() as cursor:
+            while chunk := list(islice(rows, self.chunk_size)):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                copied += len(chunk)
+                self.log(f'{model._meta.verbose_name_plural}: {copied}')
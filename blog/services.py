@@ -1,21 +1,35 @@
+import base64
+import binascii
+import json
+import math
 import re
-from typing import List, Optional, Dict, Tuple
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Optional, Dict, Tuple, Iterator, Any
 
+from django.db import transaction
+from django.utils import timezone
 from django.utils.text import slugify
 
 from blog.dto import (
     CategoryDTO,
-    NewCategoryDTO, PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO
+    NewCategoryDTO, PostDTO, NewPostDTO, PartialPostDTO, CommentDTO, NewCommentDTO, PaginatedResultDTO,
+    CursorPaginatedResultDTO, WatermarkDTO, TimelineEntryDTO, TagStatDTO, OwnerDTO, UpdatedPostDTO
 )
 from blog.exceptions import (
     CategoryAlreadyExistsError,
-    CategoryDoesNotExistsError, PostDoesNotExistsError, PostCommentDoesNotExistsError
+    CategoryDoesNotExistsError, PostDoesNotExistsError, PostCommentDoesNotExistsError, InvalidPostFieldsError,
+    InvalidPostIdsError, InvalidCursorError
 )
 from blog.interfaces import (
-    CategoryRepositoryInterface,
+    CategoryRepositoryInterface, CategoryRegistryInterface,
     CategoryServiceInterface, PostServiceInterface, PostRepositoryInterface, CommentRepositoryInterface,
-    CommentServiceInterface
+    CommentServiceInterface, ReactionBufferInterface, ReactionRepositoryInterface, ReactionServiceInterface,
+    TimelineStoreInterface, TimelineRepositoryInterface, TimelineServiceInterface, TrendingStoreInterface,
+    TrendingRepositoryInterface, TrendingServiceInterface, TagRepositoryInterface, TagServiceInterface,
+    OrderSpecificationInterface
 )
+from blog.reactions import POST, COMMENT, LIKE, DISLIKE
 
 
 class SlugServiceMixin:
@@ -28,23 +42,58 @@ class SlugServiceMixin:
         return user_slug
 
 
+class PendingReactionsMixin:
+    """Add reactions which wait in buffer to counters of DTOs"""
+    reactions: ReactionBufferInterface
+    reactions_target: str
+    # counter fields of DTO by reaction
+    reaction_fields: Dict[str, str]
+
+    def _with_pending_reactions(self, items: List[Any]) -> List[Any]:
+        # buffer is not read for projections without counters
+        pending_deltas = self.reactions.get_pending_deltas(
+            self.reactions_target, [item.id for item in items if item.id is not None and self._has_counters(item)])
+        return [self._add_pending_reactions(item, pending_deltas[item.id]) if item.id in pending_deltas else item
+                for item in items]
+
+    def _has_counters(self, item: Any) -> bool:
+        return any(getattr(item, field) is not None for field in self.reaction_fields.values())
+
+    def _add_pending_reactions(self, item: Any, deltas: Dict[str, int]) -> Any:
+        counters = {field: max(getattr(item, field) + deltas[reaction], 0)
+                    for reaction, field in self.reaction_fields.items() if getattr(item, field) is not None}
+        return item._replace(**counters)
+
+    def _with_reactions_version(self, watermark: Optional[WatermarkDTO]) -> Optional[WatermarkDTO]:
+        if watermark is None:
+            return None
+        return watermark._replace(reactions_version=self.reactions.get_version())
+
+
 class CategoryService(CategoryServiceInterface, SlugServiceMixin):
     """Service layer to work with categories domain logic"""
-    def __init__(self, repository: CategoryRepositoryInterface):
+    def __init__(self, repository: CategoryRepositoryInterface, registry: CategoryRegistryInterface,
+                 post_repository: PostRepositoryInterface):
         self.repository = repository
+        self.registry = registry
+        self.post_repository = post_repository
 
     def get_all_categories(self) -> List[CategoryDTO]:
         """Get all blog categories"""
-        categories_dto = self.repository.get_all_categories()
+        categories_dto = self.registry.get_all_categories()
         return categories_dto
 
     def get_category_by_id(self, category_id: int) -> CategoryDTO:
         """Get category by id or raise error"""
-        category = self.repository.get_category_by_id(category_id)
+        category = self.registry.get_category_by_id(category_id)
         if category is None:
             raise CategoryDoesNotExistsError()
         return category
 
+    def get_categories_by_ids(self, category_ids: List[int]) -> Dict[int, CategoryDTO]:
+        """Get existing categories by ids"""
+        return self.registry.get_categories_by_ids(set(category_ids))
+
     def create_category(self, new_category_dto: NewCategoryDTO) -> CategoryDTO:
         """Create new category"""
         name = new_category_dto.name.title()
@@ -55,51 +104,115 @@ class CategoryService(CategoryServiceInterface, SlugServiceMixin):
             raise CategoryAlreadyExistsError()
 
         category_dto = self.repository.create_category(name, slug)
+        self._invalidate()
         return category_dto
 
     def update_category(self, category_to_update: CategoryDTO) -> CategoryDTO:
         """Update exist category"""
-        category = self.repository.get_category_by_id(category_to_update.id)
-        if category is None:
-            raise CategoryDoesNotExistsError()
+        category = self.get_category_by_id(category_to_update.id)
 
         name = category_to_update.name.title()
         slug = self._validate_or_create_slug(name, category_to_update.slug)
         updated_category = self.repository.update_category(category.id, name, slug)
+        self._invalidate()
         return updated_category
 
     def delete_category_by_id(self, category_id: int) -> None:
         """Delete category by id"""
-        category = self.repository.get_category_by_id(category_id)
-        if category is None:
-            raise CategoryDoesNotExistsError()
+        self.get_category_by_id(category_id)
         self.repository.delete_category_by_id(category_id)
+        self._invalidate()
 
+    def _invalidate(self) -> None:
+        """Drop cached categories and cached post pages which show category names"""
+        self.registry.invalidate()
+        self.post_repository.invalidate()
 
-class PostService(PostServiceInterface, SlugServiceMixin):
+
+class PostService(PostServiceInterface, SlugServiceMixin, PendingReactionsMixin):
     """Service layer to work with post domain logic"""
-    def __init__(self, repository: PostRepositoryInterface):
+    reactions_target = POST
+    reaction_fields = {LIKE: 'likes_count', DISLIKE: 'dislikes_count'}
+
+    def __init__(self, repository: PostRepositoryInterface, reactions: ReactionBufferInterface, max_ids: int):
         self.repository = repository
+        self.reactions = reactions
+        self.max_ids = max_ids
 
-    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None)\
-            -> Tuple[List[PostDTO], PaginatedResultDTO]:
+    def get_paginated_posts(self, page: int, per_page: int, specifications: Optional[List[Dict]] = None,
+                            fields: Optional[List[str]] = None) -> Tuple[List[PostDTO], PaginatedResultDTO]:
         """Get all blog posts"""
-        posts_dto, paginated_result_dto = self.repository.get_paginated_posts(page, per_page, specifications)
-        return posts_dto, paginated_result_dto
-
-    def get_post_by_id(self, post_id: int) -> PostDTO:
+        self._validate_fields(fields)
+        posts_dto, paginated_result_dto = self.repository.get_paginated_posts(page, per_page, specifications,
+                                                                              self._with_id_field(fields))
+        return self._with_pending_reactions(posts_dto), paginated_result_dto
+
+    def get_cursor_paginated_posts(self, cursor: Optional[str], per_page: int,
+                                   specifications: Optional[List[Dict]] = None,
+                                   fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], CursorPaginatedResultDTO]:
+        """Get blog posts page by cursor, posts are ordered by publish time so other orderings are rejected"""
+        self._validate_fields(fields)
+        if any(isinstance(condition["spec"], OrderSpecificationInterface) for condition in specifications or []):
+            raise InvalidCursorError("Cursor pagination can not be combined with ordering by tags or search rank")
+        posts_dto, paginated_result_dto = self.repository.get_cursor_paginated_posts(
+            cursor, per_page, specifications, self._with_id_field(fields))
+        return self._with_pending_reactions(posts_dto), paginated_result_dto
+
+    def get_post_by_id(self, post_id: int, fields: Optional[List[str]] = None) -> PostDTO:
         """Get post by id"""
-        post = self.repository.get_post_by_id(post_id)
+        self._validate_fields(fields)
+        post = self.repository.get_post_by_id(post_id, self._with_id_field(fields))
         if post is None:
             raise PostDoesNotExistsError()
-        return post
+        return self._with_pending_reactions([post])[0]
+
+    def get_post_owner(self, post_id: int) -> OwnerDTO:
+        """Get id and author id of post or error"""
+        owner = self.repository.get_post_owner(post_id)
+        if owner is None:
+            raise PostDoesNotExistsError()
+        return owner
+
+    def get_posts_by_ids(self, post_ids: List[int], fields: Optional[List[str]] = None)\
+            -> Tuple[List[PostDTO], List[int]]:
+        """Get posts in order of post_ids and list of missing ids"""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            raise InvalidPostIdsError("Post ids are required")
+        if len(post_ids) > self.max_ids:
+            raise InvalidPostIdsError(f"At most {self.max_ids} post ids are allowed")
+        self._validate_fields(fields)
+
+        # ids of found posts are needed to report missing ids
+        posts = self.repository.get_posts_by_ids(post_ids, [*fields, 'id'] if fields and 'id' not in fields else fields)
+        found_ids = {post.id for post in posts}
+        return self._with_pending_reactions(posts), [post_id for post_id in post_ids if post_id not in found_ids]
+
+    def get_posts_watermark(self, specifications: Optional[List[Dict]] = None) -> WatermarkDTO:
+        """Get watermark of posts list"""
+        return self._with_reactions_version(self.repository.get_posts_watermark(specifications))
+
+    def get_post_watermark(self, post_id: int) -> Optional[WatermarkDTO]:
+        """Get watermark of post or None if post not exists"""
+        return self._with_reactions_version(self.repository.get_post_watermark(post_id))
+
+    def _with_id_field(self, fields: Optional[List[str]]) -> Optional[List[str]]:
+        """Add id to projection with reaction counters, pending reactions are found by id"""
+        if fields and 'id' not in fields and set(fields) & set(self.reaction_fields.values()):
+            return [*fields, 'id']
+        return fields
+
+    def _validate_fields(self, fields: Optional[List[str]]) -> None:
+        """Raise error if fields contain names which are not post fields"""
+        unknown_fields = [field for field in fields or [] if field not in PostDTO._fields]
+        if unknown_fields:
+            raise InvalidPostFieldsError(f"Unknown post fields: {', '.join(unknown_fields)}")
 
     def delete_post_by_id(self, post_id: int) -> None:
         """Delete post by id"""
-        post = self.repository.get_post_by_id(post_id)
-        if post is None:
+        if not self.repository.delete_post_by_id(post_id):
             raise PostDoesNotExistsError()
-        self.repository.delete_post_by_id(post_id)
 
     def create_post(self, post_dto: NewPostDTO) -> PostDTO:
         """Create new post"""
@@ -111,43 +224,76 @@ class PostService(PostServiceInterface, SlugServiceMixin):
         post_dto = self.repository.create_post(updated_post_dto)
         return post_dto
 
-    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> PostDTO:
-        """Update post"""
-        post = self.repository.get_post_by_id(post_id)
-        if post is None:
-            raise PostDoesNotExistsError()
+    def bulk_create_posts(self, posts_dto: List[NewPostDTO]) -> List[PostDTO]:
+        """Create posts in one batch"""
+        posts_dto = [
+            post_dto._replace(slug=self._validate_or_create_slug(post_dto.title, post_dto.slug))
+            for post_dto in posts_dto
+        ]
+        return self.repository.bulk_create_posts(posts_dto)
 
+    def update_post(self, update_post_dto: NewPostDTO, post_id: int) -> UpdatedPostDTO:
+        """Update post"""
         slug = self._validate_or_create_slug(update_post_dto.title, update_post_dto.slug)
         update_post_dto = update_post_dto._replace(slug=slug)
         updated_post = self.repository.update_post(update_post_dto, post_id)
-        return updated_post
+        if updated_post is None:
+            raise PostDoesNotExistsError()
+        return updated_post._replace(post=self._with_pending_reactions([updated_post.post])[0])
 
-    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> PostDTO:
+    def update_partial_post(self, partial_post_dto: PartialPostDTO, post_id: int) -> UpdatedPostDTO:
         """Update post partial"""
-        post = self.repository.get_post_by_id(post_id)
-        if post is None:
+        updated_post = self.repository.update_partial_post(partial_post_dto, post_id)
+        if updated_post is None:
             raise PostDoesNotExistsError()
-
-        post = self.repository.update_partial_post(partial_post_dto, post_id)
-        return post
+        return updated_post._replace(post=self._with_pending_reactions([updated_post.post])[0])
 
 
-class CommentService(CommentServiceInterface):
+class CommentService(CommentServiceInterface, PendingReactionsMixin):
     """Service layer to work with comment domain logic"""
-    def __init__(self, repository: CommentRepositoryInterface):
+    reactions_target = COMMENT
+    reaction_fields = {LIKE: 'likes', DISLIKE: 'dislikes'}
+    REACTIONS_CHUNK_SIZE = 1000
+
+    def __init__(self, repository: CommentRepositoryInterface, reactions: ReactionBufferInterface):
         self.repository = repository
+        self.reactions = reactions
 
     def get_all_post_comments(self, post_id: int) -> List[CommentDTO]:
         """Get all comments by post_id"""
         post_comments = self.repository.get_all_post_comments(post_id)
-        return post_comments
+        return self._with_pending_reactions(post_comments)
+
+    def iterate_post_comments(self, post_id: int) -> Iterator[CommentDTO]:
+        """Iterate all comments by post_id, pending reactions are added by chunks"""
+        post_comments = self.repository.iterate_post_comments(post_id)
+        while chunk := list(islice(post_comments, self.REACTIONS_CHUNK_SIZE)):
+            yield from self._with_pending_reactions(chunk)
+
+    def get_cursor_paginated_post_comments(self, post_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[CommentDTO], CursorPaginatedResultDTO]:
+        """Get page of comments by post_id"""
+        post_comments, paginated_result_dto = self.repository.get_cursor_paginated_post_comments(
+            post_id, cursor, per_page)
+        return self._with_pending_reactions(post_comments), paginated_result_dto
+
+    def get_post_comments_watermark(self, post_id: int) -> Optional[WatermarkDTO]:
+        """Get watermark of post comments or None if post not exists"""
+        return self._with_reactions_version(self.repository.get_post_comments_watermark(post_id))
 
     def get_post_comment_by_id(self, post_id: int, comment_id: int) -> CommentDTO:
         """Get post comment by id or error"""
         post_comment = self.repository.get_post_comment_by_id(post_id, comment_id)
         if post_comment is None:
             raise PostCommentDoesNotExistsError()
-        return post_comment
+        return self._with_pending_reactions([post_comment])[0]
+
+    def get_post_comment_owner(self, post_id: int, comment_id: int) -> OwnerDTO:
+        """Get id and author id of post comment or error"""
+        owner = self.repository.get_post_comment_owner(post_id, comment_id)
+        if owner is None:
+            raise PostCommentDoesNotExistsError()
+        return owner
 
     def create_post_comment(self, new_comment: NewCommentDTO) -> CommentDTO:
         """Create post comment"""
@@ -156,11 +302,172 @@ class CommentService(CommentServiceInterface):
                                                           new_comment.author_id)
         return new_comment
 
-    def update_post_comment(self, update_comment: NewCommentDTO, old_comment: CommentDTO) -> CommentDTO:
+    def update_post_comment(self, update_comment: NewCommentDTO, comment_id: int) -> CommentDTO:
         """Update post comment"""
-        updated_comment = self.repository.update_post_comment(update_comment.body, old_comment.id)
-        return updated_comment
+        updated_comment = self.repository.update_post_comment(update_comment.body, comment_id)
+        if updated_comment is None:
+            raise PostCommentDoesNotExistsError()
+        return self._with_pending_reactions([updated_comment])[0]
 
     def delete_comment_by_id(self, comment_id: int) -> None:
         """Delete comment by id"""
         self.repository.delete_comment_by_id(comment_id)
+
+
+class ReactionService(ReactionServiceInterface):
+    """Service layer to work with likes and dislikes"""
+    OPPOSITE_REACTIONS = {LIKE: DISLIKE, DISLIKE: LIKE}
+
+    def __init__(self, repository: ReactionRepositoryInterface, buffer: ReactionBufferInterface,
+                 post_repository: PostRepositoryInterface):
+        self.repository = repository
+        self.buffer = buffer
+        self.post_repository = post_repository
+
+    def set_reaction(self, target: str, target_id: int, user_id: int, reaction: str, active: bool) -> Dict[str, int]:
+        """Set or remove reaction of user in buffer, like removes dislike and vice versa.
+
+        Return changes of counters by reaction, so caller does not read counters again.
+        """
+        deltas = dict.fromkeys(self.OPPOSITE_REACTIONS, 0)
+        if self._set_buffered_reaction(target, target_id, user_id, reaction, active):
+            deltas[reaction] = 1 if active else -1
+        opposite_reaction = self.OPPOSITE_REACTIONS[reaction]
+        if active and self._set_buffered_reaction(target, target_id, user_id, opposite_reaction, False):
+            deltas[opposite_reaction] = -1
+        return deltas
+
+    def flush_reactions(self) -> int:
+        """Write pending reactions to database, return number of written changes"""
+        with self.buffer.flushing() as changes:
+            self.repository.apply_reaction_changes(changes)
+            if changes:
+                # flushed reactions stay pending until counters with them are visible to readers
+                transaction.on_commit(self.buffer.drop_flushed)
+        if changes:
+            # cached pages have counters of database without reactions which were pending
+            self.post_repository.invalidate()
+        return sum(len(change.added) + len(change.removed) for change in changes)
+
+    def _set_buffered_reaction(self, target: str, target_id: int, user_id: int, reaction: str, active: bool) -> bool:
+        return self.buffer.set_reaction(
+            target, target_id, user_id, reaction, active,
+            stored=lambda: self.repository.has_reaction(target, target_id, user_id, reaction))
+
+
+class TagService(TagServiceInterface):
+    """Service layer to work with tag stats"""
+
+    def __init__(self, repository: TagRepositoryInterface):
+        self.repository = repository
+
+    def get_tag_stats(self, prefix: Optional[str], limit: int) -> List[TagStatDTO]:
+        """Get tags with most published posts"""
+        return self.repository.get_tag_stats(prefix, limit)
+
+
+class TimelineService(TimelineServiceInterface):
+    """Service layer to work with home timelines.
+
+    Posts of authors with at most max_fan_out followers are pushed to timelines of followers on publish,
+    posts of authors with more followers are merged into timelines on read.
+    """
+    FAN_OUT_CHUNK_SIZE = 1000
+
+    def __init__(self, repository: TimelineRepositoryInterface, store: TimelineStoreInterface, max_fan_out: int):
+        self.repository = repository
+        self.store = store
+        self.max_fan_out = max_fan_out
+
+    def fan_out_post(self, post_id: int, author_id: int, publish: datetime) -> int:
+        """Push post to timelines of followers of author, return number of changed timelines"""
+        high_follower = self.repository.count_followers(author_id) > self.max_fan_out
+        self.store.set_high_follower_author(author_id, high_follower)
+        if high_follower:
+            return 0
+
+        entry = TimelineEntryDTO(post_id=post_id, score=publish.timestamp())
+        return sum(self.store.push_entry(entry, follower_ids)
+                   for follower_ids in self.repository.iterate_follower_ids(author_id, self.FAN_OUT_CHUNK_SIZE))
+
+    def get_home_timeline(self, user_id: int, cursor: Optional[str], per_page: int)\
+            -> Tuple[List[int], CursorPaginatedResultDTO]:
+        """Get page of post ids from timeline of user merged with posts of followed high follower authors"""
+        before = self._decode_cursor(cursor) if cursor else None
+        high_follower_author_ids = self.store.get_high_follower_authors()
+        if not self.store.exists(user_id):
+            self.store.add_entries(
+                user_id, self.repository.get_followed_entries(user_id, high_follower_author_ids, self.store.size))
+
+        entries = self.store.get_entries(user_id, before, per_page + 1)
+        followed_author_ids = self.repository.get_followed_author_ids(user_id, high_follower_author_ids)\
+            if high_follower_author_ids else []
+        if followed_author_ids:
+            # timeline may already have posts pushed before author got many followers
+            entries = {entry.post_id: entry for entry in entries + self.repository.get_authors_entries(
+                followed_author_ids, before, per_page + 1)}.values()
+            entries = sorted(entries, key=lambda entry: (entry.score, entry.post_id), reverse=True)[:per_page + 1]
+
+        has_next = len(entries) > per_page
+        entries = entries[:per_page]
+        paginated_result_dto = CursorPaginatedResultDTO(
+            next_cursor=self._encode_cursor(entries[-1]) if has_next else None,
+            prev_cursor=None,
+            has_previous=before is not None,
+            has_next=has_next
+        )
+        return [entry.post_id for entry in entries], paginated_result_dto
+
+    def remove_posts(self, user_id: int, post_ids: List[int]) -> None:
+        """Remove deleted or unpublished posts from timeline of user"""
+        self.store.remove_entries(user_id, post_ids)
+
+    def drop_timeline(self, user_id: int) -> None:
+        """Drop timeline of user after follow changes, it is built from current follows on next read"""
+        self.store.delete(user_id)
+
+    @staticmethod
+    def _encode_cursor(entry: TimelineEntryDTO) -> str:
+        payload = json.dumps([entry.score, entry.post_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, int]:
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            score, post_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return float(score), int(post_id)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise InvalidCursorError()
+
+
+class TrendingService(TrendingServiceInterface):
+    """Service layer to work with trending posts ranking"""
+    SCORE_CHUNK_SIZE = 1000
+
+    def __init__(self, repository: TrendingRepositoryInterface, store: TrendingStoreInterface, window: int,
+                 half_life: int, comment_weight: float):
+        self.repository = repository
+        self.store = store
+        self.window = window
+        self.half_life = half_life
+        self.comment_weight = comment_weight
+
+    def refresh_trending(self) -> int:
+        """Replace ranking with time decayed scores of posts published in window, return number of ranked posts"""
+        now = timezone.now()
+        scores = self.repository.iterate_post_scores(
+            now - timedelta(seconds=self.window), now, self.half_life, self.comment_weight, self.SCORE_CHUNK_SIZE)
+        return self.store.replace_scores(scores)
+
+    def get_trending_post_ids(self, page: int, per_page: int) -> Tuple[List[int], PaginatedResultDTO]:
+        """Get page of post ids ordered by trending score, out of range page is replaced by nearest page"""
+        total_pages = max(math.ceil(self.store.count() / per_page), 1)
+        page = min(max(page, 1), total_pages)
+        paginated_result_dto = PaginatedResultDTO(
+            current_page=page,
+            total_pages=total_pages,
+            has_previous=page > 1,
+            has_next=page < total_pages
+        )
+        return self.store.get_post_ids((page - 1) * per_page, per_page), paginated_result_dto
@@ -1,11 +1,17 @@
-from datetime import timedelta
-from typing import List, Tuple
+import base64
+import binascii
+import json
+from datetime import timedelta, datetime
+from typing import List, Tuple, Optional
 
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.utils import timezone
-from django.db.models import Q, QuerySet, Case, When, IntegerField, Sum
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Q, QuerySet, IntegerField, F, Func, Value, TextField
 
-from blog.dto import PaginatedResultDTO
+from blog.dto import PaginatedResultDTO, CursorPaginatedResultDTO
+from blog.exceptions import InvalidCursorError
 from blog.interfaces import (
     FilterSpecificationInterface,
     OrderSpecificationInterface,
@@ -21,10 +27,10 @@ class AuthorSpecification(FilterSpecificationInterface):
 
 
 class TagSpecification(FilterSpecificationInterface):
-    """Filter objects by tags"""
+    """Filter objects by tags using overlap of denormalized tag names array"""
 
     def build_query(self, tags: List[str]) -> Q:
-        return Q(tags__name__in=tags)
+        return Q(tag_names__overlap=tags)
 
 
 class PeriodSpecification(FilterSpecificationInterface):
@@ -45,20 +51,47 @@ class PeriodSpecification(FilterSpecificationInterface):
         return Q(publish__range=(start_date, end_date))
 
 
+class SearchSpecification(FilterSpecificationInterface):
+    """Filter objects by full text search in title and body"""
+
+    config = 'english'
+
+    def build_query(self, search: str) -> Q:
+        return Q(search_vector=SearchQuery(search, config=self.config, search_type='websearch'))
+
+
+class SearchRankSpecification(OrderSpecificationInterface):
+    """Annotate queryset with full text search rank and order by it in descending order."""
+
+    config = 'english'
+
+    def build_order(self, queryset: QuerySet, search: str) -> QuerySet:
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), SearchQuery(search, config=self.config,
+                                                                   search_type='websearch'))
+        )
+        return queryset.order_by('-search_rank', '-publish')
+
+
+class ArrayMatchCount(Func):
+    """Count elements of array expression which are present in values array"""
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        array_sql, array_params = compiler.compile(self.source_expressions[0])
+        values_sql, values_params = compiler.compile(self.source_expressions[1])
+        sql = f'(SELECT COUNT(*) FROM unnest({array_sql}) AS element WHERE element = ANY({values_sql}))'
+        return sql, (*array_params, *values_params)
+
+
 class TagsCountSpecification(OrderSpecificationInterface):
-    """Annotate queryset with count of tags and order by it in descending order."""
+    """Annotate queryset with count of matched tags and order by it in descending order."""
 
     def build_order(self, queryset: QuerySet, tags: List[str]) -> QuerySet:
         queryset = queryset.annotate(
-            num_tags=Sum(
-                Case(
-                    When(tags__name__in=tags, then=1),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            )
+            num_tags=ArrayMatchCount(F('tag_names'), Value(tags, output_field=ArrayField(TextField())))
         )
-        return queryset.order_by('-num_tags')
+        return queryset.order_by('-num_tags', '-publish')
 
 
 class PaginationSpecification(PaginationSpecificationInterface):
@@ -80,3 +113,67 @@ class PaginationSpecification(PaginationSpecificationInterface):
             has_next=page_obj.has_next()
         )
         return page_obj.object_list, paginated_result_dto
+
+
+class CursorPaginationSpecification(PaginationSpecificationInterface):
+    """Paginate queryset by opaque (ordering_field, id) cursor without COUNT and OFFSET.
+
+    Rows are always ordered by ordering_field and id descending, so any ordering
+    applied to the queryset before is replaced, callers reject other orderings.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, ordering_field: str = 'publish'):
+        self.ordering_field = ordering_field
+
+    def paginate(self, queryset: QuerySet, cursor: Optional[str], page_size: int)\
+            -> Tuple[List, CursorPaginatedResultDTO]:
+        direction, position = self._decode_cursor(cursor) if cursor else (self.NEXT, None)
+        field = self.ordering_field
+
+        if direction == self.NEXT:
+            queryset = queryset.order_by(f'-{field}', '-id')
+            if position:
+                value, pk = position
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+        else:
+            value, pk = position
+            queryset = queryset.order_by(field, 'id')\
+                .filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if direction == self.NEXT:
+            has_previous, has_next = position is not None, has_more
+        else:
+            rows.reverse()
+            has_previous, has_next = has_more, True
+
+        paginated_result_dto = CursorPaginatedResultDTO(
+            next_cursor=self._encode_cursor(self.NEXT, rows[-1]) if rows and has_next else None,
+            prev_cursor=self._encode_cursor(self.PREVIOUS, rows[0]) if rows and has_previous else None,
+            has_previous=has_previous,
+            has_next=has_next
+        )
+        return rows, paginated_result_dto
+
+    def _encode_cursor(self, direction: str, row) -> str:
+        """Encode direction and position of row as url safe string"""
+        value = getattr(row, self.ordering_field)
+        payload = json.dumps([direction, value.isoformat(), row.pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, cursor: str) -> Tuple[str, Tuple[datetime, int]]:
+        """Decode cursor to direction and (ordering value, id) position or raise error"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            return direction, (datetime.fromisoformat(value), int(pk))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise InvalidCursorError()
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from core.containers import ServiceContainer, ProjectContainer
+
+
+@shared_task
+def flush_reactions() -> int:
+    """Write likes and dislikes buffered in Redis to database"""
+    return ServiceContainer.reaction_service().flush_reactions()
+
+
+@shared_task
+def fan_out_post(post_id: int) -> int:
+    """Push published post to home timelines of followers of its author"""
+    return ProjectContainer.timeline_interactor().fan_out_post(post_id)
+
+
+@shared_task
+def refresh_trending() -> int:
+    """Recalculate trending scores of posts published in trending window"""
+    return ServiceContainer.trending_service().refresh_trending()
@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from blog.dto import ReactionChangesDTO, TimelineEntryDTO
+from blog.interfaces import ReactionBufferInterface, TimelineStoreInterface, TrendingStoreInterface
+
+
+class MemoryReactionBuffer(ReactionBufferInterface):
+    """Reaction buffer of one flush in memory, deltas are pending counter changes by target id"""
+
+    def __init__(self, changes: Optional[List[ReactionChangesDTO]] = None,
+                 deltas: Optional[Dict[int, Dict[str, int]]] = None):
+        self.changes = changes or []
+        self.deltas = deltas or {}
+        self.reactions = {}
+
+    def set_reaction(self, target, target_id, user_id, reaction, active, stored) -> bool:
+        key = (target, target_id, user_id, reaction)
+        if self.reactions.get(key, stored()) == active:
+            return False
+        self.reactions[key] = active
+        return True
+
+    def get_pending_deltas(self, target, target_ids):
+        return {target_id: self.deltas[target_id] for target_id in target_ids if target_id in self.deltas}
+
+    def get_version(self) -> int:
+        return 0
+
+    @contextmanager
+    def flushing(self):
+        yield self.changes
+
+    def drop_flushed(self) -> None:
+        self.changes = []
+        self.deltas = {}
+
+
+class MemoryTimelineStore(TimelineStoreInterface):
+    """Timeline store in memory with ordering of RedisTimelineStore"""
+
+    def __init__(self, size: int = 800):
+        self.size = size
+        self.timelines: Dict[int, Dict[int, float]] = {}
+        self.high_follower_authors: Set[int] = set()
+
+    def exists(self, user_id: int) -> bool:
+        return user_id in self.timelines
+
+    def delete(self, user_id: int) -> None:
+        self.timelines.pop(user_id, None)
+
+    def add_entries(self, user_id: int, entries: List[TimelineEntryDTO]) -> None:
+        if entries:
+            self._add(user_id, entries)
+
+    def push_entry(self, entry: TimelineEntryDTO, user_ids: List[int]) -> int:
+        existing_user_ids = [user_id for user_id in user_ids if user_id in self.timelines]
+        for user_id in existing_user_ids:
+            self._add(user_id, [entry])
+        return len(existing_user_ids)
+
+    def get_entries(self, user_id: int, before: Optional[Tuple[float, int]], limit: int) -> List[TimelineEntryDTO]:
+        entries = self._sorted(self.timelines.get(user_id, {}))
+        if before is not None:
+            entries = [entry for entry in entries if (entry.score, entry.post_id) < before]
+        return entries[:limit]
+
+    def remove_entries(self, user_id: int, post_ids: List[int]) -> None:
+        for post_id in post_ids:
+            self.timelines.get(user_id, {}).pop(post_id, None)
+
+    def get_high_follower_authors(self) -> Set[int]:
+        return set(self.high_follower_authors)
+
+    def set_high_follower_author(self, author_id: int, high_follower: bool) -> None:
+        if high_follower:
+            self.high_follower_authors.add(author_id)
+        else:
+            self.high_follower_authors.discard(author_id)
+
+    def _add(self, user_id: int, entries: List[TimelineEntryDTO]) -> None:
+        timeline = self.timelines.setdefault(user_id, {})
+        timeline.update((entry.post_id, entry.score) for entry in entries)
+        self.timelines[user_id] = {entry.post_id: entry.score for entry in self._sorted(timeline)[:self.size]}
+
+    @staticmethod
+    def _sorted(timeline: Dict[int, float]) -> List[TimelineEntryDTO]:
+        entries = [TimelineEntryDTO(post_id=post_id, score=score) for post_id, score in timeline.items()]
+        return sorted(entries, key=lambda entry: (entry.score, entry.post_id), reverse=True)
+
+
+class MemoryTrendingStore(TrendingStoreInterface):
+    """Trending store in memory, new ranking replaces previous one only after all batches are written"""
+
+    def __init__(self):
+        self.scores: Dict[int, float] = {}
+
+    def replace_scores(self, scores: Iterator[Dict[int, float]]) -> int:
+        next_scores = {}
+        for batch in scores:
+            next_scores.update(batch)
+        self.scores = next_scores
+        return len(next_scores)
+
+    def get_post_ids(self, offset: int, limit: int) -> List[int]:
+        ranking = sorted(self.scores, key=lambda post_id: (self.scores[post_id], post_id), reverse=True)
+        return ranking[offset:offset + limit]
+
+    def count(self) -> int:
+        return len(self.scores)
@@ -1,3 +1,1040 @@
+from datetime import timedelta
+from io import StringIO
+from typing import Dict, List
+
+from dependency_injector import providers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import DataError
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Profile
+from blog.counters import rebuild_reaction_counters, rebuild_tag_stats
+from blog.dto import CategoryDTO, NewCategoryDTO, NewPostDTO, OwnerDTO, PartialPostDTO, ReactionChangesDTO, TagStatDTO
+from blog.models import (
+    Category, Comment, CommentDislike, CommentLike, Follow, Post, PostDislike, PostLike, TagStat
+)
+from blog.exceptions import InvalidCursorError
+from blog.reactions import DISLIKE, LIKE, POST
+from blog.registries import CategoryRegistry, SharedVersion
+from blog.repositories import (
+    CachedPostRepository, CategoryRepository, PostRepository, ReactionRepository, TimelineRepository,
+    TrendingRepository
+)
+from blog.services import PostService, ReactionService, TimelineService, TrendingService
+from blog.specifications import CursorPaginationSpecification
+from blog.testing import MemoryReactionBuffer, MemoryTimelineStore, MemoryTrendingStore
+from core.containers import (
+    FilterSpecificationContainer, OrderSpecificationContainer, PaginateSpecificationsContainer, RedisContainer,
+    RegistryContainer, RepositoryContainer, ServiceContainer
+)
+from core.testing import QueryPlanTestCase
+
+User = get_user_model()
+
+
+class BlogQueryPlanTest(QueryPlanTestCase):
+    """Hot blog queries must be served by indexes"""
+    USERS = 20000
+    POSTS = 5000
+    COMMENTS = 10000
+    TOPICS = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        users = User.objects.bulk_create(
+            User(email=f'user{i}@example.com', username=f'user{i}', first_name='First', last_name='Last',
+                 password='!')
+            for i in range(cls.USERS)
+        )
+        categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}') for i in range(5)
+        )
+        posts = Post.objects.bulk_create(
+            Post(title=f'Post {i} about topic{i % cls.TOPICS}', slug=f'post-{i}',
+                 author=users[i % cls.USERS], category=categories[i % len(categories)],
+                 body=f'Body of post {i} about subject{i % cls.TOPICS}',
+                 status='draft' if i % 10 == 0 else 'published', publish=now - timedelta(minutes=i),
+                 tag_names=[f'tag{i % cls.TOPICS}', f'tag{(i + 1) % cls.TOPICS}'])
+            for i in range(cls.POSTS)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=posts[i % cls.POSTS], author=users[i % cls.USERS], body=f'Comment {i}',
+                    active=i % 20 != 0)
+            for i in range(cls.COMMENTS)
+        )
+        cls.post = posts[1]
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+        self.comment_repository = RepositoryContainer.comment_repository()
+        self.timeline_repository = RepositoryContainer.timeline_repository()
+        self.trending_repository = RepositoryContainer.trending_repository()
+        self.filter_specifications = FilterSpecificationContainer.specifications_dict()
+
+    def _filter(self, name: str, value):
+        return [{"spec": self.filter_specifications[name], "value": value}]
+
+    def test_post_list_first_page(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_cursor_paginated_posts(None, 10)
+
+    def test_post_list_next_page(self):
+        _, paginated_result = self.post_repository.get_cursor_paginated_posts(None, 10)
+
+        with self.assertNoFullScan():
+            self.post_repository.get_cursor_paginated_posts(paginated_result.next_cursor, 10)
+
+    def test_post_list_by_author(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_paginated_posts(1, 10, self._filter('author', 'USER7'))
+
+    def test_post_list_by_tags(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_paginated_posts(1, 10, self._filter('tags', ['tag7', 'tag8']))
+
+    def test_post_list_by_search(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_paginated_posts(1, 10, self._filter('search', 'subject7'))
+
+    def test_post_list_by_period(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_cursor_paginated_posts(None, 10, self._filter('period', 'day'))
+
+    def test_post_detail(self):
+        with self.assertNoFullScan():
+            self.post_repository.get_post_by_id(self.post.id)
+
+    def test_posts_by_ids(self):
+        post_ids = [self.post.id, self.post.id + 1, self.post.id - 1]
+        self.post_repository.get_posts_by_ids(post_ids)
+
+        with self.assertNumQueries(1):
+            self.post_repository.get_posts_by_ids(post_ids)
+        with self.assertNoFullScan():
+            self.post_repository.get_posts_by_ids(post_ids)
+
+    def test_authors_timeline_entries(self):
+        author_ids = [self.post.author_id, self.post.author_id + 1]
+        before = (self.post.publish.timestamp(), self.post.id)
+
+        with self.assertNoFullScan():
+            self.timeline_repository.get_authors_entries(author_ids, before, 10)
+
+    def test_trending_scores(self):
+        now = timezone.now()
+
+        with self.assertNoFullScan():
+            list(self.trending_repository.iterate_post_scores(now - timedelta(hours=6), now, 3600, 2, 100))
+
+    def test_post_comments(self):
+        with self.assertNoFullScan():
+            self.comment_repository.get_all_post_comments(self.post.id)
+
+    def test_post_comments_next_page(self):
+        _, paginated_result = self.comment_repository.get_cursor_paginated_post_comments(self.post.id, None, 1)
+
+        with self.assertNoFullScan():
+            self.comment_repository.get_cursor_paginated_post_comments(self.post.id, paginated_result.next_cursor, 1)
+
+
+class CountingVersion(SharedVersion):
+    """Shared version which counts round trips to cache"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def get_version(self) -> str:
+        self.reads += 1
+        return super().get_version()
+
+
+class CategoryRegistryTest(TestCase):
+    """Registry must serve categories from memory and reload them after writes in any worker"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                            last_name='Last', password='password')
+        cls.categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}') for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.registry = self._registry()
+
+    @staticmethod
+    def _registry() -> CategoryRegistry:
+        return CategoryRegistry(CategoryRepository(), cache, max_age=60)
+
+    def test_lookup(self):
+        category = self.categories[0]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.get_category_by_id(category.id),
+                             CategoryDTO(id=category.id, name=category.name, slug=category.slug))
+            self.assertIsNone(self.registry.get_category_by_id(0))
+            self.assertEqual(list(self.registry.get_categories_by_ids([category.id, 0])), [category.id])
+            self.assertEqual(len(self.registry.get_all_categories()), 3)
+
+    def test_reload_on_version_bump(self):
+        category = self.categories[0]
+        self.registry.get_all_categories()
+        Category.objects.filter(pk=category.id).update(name='Renamed')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry.get_category_by_id(category.id).name, category.name)
+
+        # write in other worker publishes new version through shared cache
+        version = self.registry.get_version()
+        self._registry().invalidate()
+        self.assertNotEqual(self.registry.get_version(), version)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.get_category_by_id(category.id).name, 'Renamed')
+
+    def test_reload_on_max_age(self):
+        category = self.categories[0]
+        self.registry.get_all_categories()
+        Category.objects.filter(pk=category.id).update(name='Renamed')
+        self.registry._loaded_at -= self.registry.max_age + 1
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.get_category_by_id(category.id).name, 'Renamed')
+
+    def test_service_writes_invalidate(self):
+        registry = RegistryContainer.category_registry()
+        service = ServiceContainer.category_service()
+        version = registry.get_version()
+
+        created = service.create_category(NewCategoryDTO(name='new'))
+        self.assertNotEqual(registry.get_version(), version)
+        self.assertEqual(registry.get_category_by_id(created.id).name, 'New')
+
+        version = registry.get_version()
+        service.update_category(created._replace(name='renamed'))
+        self.assertNotEqual(registry.get_version(), version)
+        self.assertEqual(registry.get_category_by_id(created.id).name, 'Renamed')
+
+        version = registry.get_version()
+        service.delete_category_by_id(created.id)
+        self.assertNotEqual(registry.get_version(), version)
+        self.assertIsNone(registry.get_category_by_id(created.id))
+
+    def test_page_reads_version_once(self):
+        Post.objects.bulk_create(
+            Post(title=f'Post {i}', slug=f'post-{i}', author=self.user, category=self.categories[i % 3],
+                 body='Body', status='published')
+            for i in range(6)
+        )
+        self.registry.version = CountingVersion(cache, CategoryRegistry.VERSION_KEY)
+        repository = PostRepository(PaginateSpecificationsContainer.paginator(),
+                                    PaginateSpecificationsContainer.post_cursor_paginator(),
+                                    self.registry, RegistryContainer.authors_version())
+        posts, _ = repository.get_paginated_posts(1, 6)
+        self.assertEqual({post.category for post in posts}, {category.name for category in self.categories})
+        self.assertEqual(self.registry.version.reads, 1)
+
+
+class CursorPaginationTest(TestCase):
+    """Cursors must walk pages forward and back, posts with equal publish time are ordered by id"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                          last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        publish = timezone.now()
+        cls.posts = Post.objects.bulk_create(
+            Post(title=f'Post {i}', slug=f'post-{i}', author=author, category=category, body='Body',
+                 status='published', tag_names=['python'], publish=publish - timedelta(hours=i // 2))
+            for i in range(7)
+        )
+        # newest first, ties by id descending
+        cls.expected_ids = [post.id for post in sorted(cls.posts, key=lambda post: (post.publish, post.id),
+                                                       reverse=True)]
+
+    def setUp(self):
+        self.paginator = CursorPaginationSpecification(ordering_field='publish')
+
+    def _page(self, cursor):
+        posts, result = self.paginator.paginate(Post.published.all(), cursor, 3)
+        return [post.id for post in posts], result
+
+    def test_next_and_previous(self):
+        first_ids, first = self._page(None)
+        self.assertEqual(first_ids, self.expected_ids[:3])
+        self.assertEqual((first.has_previous, first.has_next, first.prev_cursor), (False, True, None))
+
+        second_ids, second = self._page(first.next_cursor)
+        self.assertEqual(second_ids, self.expected_ids[3:6])
+        self.assertEqual((second.has_previous, second.has_next), (True, True))
+
+        last_ids, last = self._page(second.next_cursor)
+        self.assertEqual(last_ids, self.expected_ids[6:])
+        self.assertEqual((last.has_previous, last.has_next, last.next_cursor), (True, False, None))
+
+        previous_ids, previous = self._page(last.prev_cursor)
+        self.assertEqual(previous_ids, second_ids)
+        self.assertEqual((previous.has_previous, previous.has_next), (True, True))
+
+        first_again_ids, first_again = self._page(previous.prev_cursor)
+        self.assertEqual(first_again_ids, first_ids)
+        self.assertEqual((first_again.has_previous, first_again.has_next, first_again.prev_cursor),
+                         (False, True, None))
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-a-cursor', 'WyJ4IiwiMjAyMy0wMS0wMSIsMV0']:
+            with self.assertRaises(InvalidCursorError):
+                self._page(cursor)
+
+    def test_ordering_specifications_rejected(self):
+        cache.clear()
+        post_service = PostService(RepositoryContainer.post_repository(), MemoryReactionBuffer([]), 10)
+        tags = ['python']
+        filters = [{"spec": FilterSpecificationContainer.specifications_dict()['tags'], "value": tags}]
+        self.assertEqual(len(post_service.get_cursor_paginated_posts(None, 3, filters)[0]), 3)
+
+        ordering = [{"spec": OrderSpecificationContainer.specifications_dict()['tags_count'], "value": tags}]
+        with self.assertRaises(InvalidCursorError):
+            post_service.get_cursor_paginated_posts(None, 3, filters + ordering)
+
+
+class PostSearchTest(TestCase):
+    """Full text search must support web search syntax, rank title matches first and follow post edits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                          last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.title_match, cls.body_match, cls.other = (
+            Post.objects.create(title=title, slug=f'post-{i}', author=author, category=category, body=body,
+                                status='published', publish=timezone.now() - timedelta(hours=i))
+            for i, (title, body) in enumerate([
+                ('Django performance', 'Tuning database queries'),
+                ('Weekend cooking', 'Recipes instead of django performance'),
+                ('Flask', 'Micro framework'),
+            ])
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+
+    def _search(self, search: str) -> List[int]:
+        conditions = [
+            {"spec": FilterSpecificationContainer.specifications_dict()['search'], "value": search},
+            {"spec": OrderSpecificationContainer.specifications_dict()['search_rank'], "value": search},
+        ]
+        posts, _ = self.post_repository.get_paginated_posts(1, 10, conditions, ['id'])
+        return [post.id for post in posts]
+
+    def test_websearch_syntax(self):
+        self.assertEqual(self._search('"performance django"'), [])
+        self.assertEqual(self._search('django -cooking'), [self.title_match.id])
+        self.assertEqual(set(self._search('flask or recipes')), {self.body_match.id, self.other.id})
+
+    def test_non_matching_posts_excluded(self):
+        self.assertEqual(self._search('rust'), [])
+        self.assertNotIn(self.other.id, self._search('django'))
+
+    def test_ordered_by_rank(self):
+        # title weighs more than body, although body match is not older here
+        Post.objects.filter(pk=self.body_match.id).update(publish=timezone.now())
+        cache.clear()
+        self.assertEqual(self._search('django performance'), [self.title_match.id, self.body_match.id])
+
+    def test_search_vector_follows_edits(self):
+        self.post_repository.update_partial_post(PartialPostDTO(title='Rust'), self.other.id)
+        self.assertEqual(self._search('rust'), [self.other.id])
+        self.assertEqual(self._search('flask'), [])
+
+        Post.objects.filter(pk=self.other.id).update(body='Borrow checker')
+        cache.clear()
+        self.assertEqual(self._search('borrow'), [self.other.id])
+        self.assertEqual(self._search('framework'), [])
+
+
+class PostTagsTest(TestCase):
+    """Tag filter must match any tag, order by number of matched tags and see tags edited by API and admin"""
+    PASSWORD = 'password'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin@example.com', username='admin', first_name='First',
+                                                  last_name='Last', password=cls.PASSWORD)
+        cls.category = Category.objects.create(name='Category', slug='category')
+        # post with one matching tag is the newest one
+        cls.both, cls.python, cls.go = (
+            Post.objects.create(title=f'Post {i}', slug=f'post-{i}', author=cls.admin, category=cls.category,
+                                body='Body', status='published', tag_names=tags,
+                                publish=timezone.now() - timedelta(hours=3 - i))
+            for i, tags in enumerate([['python', 'django'], ['python'], ['go']])
+        )
+        for post in (cls.both, cls.python, cls.go):
+            post.tags.add(*post.tag_names)
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+
+    def _tagged(self, tags: List[str]) -> List[int]:
+        conditions = [
+            {"spec": FilterSpecificationContainer.specifications_dict()['tags'], "value": tags},
+            {"spec": OrderSpecificationContainer.specifications_dict()['tags_count'], "value": tags},
+        ]
+        posts, _ = self.post_repository.get_paginated_posts(1, 10, conditions, ['id'])
+        return [post.id for post in posts]
+
+    def assertTags(self, post: Post, tags: List[str]):
+        post.refresh_from_db()
+        self.assertEqual(sorted(post.tag_names), sorted(tags))
+        self.assertEqual(sorted(post.tags.names()), sorted(tags))
+
+    def test_overlap_filter(self):
+        self.assertEqual(set(self._tagged(['python'])), {self.both.id, self.python.id})
+        self.assertEqual(set(self._tagged(['go', 'django'])), {self.both.id, self.go.id})
+        self.assertEqual(self._tagged(['rust']), [])
+
+    def test_ordered_by_matched_tags(self):
+        self.assertEqual(self._tagged(['python', 'django']), [self.both.id, self.python.id])
+        self.assertEqual(self._tagged(['python', 'go']), [self.go.id, self.python.id, self.both.id])
+
+    def test_api_edit(self):
+        RedisContainer.reaction_buffer.override(providers.Object(MemoryReactionBuffer()))
+        self.addCleanup(RedisContainer.reaction_buffer.reset_override)
+        response = self.client.patch(
+            reverse('api:api-blog-post-detail', args=[self.go.id]), {'tags': ['rust', 'go']},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTags(self.go, ['rust', 'go'])
+        self.assertEqual(self._tagged(['rust']), [self.go.id])
+
+    def test_admin_edit(self):
+        self.client.force_login(self.admin)
+        post = self.python
+        response = self.client.post(reverse('admin:blog_post_change', args=[post.id]), {
+            'title': post.title, 'slug': post.slug, 'author': self.admin.id, 'body': post.body,
+            'publish_0': post.publish.date().isoformat(), 'publish_1': post.publish.time().strftime('%H:%M:%S'),
+            'image_url': 'https://example.com/image.png', 'status': 'published', 'category': self.category.id,
+            'tags': 'admin, python',
+        })
+        self.assertEqual(response.status_code, 302, response.content)
+        self.assertTags(post, ['admin', 'python'])
+        self.assertEqual(self._tagged(['admin']), [post.id])
+
+
+class PostListQueriesTest(TestCase):
+    """Posts page with tags must be loaded with the same number of queries for any page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                          last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        RepositoryContainer.post_repository().bulk_create_posts([
+            NewPostDTO(title=f'Post {i}', content='Body', post_image_url='https://example.com/image.png',
+                       status='published', category_id=category.id, tags=['common', f'tag{i}'],
+                       author_id=author.id, slug=f'post-{i}')
+            for i in range(20)
+        ])
+
+    def test_queries_do_not_grow_with_page_size(self):
+        cache.clear()
+        # page cache is bypassed, categories are loaded by registry once
+        post_repository = RepositoryContainer.post_repository().repository
+        post_repository.get_paginated_posts(1, 1)
+
+        for per_page in (1, 20):
+            with self.assertNumQueries(2):
+                posts, _ = post_repository.get_paginated_posts(1, per_page)
+            self.assertEqual(len(posts), per_page)
+            self.assertTrue(all(post.tags[0] == 'common' and len(post.tags) == 2 for post in posts))
+
+
+class PostBulkCreateTest(TestCase):
+    """Bulk post creation must not issue queries per post or per tag"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                              last_name='Last', password='password')
+        cls.category = Category.objects.create(name='Category', slug='category')
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+
+    def _new_posts(self, count: int, prefix: str):
+        return [
+            NewPostDTO(title=f'{prefix} {i}', content=f'Body {i}', post_image_url='https://example.com/image.png',
+                       status='published', category_id=self.category.id, tags=['common', f'{prefix}{i}', 'common'],
+                       author_id=self.author.id, slug=f'{prefix}-{i}')
+            for i in range(count)
+        ]
+
+    def test_queries_do_not_grow_with_posts(self):
+        self.post_repository.bulk_create_posts(self._new_posts(1, 'warmup'))
+
+        with self.assertNumQueries(8):
+            self.post_repository.bulk_create_posts(self._new_posts(1, 'single'))
+        with self.assertNumQueries(8):
+            posts = self.post_repository.bulk_create_posts(self._new_posts(50, 'many'))
+
+        self.assertEqual([post.title for post in posts], [f'many {i}' for i in range(50)])
+        post = Post.objects.get(pk=posts[7].id)
+        self.assertEqual(sorted(post.tags.names()), ['common', 'many7'])
+        self.assertEqual(post.tag_names, ['common', 'many7'])
+        self.assertEqual(post.excerpt, 'Body 7')
+        self.assertEqual(TagStat.objects.get(name='common').posts_count, 52)
+
+
+class ReactionRepositoryTest(TestCase):
+    """Flushed reactions must be written in batches and keep counters exact"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(email=f'user{i}@example.com', username=f'user{i}', first_name='First', last_name='Last',
+                 password='!')
+            for i in range(30)
+        )
+        category = Category.objects.create(name='Category', slug='category')
+        cls.posts = Post.objects.bulk_create(
+            Post(title=f'Post {i}', slug=f'post-{i}', author=cls.users[0], category=category, body='Body',
+                 status='published')
+            for i in range(3)
+        )
+        PostLike.objects.create(post=cls.posts[0], user=cls.users[0])
+        PostLike.objects.create(post=cls.posts[0], user=cls.users[1])
+
+    def test_apply_changes(self):
+        post, other_post = self.posts[0], self.posts[1]
+        # post keeps stored like of users[0], gets 18 new likes and loses like of users[1]
+        added = [(post.id, user.id) for user in self.users[2:20]] + [(other_post.id, user.id) for user in self.users]
+        changes = [ReactionChangesDTO(target=POST, reaction=LIKE, added=added, removed=[(post.id, self.users[1].id)])]
+
+        with self.assertNumQueries(7):
+            ReactionRepository().apply_reaction_changes(changes)
+
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        self.assertEqual(post.likes_count, 19)
+        self.assertEqual(other_post.likes_count, 30)
+        self.assertFalse(PostLike.objects.filter(post=post, user=self.users[1]).exists())
+        self.assertEqual(PostLike.objects.count(), 49)
+
+
+class EvictingCache(LocMemCache):
+    """Cache which loses every key right before incrementing it"""
+
+    def incr(self, key, delta=1, version=None):
+        self.delete(key, version)
+        return super().incr(key, delta, version)
+
+
+class CachedPostRepositoryTest(TestCase):
+    """Invalidation must move posts cache to new generation even if generation key is evicted"""
+
+    def _repository(self, cache_backend) -> CachedPostRepository:
+        cache_backend.clear()
+        return CachedPostRepository(RepositoryContainer.post_repository().repository, cache_backend, timeout=60)
+
+    def test_invalidate(self):
+        post_repository = self._repository(cache)
+        generation = post_repository.get_posts_watermark().generation
+        post_repository.invalidate()
+        self.assertEqual(post_repository.get_posts_watermark().generation, generation + 1)
+
+        # first write before any read
+        cache.clear()
+        post_repository.invalidate()
+        self.assertGreater(post_repository.get_posts_watermark().generation, generation)
+
+    def test_invalidate_evicted_generation(self):
+        post_repository = self._repository(EvictingCache('evicting', {}))
+        generation = post_repository.get_posts_watermark().generation
+        post_repository.invalidate()
+        # generation is taken from clock again, so it can not go back to earlier values
+        self.assertGreaterEqual(post_repository.get_posts_watermark().generation, generation)
+
+
+class ReactionServiceTest(TestCase):
+    """Reactions must return changes of counters and drop cached post pages after flush"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', first_name='First',
+                                            last_name='Last', password='password')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(title='Post', slug='post', author=cls.user, category=category, body='Body',
+                                       status='published')
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+
+    def _service(self, changes: List[ReactionChangesDTO]) -> ReactionService:
+        return ReactionService(ReactionRepository(), MemoryReactionBuffer(changes), self.post_repository)
+
+    def test_set_reaction(self):
+        service = self._service([])
+        post, user = self.post, self.user
+        self.assertEqual(service.set_reaction(POST, post.id, user.id, DISLIKE, True), {LIKE: 0, DISLIKE: 1})
+        self.assertEqual(service.set_reaction(POST, post.id, user.id, LIKE, True), {LIKE: 1, DISLIKE: -1})
+        self.assertEqual(service.set_reaction(POST, post.id, user.id, LIKE, True), {LIKE: 0, DISLIKE: 0})
+        self.assertEqual(service.set_reaction(POST, post.id, user.id, LIKE, False), {LIKE: -1, DISLIKE: 0})
+
+    def test_flush_invalidates_posts(self):
+        watermark = self.post_repository.get_posts_watermark()
+        self.assertEqual(self._service([]).flush_reactions(), 0)
+        self.assertEqual(self.post_repository.get_posts_watermark(), watermark)
+
+        changes = [ReactionChangesDTO(target=POST, reaction=LIKE, added=[(self.post.id, self.user.id)], removed=[])]
+        self.assertEqual(self._service(changes).flush_reactions(), 1)
+        self.assertNotEqual(self.post_repository.get_posts_watermark(), watermark)
+        self.assertEqual(Post.objects.get(pk=self.post.id).likes_count, 1)
+
+    def test_flushed_reactions_pending_until_commit(self):
+        changes = [ReactionChangesDTO(target=POST, reaction=LIKE, added=[(self.post.id, self.user.id)], removed=[])]
+        buffer = MemoryReactionBuffer(changes, {self.post.id: {LIKE: 1, DISLIKE: 0}})
+        service = ReactionService(ReactionRepository(), buffer, self.post_repository)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(service.flush_reactions(), 1)
+        # other transactions do not see written counters yet, so reactions must stay pending
+        self.assertEqual(buffer.get_pending_deltas(POST, [self.post.id]), {self.post.id: {LIKE: 1, DISLIKE: 0}})
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(buffer.get_pending_deltas(POST, [self.post.id]), {})
+        post = PostService(self.post_repository, buffer, 10).get_post_by_id(self.post.id)
+        self.assertEqual(post.likes_count, 1)
+
+
+class ReactionCountersTest(TestCase):
+    """Counters of posts and comments must follow reactions and be repaired by rebuild command"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(email=f'user{i}@example.com', username=f'user{i}', first_name='First', last_name='Last',
+                 password='!')
+            for i in range(2)
+        )
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(title='Post', slug='post', author=cls.users[0], category=category,
+                                       body='Body', status='published')
+        cls.comment = Comment.objects.create(post=cls.post, author=cls.users[0], body='Comment')
+
+    def assertCounters(self, post_counters, comment_counters):
+        self.assertEqual(Post.objects.values_list('likes_count', 'dislikes_count').get(pk=self.post.id),
+                         post_counters)
+        self.assertEqual(Comment.objects.values_list('likes_count', 'dislikes_count').get(pk=self.comment.id),
+                         comment_counters)
+
+    def test_reactions_change_counters(self):
+        first, second = self.users
+        reactions = [
+            PostLike.objects.create(post=self.post, user=first),
+            PostLike.objects.create(post=self.post, user=second),
+            PostDislike.objects.create(post=self.post, user=first),
+            CommentLike.objects.create(comment=self.comment, user=first),
+            CommentDislike.objects.create(comment=self.comment, user=second),
+        ]
+        self.assertCounters((2, 1), (1, 1))
+
+        for reaction in reactions[1:]:
+            reaction.delete()
+        self.assertCounters((1, 0), (0, 0))
+
+        # counter never goes below zero, even when it drifted
+        Post.objects.filter(pk=self.post.id).update(likes_count=0)
+        reactions[0].delete()
+        self.assertCounters((0, 0), (0, 0))
+
+    def test_rebuild_command_repairs_counters(self):
+        first, second = self.users
+        PostLike.objects.create(post=self.post, user=first)
+        PostDislike.objects.create(post=self.post, user=second)
+        CommentLike.objects.create(comment=self.comment, user=first)
+        CommentLike.objects.create(comment=self.comment, user=second)
+        Post.objects.update(likes_count=7, dislikes_count=0)
+        Comment.objects.update(likes_count=0, dislikes_count=3)
+
+        out = StringIO()
+        call_command('rebuild_reaction_counters', stdout=out)
+        self.assertIn('Reaction counters rebuilt', out.getvalue())
+        self.assertCounters((1, 1), (2, 0))
+
+
+class TagStatsTest(TestCase):
+    """Tag stats must follow tags and status of posts changed through post repository"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                              last_name='Last', password='password')
+        cls.category = Category.objects.create(name='Category', slug='category')
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+        self.tag_repository = RepositoryContainer.tag_repository()
+
+    def _new_post(self, title: str, status: str, tags: List[str]) -> NewPostDTO:
+        return NewPostDTO(title=title, content='Body', post_image_url='https://example.com/image.png', status=status,
+                          category_id=self.category.id, tags=tags, author_id=self.author.id, slug=title.lower())
+
+    def assertTagStats(self, expected: Dict[str, int]):
+        self.assertEqual(dict(TagStat.objects.values_list('name', 'posts_count')), expected)
+
+    def test_post_changes(self):
+        python = self.post_repository.create_post(self._new_post('Python', 'published', ['python', 'django']))
+        draft = self.post_repository.create_post(self._new_post('Draft', 'draft', ['python']))
+        self.assertTagStats({'python': 1, 'django': 1})
+
+        updated_post = self.post_repository.update_post(self._new_post('Draft', 'published', ['python', 'celery']),
+                                                        draft.id)
+        self.assertTrue(updated_post.published)
+        self.assertTagStats({'python': 2, 'django': 1, 'celery': 1})
+
+        self.post_repository.update_partial_post(PartialPostDTO(tags=['python']), python.id)
+        self.assertTagStats({'python': 2, 'celery': 1})
+
+        self.post_repository.update_partial_post(PartialPostDTO(status='draft'), draft.id)
+        self.assertTagStats({'python': 1})
+
+        self.post_repository.bulk_create_posts(
+            [self._new_post(f'Bulk {i}', 'published', ['pytest', 'python']) for i in range(3)])
+        self.post_repository.delete_post_by_id(python.id)
+        self.assertTagStats({'python': 3, 'pytest': 3})
+
+        self.assertEqual(self.tag_repository.get_tag_stats('PY', 1), [TagStatDTO(name='pytest', posts_count=3)])
+        self.assertEqual(self.tag_repository.get_tag_stats('dj', 10), [])
+
+    def test_deltas_and_rebuild(self):
+        post = self.post_repository.create_post(self._new_post('Python', 'published', ['python', 'django']))
+        # writes apply deltas to stored numbers instead of counting tag links again
+        TagStat.objects.filter(name='python').update(posts_count=10)
+        self.post_repository.update_partial_post(PartialPostDTO(tags=['python', 'celery']), post.id)
+        self.assertTagStats({'python': 10, 'celery': 1})
+
+        # load, savepoint, update and release of post only, tag stats are not changed
+        with self.assertNumQueries(8):
+            self.post_repository.update_partial_post(PartialPostDTO(title='Django'), post.id)
+            self.post_repository.update_partial_post(PartialPostDTO(status='published'), post.id)
+
+        out = StringIO()
+        call_command('rebuild_tag_stats', stdout=out)
+        self.assertIn('Tag stats rebuilt', out.getvalue())
+        self.assertTagStats({'python': 1, 'celery': 1})
+
+
+class MutationQueriesTest(TestCase):
+    """Ownership checks and writes of posts and comments must cost fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                              last_name='Last', password='password')
+        cls.category = Category.objects.create(name='Category', slug='category')
+
+    def setUp(self):
+        cache.clear()
+        self.post_repository = RepositoryContainer.post_repository()
+        self.comment_repository = RepositoryContainer.comment_repository()
+        self.post = self.post_repository.create_post(self._new_post(['python', 'django']))
+        self.comment = self.comment_repository.create_post_comment('Comment', self.post.id, self.author.id)
+        self.auth_headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.author).access_token}'}
+
+    def _new_post(self, tags: List[str]) -> NewPostDTO:
+        return NewPostDTO(title='Python', content='Body', post_image_url='https://example.com/image.png',
+                          status='published', category_id=self.category.id, tags=tags, author_id=self.author.id,
+                          slug='python')
+
+    def test_update_post(self):
+        with self.assertNumQueries(1):
+            owner = self.post_repository.get_post_owner(self.post.id)
+        self.assertEqual(owner, OwnerDTO(id=self.post.id, author_id=self.author.id))
+
+        # load with author, update in savepoint of test transaction
+        with self.assertNumQueries(4):
+            updated_post = self.post_repository.update_post(self._new_post(['python', 'django']), self.post.id)
+        self.assertEqual(updated_post.post.author, 'author')
+        self.assertFalse(updated_post.published)
+
+        # plus removed tag link delete, tag insert and lookup, link insert, tag stats
+        with self.assertNumQueries(11):
+            self.post_repository.update_post(self._new_post(['python', 'celery']), self.post.id)
+        self.assertEqual(sorted(Post.objects.get(pk=self.post.id).tags.names()), ['celery', 'python'])
+
+        with self.assertNumQueries(4):
+            post = self.post_repository.update_partial_post(PartialPostDTO(title='Django'), self.post.id).post
+        self.assertEqual((post.title, post.tags), ('Django', ['python', 'celery']))
+
+        self.assertIsNone(self.post_repository.update_post(self._new_post([]), 0))
+
+    def test_update_post_is_atomic(self):
+        # too long tag name fails on tag insert after link of removed tag is deleted
+        with self.assertRaises(DataError):
+            self.post_repository.update_post(self._new_post(['python', 'x' * 101]), self.post.id)
+        post = Post.objects.get(pk=self.post.id)
+        self.assertEqual((post.tag_names, sorted(post.tags.names())), (['python', 'django'], ['django', 'python']))
+
+    def test_posts_watermark(self):
+        with self.assertNumQueries(0):
+            watermark = self.post_repository.get_posts_watermark()
+        self.assertEqual(self.post_repository.get_posts_watermark(), watermark)
+
+        self.post_repository.update_partial_post(PartialPostDTO(title='Django'), self.post.id)
+        self.assertNotEqual(self.post_repository.get_posts_watermark(), watermark)
+
+        # evicted generation must not start again from value of earlier ETags
+        cache.clear()
+        self.assertNotEqual(self.post_repository.get_posts_watermark(), watermark)
+
+    def test_category_writes_invalidate_posts(self):
+        category_service = ServiceContainer.category_service()
+        watermark = self.post_repository.get_posts_watermark()
+        category_service.update_category(CategoryDTO(id=self.category.id, name='Renamed', slug='renamed'))
+        self.assertNotEqual(self.post_repository.get_posts_watermark(), watermark)
+
+        watermark = self.post_repository.get_posts_watermark()
+        category_service.delete_category_by_id(self.category.id)
+        self.assertNotEqual(self.post_repository.get_posts_watermark(), watermark)
+
+    def test_update_comment(self):
+        with self.assertNumQueries(1):
+            owner = self.comment_repository.get_post_comment_owner(self.post.id, self.comment.id)
+        self.assertEqual(owner, OwnerDTO(id=self.comment.id, author_id=self.author.id))
+
+        with self.assertNumQueries(2):
+            comment = self.comment_repository.update_post_comment('Updated', self.comment.id)
+        self.assertEqual((comment.body, comment.author), ('Updated', 'author'))
+
+        self.post_repository.update_partial_post(PartialPostDTO(status='draft'), self.post.id)
+        self.assertIsNone(self.comment_repository.get_post_comment_owner(self.post.id, self.comment.id))
+
+    def test_delete_comment(self):
+        url = reverse('api:api-blog-post-comments-detail', args=[self.post.id, self.comment.id])
+        # user, comment owner, comment with its likes and dislikes, delete
+        with self.assertNumQueries(6):
+            response = self.client.delete(url, **self.auth_headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.delete(url, **self.auth_headers).status_code, 404)
+
+    def test_delete_post(self):
+        url = reverse('api:api-blog-post-detail', args=[self.post.id])
+        # user, post owner, post, reactions and comments cascade, tag links, post, tag stats
+        with self.assertNumQueries(13):
+            response = self.client.delete(url, **self.auth_headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.delete(url, **self.auth_headers).status_code, 404)
+
+
+class TimelineServiceTest(TestCase):
+    """Home timelines must follow the follow graph and page through posts with equal publish time"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.other_reader, cls.author, cls.popular_author, cls.new_author = (
+            User.objects.create_user(email=f'{name}@example.com', username=name, first_name='First',
+                                     last_name='Last', password='password')
+            for name in ('reader', 'other_reader', 'author', 'popular_author', 'new_author')
+        )
+        cls.category = Category.objects.create(name='Category', slug='category')
+        Follow.objects.bulk_create([
+            Follow(follower=cls.reader, followed=cls.author),
+            Follow(follower=cls.reader, followed=cls.popular_author),
+            Follow(follower=cls.other_reader, followed=cls.popular_author),
+        ])
+        cls.publish = timezone.now() - timedelta(hours=1)
+        # empty timelines are not stored, so reader timeline exists after first read
+        cls.old_post = Post.objects.create(title='Old', slug='old', author=cls.author, category=cls.category,
+                                           body='Body', status='published', publish=cls.publish - timedelta(days=1))
+
+    def setUp(self):
+        self.store = MemoryTimelineStore()
+        RedisContainer.timeline_store.override(providers.Object(self.store))
+        self.addCleanup(RedisContainer.timeline_store.reset_override)
+        self.service = TimelineService(TimelineRepository(), self.store, max_fan_out=1)
+
+    def _post(self, author, publish=None) -> Post:
+        return Post.objects.create(title='Post', slug='post', author=author, category=self.category, body='Body',
+                                   status='published', publish=publish or timezone.now())
+
+    def _timeline(self, user, per_page: int = 20) -> List[int]:
+        post_ids, cursor = [], None
+        while True:
+            page, result = self.service.get_home_timeline(user.id, cursor, per_page)
+            post_ids += page
+            if not result.has_next:
+                return post_ids
+            cursor = result.next_cursor
+
+    def test_fan_out(self):
+        self.service.get_home_timeline(self.reader.id, None, 20)
+        post = self._post(self.author)
+
+        # only existing timelines are pushed, other_reader builds timeline on read
+        self.assertEqual(self.service.fan_out_post(post.id, self.author.id, post.publish), 1)
+        self.assertIn(post.id, self.store.timelines[self.reader.id])
+        self.assertFalse(self.store.exists(self.other_reader.id))
+
+    def test_high_follower_posts_merged_on_read(self):
+        self.service.get_home_timeline(self.reader.id, None, 20)
+        post = self._post(self.popular_author)
+
+        self.assertEqual(self.service.fan_out_post(post.id, self.popular_author.id, post.publish), 0)
+        self.assertEqual(self.store.get_high_follower_authors(), {self.popular_author.id})
+        self.assertNotIn(post.id, self.store.timelines[self.reader.id])
+        self.assertEqual(self._timeline(self.reader), [post.id, self.old_post.id])
+
+    def test_paging_through_equal_scores(self):
+        posts = [self._post(author, self.publish) for author in [self.author, self.popular_author] * 3]
+        self.store.set_high_follower_author(self.popular_author.id, True)
+
+        expected = sorted((post.id for post in posts), reverse=True) + [self.old_post.id]
+        self.assertEqual(self._timeline(self.reader), expected)
+        for per_page in (1, 2, 4):
+            self.assertEqual(self._timeline(self.reader, per_page), expected)
+
+    def test_follow_changes_drop_timeline(self):
+        post = self._post(self.new_author)
+        self.assertEqual(self._timeline(self.other_reader), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow = Follow.objects.create(follower=self.other_reader, followed=self.new_author)
+        self.assertFalse(self.store.exists(self.other_reader.id))
+        self.assertEqual(self._timeline(self.other_reader), [post.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+        self.assertFalse(self.store.exists(self.other_reader.id))
+        self.assertEqual(self._timeline(self.other_reader), [])
+
+
+class TrendingServiceTest(TestCase):
+    """Trending ranking must decay with age, weigh comments, skip disliked posts and clamp pages"""
+    HALF_LIFE = 60 * 60
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', first_name='First',
+                                              last_name='Last', password='password')
+        cls.category = Category.objects.create(name='Category', slug='category')
+
+    def setUp(self):
+        self.store = MemoryTrendingStore()
+        self.service = TrendingService(TrendingRepository(), self.store, window=24 * 60 * 60,
+                                       half_life=self.HALF_LIFE, comment_weight=2)
+
+    def _post(self, age: timedelta, likes: int = 0, dislikes: int = 0, comments: int = 0) -> int:
+        post = Post.objects.create(title='Post', slug='post', author=self.author, category=self.category,
+                                   body='Body', status='published', publish=timezone.now() - age,
+                                   likes_count=likes, dislikes_count=dislikes)
+        Comment.objects.bulk_create(Comment(post=post, author=self.author, body='Comment') for _ in range(comments))
+        return post.id
+
+    def test_scores(self):
+        fresh = self._post(timedelta(minutes=1), likes=5)
+        # two half lives older with the same engagement
+        decayed = self._post(timedelta(hours=2), likes=5)
+        # 2 comments weigh as 4 likes
+        commented = self._post(timedelta(minutes=1), comments=2)
+        liked = self._post(timedelta(minutes=1), likes=3)
+        self._post(timedelta(minutes=1), likes=1, dislikes=2)
+        self._post(timedelta(days=2), likes=100)
+
+        self.assertEqual(self.service.refresh_trending(), 4)
+        self.assertEqual(self.store.get_post_ids(0, 10), [fresh, commented, liked, decayed])
+        self.assertAlmostEqual(self.store.scores[fresh] / self.store.scores[decayed], 4, delta=0.1)
+
+    def test_replace_scores_swaps_ranking(self):
+        self.store.replace_scores(iter([{1: 1.0}]))
+
+        def scores():
+            yield {2: 3.0}
+            # readers see previous ranking until all batches are written
+            self.assertEqual(self.store.get_post_ids(0, 10), [1])
+            yield {3: 2.0}
+
+        self.assertEqual(self.store.replace_scores(scores()), 2)
+        self.assertEqual(self.store.get_post_ids(0, 10), [2, 3])
+        self.assertEqual(self.store.replace_scores(iter([])), 0)
+        self.assertEqual(self.store.count(), 0)
+
+    def test_out_of_range_pages_clamped(self):
+        self.store.replace_scores(iter([{post_id: float(post_id) for post_id in range(1, 6)}]))
+
+        post_ids, result = self.service.get_trending_post_ids(10, 2)
+        self.assertEqual((post_ids, result.current_page, result.total_pages, result.has_next), ([1], 3, 3, False))
+        post_ids, result = self.service.get_trending_post_ids(0, 2)
+        self.assertEqual((post_ids, result.current_page, result.has_previous), ([5, 4], 1, False))
+
+        self.store.replace_scores(iter([]))
+        post_ids, result = self.service.get_trending_post_ids(2, 2)
+        self.assertEqual((post_ids, result.current_page, result.total_pages), ([], 1, 1))
+
+
+class SeedBlogCommandTest(TestCase):
+    """Seeded data must be consistent with counters and tag stats and repeatable from seed"""
+    OPTIONS = dict(users=30, categories=3, tags=10, posts=60, comments=120, post_reactions=300,
+                   comment_reactions=200, follows=100, chunk_size=25)
+
+    def _snapshot(self, prefix: str):
+        """Return seeded posts with prefix removed from names of authors and tags"""
+        posts = Post.objects.filter(author__username__startswith=prefix).select_related('author').order_by('id')
+        return [
+            (post.author.username.removeprefix(prefix), post.title,
+             [name.replace(prefix, '') for name in post.tag_names], post.likes_count, post.dislikes_count)
+            for post in posts
+        ]
+
+    def test_seed(self):
+        call_command('seed_blog', seed=1, stdout=StringIO(), **self.OPTIONS)
+
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 120)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(follower=F('followed')).exists())
+        self.assertFalse(PostLike.objects.filter(post__dislikes__user=F('user')).exists())
+
+        counters = list(Post.objects.order_by('id').values_list('likes_count', 'dislikes_count')) + \
+            list(Comment.objects.order_by('id').values_list('likes_count', 'dislikes_count'))
+        self.assertTrue(any(likes for likes, _ in counters))
+        rebuild_reaction_counters()
+        self.assertEqual(
+            counters,
+            list(Post.objects.order_by('id').values_list('likes_count', 'dislikes_count')) +
+            list(Comment.objects.order_by('id').values_list('likes_count', 'dislikes_count')))
+
+        tag_stats = list(TagStat.objects.order_by('name').values_list('name', 'posts_count'))
+        self.assertTrue(tag_stats)
+        rebuild_tag_stats()
+        self.assertEqual(tag_stats, list(TagStat.objects.order_by('name').values_list('name', 'posts_count')))
+        self.assertEqual(Post.objects.filter(tags__name=tag_stats[0][0], status='published').count(),
+                         tag_stats[0][1])
+
+    def test_same_seed_same_data(self):
+        call_command('seed_blog', seed=7, prefix='first', stdout=StringIO(), **self.OPTIONS)
+        call_command('seed_blog', seed=7, prefix='second', stdout=StringIO(), **self.OPTIONS)
+
+        self.assertEqual(self._snapshot('first'), self._snapshot('second'))
 
-# Create your tests here.
+    def test_existing_prefix(self):
+        call_command('seed_blog', users=1, posts=0, comments=0, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed_blog', users=1, stdout=StringIO())
@@ -0,0 +1,126 @@
+from typing import Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from redis import Redis
+
+from .dto import TimelineEntryDTO
+from .interfaces import TimelineStoreInterface, TimelinePublisherInterface
+
+
+class RedisTimelineStore(TimelineStoreInterface):
+    """Home timelines of users in Redis.
+
+    Timeline is sorted set of post ids scored by publish timestamp, capped to size newest posts.
+    Timelines expire ttl after they were built and are pushed only while they exist, so memory is
+    spent on active users only and expired timeline is built again from database on next read.
+    Reads do not prolong timelines, so drift from follow changes made around the hooks is bounded by ttl.
+    """
+    KEY_PREFIX = 'blog:timeline'
+    HIGH_FOLLOWER_AUTHORS_KEY = 'blog:timeline:high-follower-authors'
+
+    def __init__(self, client: Redis, size: int, ttl: int):
+        self.client = client
+        self.size = size
+        self.ttl = ttl
+
+    def exists(self, user_id: int) -> bool:
+        """Check if timeline of user exists"""
+        return bool(self.client.exists(self._key(user_id)))
+
+    def delete(self, user_id: int) -> None:
+        """Drop timeline of user, it is built again on next read"""
+        self.client.delete(self._key(user_id))
+
+    def add_entries(self, user_id: int, entries: List[TimelineEntryDTO]) -> None:
+        """Add posts to timeline of user, create timeline if it does not exist"""
+        if not entries:
+            return
+        key = self._key(user_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(key, {entry.post_id: entry.score for entry in entries})
+        pipe.zremrangebyrank(key, 0, -self.size - 1)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def push_entry(self, entry: TimelineEntryDTO, user_ids: List[int]) -> int:
+        """Add post to existing timelines of users, return number of changed timelines"""
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.exists(self._key(user_id))
+        existing_user_ids = [user_id for user_id, exists in zip(user_ids, pipe.execute()) if exists]
+
+        for user_id in existing_user_ids:
+            key = self._key(user_id)
+            pipe.zadd(key, {entry.post_id: entry.score})
+            pipe.zremrangebyrank(key, 0, -self.size - 1)
+        pipe.execute()
+        return len(existing_user_ids)
+
+    def get_entries(self, user_id: int, before: Optional[Tuple[float, int]], limit: int) -> List[TimelineEntryDTO]:
+        """Get newest posts of timeline older than before (score, post id) position, ordered like cursor"""
+        key = self._key(user_id)
+        same_score = []
+        if before is None:
+            older = self._parse_entries(self.client.zrevrange(key, 0, limit - 1, withscores=True))
+        else:
+            score, post_id = before
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zrangebyscore(key, score, score, withscores=True)
+            pipe.zrevrangebyscore(key, f'({score!r}', '-inf', start=0, num=limit, withscores=True)
+            same_score, older = (self._parse_entries(members) for members in pipe.execute())
+            same_score = [entry for entry in same_score if entry.post_id < post_id]
+
+        if len(older) == limit:
+            # redis orders members with equal score lexicographically, so all members with lowest
+            # loaded score are needed to order them by numeric id like cursor does
+            lowest_score = older[-1].score
+            older += self._parse_entries(self.client.zrangebyscore(key, lowest_score, lowest_score, withscores=True))
+
+        entries = {entry.post_id: entry for entry in same_score + older}.values()
+        return sorted(entries, key=lambda entry: (entry.score, entry.post_id), reverse=True)[:limit]
+
+    def remove_entries(self, user_id: int, post_ids: List[int]) -> None:
+        """Remove posts from timeline of user"""
+        if post_ids:
+            self.client.zrem(self._key(user_id), *post_ids)
+
+    def get_high_follower_authors(self) -> Set[int]:
+        """Get ids of authors whose posts are not pushed to timelines"""
+        return {int(author_id) for author_id in self.client.smembers(self.HIGH_FOLLOWER_AUTHORS_KEY)}
+
+    def set_high_follower_author(self, author_id: int, high_follower: bool) -> None:
+        """Mark or unmark author whose posts are merged into timelines on read"""
+        if high_follower:
+            self.client.sadd(self.HIGH_FOLLOWER_AUTHORS_KEY, author_id)
+        else:
+            self.client.srem(self.HIGH_FOLLOWER_AUTHORS_KEY, author_id)
+
+    def _key(self, user_id: int) -> str:
+        return f'{self.KEY_PREFIX}:{user_id}'
+
+    @staticmethod
+    def _parse_entries(members: Iterable[Tuple[str, float]]) -> List[TimelineEntryDTO]:
+        return [TimelineEntryDTO(post_id=int(member), score=score) for member, score in members]
+
+
+class CeleryTimelinePublisher(TimelinePublisherInterface):
+    """Push published posts to timelines with celery task after transaction commit"""
+
+    def publish_posts(self, post_ids: List[int]) -> None:
+        """Schedule fan out of posts to timelines of followers of their authors"""
+        # tasks module imports containers which import this module
+        from .tasks import fan_out_post
+
+        for post_id in post_ids:
+            transaction.on_commit(lambda post_id=post_id: fan_out_post.delay(post_id))
+
+
+def drop_follower_timeline(sender, instance, raw: bool = False, **kwargs) -> None:
+    """post_save and post_delete receiver for follows, timeline of follower is built again on next read"""
+    if raw:
+        return
+
+    # containers import this module
+    from core.containers import ServiceContainer
+
+    transaction.on_commit(lambda: ServiceContainer.timeline_service().drop_timeline(instance.follower_id))
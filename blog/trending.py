@@ -0,0 +1,40 @@
+from typing import Dict, Iterator, List
+
+from redis import Redis
+
+from .interfaces import TrendingStoreInterface
+
+
+class RedisTrendingStore(TrendingStoreInterface):
+    """Trending scores of recent posts in Redis sorted set.
+
+    New scores are written to next key in batches and renamed over live key, so readers see
+    either previous or new ranking.
+    """
+    KEY = 'blog:trending'
+    NEXT_KEY = 'blog:trending:next'
+
+    def __init__(self, client: Redis):
+        self.client = client
+
+    def replace_scores(self, scores: Iterator[Dict[int, float]]) -> int:
+        """Replace ranking with scores by post id written in batches, return number of ranked posts"""
+        self.client.delete(self.NEXT_KEY)
+        for batch in scores:
+            if batch:
+                self.client.zadd(self.NEXT_KEY, batch)
+
+        total = self.client.zcard(self.NEXT_KEY)
+        if total:
+            self.client.rename(self.NEXT_KEY, self.KEY)
+        else:
+            self.client.delete(self.KEY)
+        return total
+
+    def get_post_ids(self, offset: int, limit: int) -> List[int]:
+        """Get ids of posts from highest score"""
+        return [int(post_id) for post_id in self.client.zrevrange(self.KEY, offset, offset + limit - 1)]
+
+    def count(self) -> int:
+        """Get number of ranked posts"""
+        return self.client.zcard(self.KEY)
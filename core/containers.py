@@ -1,28 +1,37 @@
 from dependency_injector import containers, providers
+from django.conf import settings
+from django.core.cache import cache
+from redis import Redis
 
 from accounts.repositories import UserRepository
 from accounts.services import UserService
 from accounts.interactors import RegisterInteractor
 from blog.repositories import (
-    CategoryRepository,
-    PostRepository, CommentRepository
+    CategoryRepository, TagRepository,
+    PostRepository, CachedPostRepository, CommentRepository, ReactionRepository, TimelineRepository, TrendingRepository
 )
 from blog.services import (
-    CategoryService,
-    PostService, CommentService
+    CategoryService, TagService,
+    PostService, CommentService, ReactionService, TimelineService, TrendingService
 )
 from blog.interactors import (
-    CategoryInteractor,
-    PostInteractor, CommentInteractor
+    CategoryInteractor, TagInteractor,
+    PostInteractor, CommentInteractor, ReactionInteractor, TimelineInteractor, TrendingInteractor
 )
+from blog.reactions import RedisReactionBuffer
+from blog.registries import CategoryRegistry, SharedVersion, AUTHORS_VERSION_KEY
+from blog.timelines import RedisTimelineStore, CeleryTimelinePublisher
+from blog.trending import RedisTrendingStore
 from blog.specifications import AuthorSpecification, TagSpecification, PeriodSpecification, TagsCountSpecification, \
-    PaginationSpecification
+    PaginationSpecification, CursorPaginationSpecification, SearchSpecification, SearchRankSpecification
+from core.metrics import instrument_container
 from email_services import RegisterEmailService
 
 
 class OrderSpecificationContainer(containers.DeclarativeContainer):
     specifications_dict = providers.Dict({
-        'tags_count': providers.Factory(TagsCountSpecification)
+        'tags_count': providers.Factory(TagsCountSpecification),
+        'search_rank': providers.Factory(SearchRankSpecification),
     })
 
 
@@ -35,28 +44,105 @@ class FilterSpecificationContainer(containers.DeclarativeContainer):
         'author': providers.Factory(AuthorSpecification),
         'tags': providers.Factory(TagSpecification),
         'period': providers.Factory(PeriodSpecification),
+        'search': providers.Factory(SearchSpecification),
     })
 
 
 class PaginateSpecificationsContainer(containers.DeclarativeContainer):
     paginator = providers.Factory(PaginationSpecification)
+    post_cursor_paginator = providers.Factory(CursorPaginationSpecification, ordering_field='publish')
+    comment_cursor_paginator = providers.Factory(CursorPaginationSpecification, ordering_field='created')
+
+
+class RegistryContainer(containers.DeclarativeContainer):
+    category_registry = providers.Singleton(
+        CategoryRegistry,
+        repository=providers.Factory(CategoryRepository),
+        cache=providers.Object(cache),
+        max_age=settings.CATEGORY_REGISTRY_MAX_AGE,
+    )
+    authors_version = providers.Singleton(SharedVersion, cache=providers.Object(cache), key=AUTHORS_VERSION_KEY)
+
+
+class RedisContainer(containers.DeclarativeContainer):
+    redis_client = providers.Singleton(Redis.from_url, settings.BLOG_REDIS_URL, decode_responses=True)
+    reaction_buffer = providers.Factory(RedisReactionBuffer, client=redis_client)
+    timeline_store = providers.Factory(
+        RedisTimelineStore,
+        client=redis_client,
+        size=settings.TIMELINE_SIZE,
+        ttl=settings.TIMELINE_TTL,
+    )
+    timeline_publisher = providers.Factory(CeleryTimelinePublisher)
+    trending_store = providers.Factory(RedisTrendingStore, client=redis_client)
 
 
 class RepositoryContainer(containers.DeclarativeContainer):
     user_repository = providers.Factory(UserRepository)
     category_repository = providers.Factory(CategoryRepository)
+    tag_repository = providers.Factory(TagRepository)
     post_repository = providers.Factory(
-        PostRepository,
-        paginator=PaginateSpecificationsContainer.paginator,
+        CachedPostRepository,
+        repository=providers.Factory(
+            PostRepository,
+            paginator=PaginateSpecificationsContainer.paginator,
+            cursor_paginator=PaginateSpecificationsContainer.post_cursor_paginator,
+            category_registry=RegistryContainer.category_registry,
+            authors_version=RegistryContainer.authors_version,
+        ),
+        cache=providers.Object(cache),
+        timeout=settings.POST_LIST_CACHE_TIMEOUT,
     )
-    comment_repository = providers.Factory(CommentRepository)
+    comment_repository = providers.Factory(
+        CommentRepository,
+        cursor_paginator=PaginateSpecificationsContainer.comment_cursor_paginator,
+        authors_version=RegistryContainer.authors_version,
+    )
+    reaction_repository = providers.Factory(ReactionRepository)
+    timeline_repository = providers.Factory(TimelineRepository)
+    trending_repository = providers.Factory(TrendingRepository)
 
 
 class ServiceContainer(containers.DeclarativeContainer):
     user_service = providers.Factory(UserService, repository=RepositoryContainer.user_repository)
-    category_service = providers.Factory(CategoryService, repository=RepositoryContainer.category_repository)
-    post_service = providers.Factory(PostService, repository=RepositoryContainer.post_repository)
-    comment_service = providers.Factory(CommentService, repository=RepositoryContainer.comment_repository)
+    category_service = providers.Factory(
+        CategoryService,
+        repository=RepositoryContainer.category_repository,
+        registry=RegistryContainer.category_registry,
+        post_repository=RepositoryContainer.post_repository,
+    )
+    tag_service = providers.Factory(TagService, repository=RepositoryContainer.tag_repository)
+    post_service = providers.Factory(
+        PostService,
+        repository=RepositoryContainer.post_repository,
+        reactions=RedisContainer.reaction_buffer,
+        max_ids=settings.POST_BULK_READ_MAX_IDS,
+    )
+    comment_service = providers.Factory(
+        CommentService,
+        repository=RepositoryContainer.comment_repository,
+        reactions=RedisContainer.reaction_buffer,
+    )
+    reaction_service = providers.Factory(
+        ReactionService,
+        repository=RepositoryContainer.reaction_repository,
+        buffer=RedisContainer.reaction_buffer,
+        post_repository=RepositoryContainer.post_repository,
+    )
+    timeline_service = providers.Factory(
+        TimelineService,
+        repository=RepositoryContainer.timeline_repository,
+        store=RedisContainer.timeline_store,
+        max_fan_out=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+    )
+    trending_service = providers.Factory(
+        TrendingService,
+        repository=RepositoryContainer.trending_repository,
+        store=RedisContainer.trending_store,
+        window=settings.TRENDING_WINDOW,
+        half_life=settings.TRENDING_HALF_LIFE,
+        comment_weight=settings.TRENDING_COMMENT_WEIGHT,
+    )
 
 
 class ProjectContainer(containers.DeclarativeContainer):
@@ -69,14 +155,40 @@ class ProjectContainer(containers.DeclarativeContainer):
         CategoryInteractor,
         category_service=ServiceContainer.category_service
     )
+    tag_interactor: providers.Provider[TagInteractor] = providers.Factory(
+        TagInteractor,
+        tag_service=ServiceContainer.tag_service
+    )
     post_interactor: providers.Provider[PostInteractor] = providers.Factory(
         PostInteractor,
         post_service=ServiceContainer.post_service,
-        category_service=ServiceContainer.category_service
+        category_service=ServiceContainer.category_service,
+        timeline_publisher=RedisContainer.timeline_publisher
     )
     comment_interactor: providers.Provider[CommentInteractor] = providers.Factory(
         CommentInteractor,
         comment_service=ServiceContainer.comment_service,
         post_service=ServiceContainer.post_service
     )
+    reaction_interactor: providers.Provider[ReactionInteractor] = providers.Factory(
+        ReactionInteractor,
+        reaction_service=ServiceContainer.reaction_service,
+        post_service=ServiceContainer.post_service,
+        comment_service=ServiceContainer.comment_service
+    )
+    timeline_interactor: providers.Provider[TimelineInteractor] = providers.Factory(
+        TimelineInteractor,
+        timeline_service=ServiceContainer.timeline_service,
+        post_service=ServiceContainer.post_service
+    )
+    trending_interactor: providers.Provider[TrendingInteractor] = providers.Factory(
+        TrendingInteractor,
+        trending_service=ServiceContainer.trending_service,
+        post_service=ServiceContainer.post_service
+    )
+
 
+if settings.METRICS_ENABLED:
+    instrument_container(RepositoryContainer, 'repository')
+    instrument_container(ServiceContainer, 'service')
+    instrument_container(ProjectContainer, 'interactor')
@@ -0,0 +1,98 @@
+import os
+import time
+from functools import wraps
+from typing import Any, Callable
+
+from dependency_injector import containers, providers
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+LAYER_CALL_DURATION = Histogram(
+    'layer_call_duration_seconds',
+    'Duration of calls of views, interactors, services and repositories',
+    ['layer', 'component', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    'request_db_queries',
+    'Number of database queries per request',
+    ['view', 'method'],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'request_db_duration_seconds',
+    'Total duration of database queries per request',
+    ['view', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class InstrumentedProxy:
+    """Proxy which records duration of calls of public methods of wrapped object.
+
+    Only the call itself is timed, so for methods returning generators or context managers
+    duration does not include iteration or block of context manager.
+    """
+
+    def __init__(self, target: Any, layer: str):
+        self._target = target
+        self._layer = layer
+        self._component = type(target).__name__
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._target, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        method = self._timed(attribute, LAYER_CALL_DURATION.labels(self._layer, self._component, name))
+        # next lookups find method in instance dict without __getattr__
+        self.__dict__[name] = method
+        return method
+
+    @staticmethod
+    def _timed(method: Callable, histogram) -> Callable:
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return timed
+
+
+def instrument_container(container: containers.DeclarativeContainer, layer: str) -> None:
+    """Wrap objects created by Factory providers of container into InstrumentedProxy.
+
+    Providers are changed in place, so providers of other containers which depend on them
+    get instrumented objects too. Providers which are already instrumented are skipped.
+    """
+    for provider in container.providers.values():
+        if isinstance(provider, providers.Factory) and not getattr(provider.provides, 'instrumented', False):
+            provider.set_provides(_instrumented_factory(provider.provides, layer))
+
+
+def _instrumented_factory(factory: Callable, layer: str) -> Callable:
+    def create(*args, **kwargs):
+        return InstrumentedProxy(factory(*args, **kwargs), layer)
+
+    create.instrumented = True
+    return create
+
+
+def metrics_view(request):
+    """Return metrics in Prometheus text format, merged from files of all workers in multiprocess mode"""
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
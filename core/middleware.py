@@ -0,0 +1,82 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.metrics import LAYER_CALL_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES
+from core.queries import count_queries, get_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Record latency of views and query stats of requests when METRICS_ENABLED.
+
+    Must be placed before QueryStatsMiddleware to read complete query stats. Middleware is
+    removed from chain when metrics are disabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view_name = self._get_view_name(request)
+        if view_name is not None:
+            LAYER_CALL_DURATION.labels('view', view_name, request.method).observe(duration)
+            stats = getattr(request, 'query_stats', None)
+            if stats is not None:
+                REQUEST_DB_QUERIES.labels(view_name, request.method).observe(stats.count)
+                REQUEST_DB_DURATION.labels(view_name, request.method).observe(stats.duration)
+        return response
+
+    @staticmethod
+    def _get_view_name(request):
+        """Return class name of resolved view, None for unresolved paths to keep label values bounded"""
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return None
+        view = getattr(resolver_match.func, 'view_class', resolver_match.func)
+        return view.__name__
+
+
+class QueryStatsMiddleware:
+    """Count queries and database time of every request.
+
+    Stats are returned in X-DB-Query-Count and Server-Timing headers and kept in
+    request.query_stats. Repeated query shapes (N+1) and requests over query budget of view
+    are logged with call sites. Queries of streaming response bodies run after this middleware
+    and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with count_queries() as stats:
+            request.query_stats = stats
+            response = self.get_response(request)
+
+        response['X-DB-Query-Count'] = stats.count
+        response['Server-Timing'] = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        self._log_problems(request, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        request.query_budget = get_query_budget(view_class, request.method) if view_class else None
+
+    def _log_problems(self, request, stats) -> None:
+        for sql, count in stats.repeated_queries.items():
+            logger.warning('Query repeated %s times in %s %s at %s: %s',
+                           count, request.method, request.path, stats.call_sites[sql], sql)
+        if request.query_budget is not None and stats.count > request.query_budget:
+            logger.warning('%s %s executed %s queries, budget is %s',
+                           request.method, request.path, stats.count, request.query_budget)
@@ -0,0 +1,78 @@
+import os
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+
+class QueryStats:
+    """Number and total time of executed queries, call sites of repeated query shapes.
+
+    Shape of query is its SQL with placeholders, so the same query with other parameters has
+    the same shape. Stack is inspected only once per shape, when it reaches repeat threshold.
+    Savepoint statements are not counted, they are issued only by atomic blocks nested in
+    transaction, so number of queries is the same inside and outside of test transaction.
+    """
+    SAVEPOINT_STATEMENTS = ('SAVEPOINT ', 'RELEASE SAVEPOINT ', 'ROLLBACK TO SAVEPOINT ')
+
+    def __init__(self, repeat_threshold: int):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.call_sites: Dict[str, str] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper of database connection"""
+        if sql.startswith(self.SAVEPOINT_STATEMENTS):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[sql] += 1
+            if self.shapes[sql] == self.repeat_threshold:
+                self.call_sites[sql] = find_call_site()
+
+    @property
+    def repeated_queries(self) -> Dict[str, int]:
+        """Number of executions by query shapes which reached repeat threshold"""
+        return {sql: self.shapes[sql] for sql in self.call_sites}
+
+
+def find_call_site() -> str:
+    """Return innermost repository frame of current stack or innermost frame of project code"""
+    project_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(project_dir) and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    repository_frames = [frame for frame in frames if frame.filename.endswith('repositories.py')]
+    frames = repository_frames or frames
+    if not frames:
+        return 'unknown'
+    frame = frames[-1]
+    return f'{os.path.relpath(frame.filename, project_dir)}:{frame.lineno} in {frame.name}'
+
+
+@contextmanager
+def count_queries(repeat_threshold: Optional[int] = None) -> Iterator[QueryStats]:
+    """Collect stats of queries executed on all database connections inside block"""
+    stats = QueryStats(repeat_threshold or settings.QUERY_REPEAT_THRESHOLD)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
+def get_query_budget(view_class, method: str) -> Optional[int]:
+    """Return number of queries view may execute for request method, None if view declares no budget"""
+    return getattr(view_class, 'QUERY_BUDGET', {}).get(method.lower())
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # 3rd party
     'rest_framework',
@@ -57,6 +59,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
 
@@ -173,7 +177,7 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.DTOJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': [
@@ -228,3 +232,47 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
 
 CELERY_BROKER_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0"
 CELERY_RESULT_BACKEND = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}"
+CELERY_BEAT_SCHEDULE = {
+    'flush-reactions': {
+        'task': 'blog.tasks.flush_reactions',
+        'schedule': float(os.getenv("REACTIONS_FLUSH_INTERVAL", 5)),
+    },
+    'refresh-trending': {
+        'task': 'blog.tasks.refresh_trending',
+        'schedule': float(os.getenv("TRENDING_REFRESH_INTERVAL", 300)),
+    },
+}
+
+TESTING = sys.argv[1:2] == ['test']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1",
+    }
+}
+
+if TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# latency of layers and /metrics endpoint, workers of gunicorn share metrics through
+# directory in PROMETHEUS_MULTIPROC_DIR environment variable
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+POST_LIST_CACHE_TIMEOUT = int(os.getenv("POST_LIST_CACHE_TIMEOUT", 60))
+CATEGORY_REGISTRY_MAX_AGE = int(os.getenv("CATEGORY_REGISTRY_MAX_AGE", 300))
+POST_BULK_READ_MAX_IDS = int(os.getenv("POST_BULK_READ_MAX_IDS", 100))
+POST_BULK_CREATE_MAX_POSTS = int(os.getenv("POST_BULK_CREATE_MAX_POSTS", 1000))
+BLOG_REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/2"
+# flushed by benchmark_api before run, must not be used by anything else
+BENCHMARK_REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/3"
+TIMELINE_SIZE = int(os.getenv("TIMELINE_SIZE", 800))
+TIMELINE_TTL = int(os.getenv("TIMELINE_TTL", 7 * 24 * 60 * 60))
+TIMELINE_FANOUT_MAX_FOLLOWERS = int(os.getenv("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000))
+TRENDING_WINDOW = int(os.getenv("TRENDING_WINDOW", 3 * 24 * 60 * 60))
+TRENDING_HALF_LIFE = int(os.getenv("TRENDING_HALF_LIFE", 12 * 60 * 60))
+TRENDING_COMMENT_WEIGHT = float(os.getenv("TRENDING_COMMENT_WEIGHT", 2))
@@ -0,0 +1,98 @@
+import json
+from contextlib import contextmanager
+from typing import Dict, List
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryPlanTestCase(TestCase):
+    """TestCase which checks query plans of code under test with EXPLAIN.
+
+    Tables from large_tables must be seeded in setUpTestData. After seeding pending lists
+    of their GIN indexes are flushed and tables are analyzed, like autovacuum does in
+    production, so planner works with real statistics.
+    """
+    large_tables = (
+        'accounts_customuser',
+        'accounts_activationtoken',
+        'accounts_passwordresettoken',
+        'blog_post',
+        'blog_comment',
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT gin_clean_pending_list(index.indexrelid)
+                FROM pg_index AS index
+                JOIN pg_class AS relation ON relation.oid = index.indexrelid
+                JOIN pg_am AS method ON method.oid = relation.relam
+                WHERE method.amname = 'gin' AND index.indrelid::regclass::text = ANY(%s)
+                """,
+                [list(cls.large_tables)]
+            )
+            cursor.execute(f'ANALYZE {", ".join(cls.large_tables)}')
+
+    @contextmanager
+    def assertNoFullScan(self):
+        """Fail if any SELECT executed inside block reads whole large table.
+
+        Sequential scans and index scans without index condition outside of LIMIT are full scans.
+        """
+        with CaptureQueriesContext(connection) as context:
+            yield
+
+        selects = [query['sql'] for query in context.captured_queries
+                   if query['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects, 'No SELECT queries were executed')
+
+        for sql in selects:
+            plan = self._explain(sql)
+            scanned = sorted(set(self._full_scanned_tables(plan)) & set(self.large_tables))
+            self.assertFalse(
+                scanned,
+                f'Full scan of {", ".join(scanned)}:\n{sql}\n{json.dumps(plan, indent=2)}'
+            )
+
+    @staticmethod
+    def _explain(sql: str) -> Dict:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def _full_scanned_tables(self, plan: Dict, limited: bool = False) -> List[str]:
+        node_type = plan['Node Type']
+        limited = limited or node_type == 'Limit'
+        tables = []
+        if node_type == 'Seq Scan':
+            tables.append(plan['Relation Name'])
+        elif node_type in ('Index Scan', 'Index Only Scan') and 'Index Cond' not in plan and not limited:
+            tables.append(plan['Relation Name'])
+        for subplan in plan.get('Plans', []):
+            tables.extend(self._full_scanned_tables(subplan, limited))
+        return tables
+
+
+class QueryBudgetTestCase(TestCase):
+    """TestCase which checks responses of test client against query budgets declared by views"""
+
+    def assertWithinQueryBudget(self, response):
+        """Fail if view executed more queries than its budget or repeated query shape (N+1)"""
+        request = response.wsgi_request
+        view_name = response.resolver_match.func.view_class.__name__
+        stats = request.query_stats
+        self.assertIsNotNone(request.query_budget, f'{view_name} declares no query budget for {request.method}')
+        self.assertLessEqual(
+            stats.count, request.query_budget,
+            f'{view_name} executed {stats.count} queries for {request.method}, budget is {request.query_budget}'
+        )
+        repeated = [f'{count}x at {stats.call_sites[sql]}: {sql}' for sql, count in stats.repeated_queries.items()]
+        self.assertFalse(repeated, f'{view_name} repeated queries:\n' + '\n'.join(repeated))
@@ -16,11 +16,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from api.views.swagger import staff_protected_schema_view
+from core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', staff_protected_schema_view, name='schema-swagger-ui'),
     path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics', metrics_view, name='metrics'),
     path('__debug__/', include('debug_toolbar.urls')),
 ]
 
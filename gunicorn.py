@@ -1,6 +1,24 @@
+import os
+
 bind = "0.0.0.0:8000"
 workers = 3
 errorlog = '-'
 accesslog = '-'
 loglevel = 'info'
 timeout = 120
+
+
+def on_starting(server):
+    """Remove metric files of previous run, workers write metrics to PROMETHEUS_MULTIPROC_DIR"""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def child_exit(server, worker):
+    """Stop collecting live metrics of exited worker"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)